@@ -0,0 +1,79 @@
+"""
+JSONL 배치 파일을 모델의 모든 서버에 나눠 처리하는 명령행 도구.
+
+    python -m app.batch requests.jsonl results.jsonl --config config.json
+
+입력의 각 줄은 OpenAI 배치 입력 형식({"custom_id", "method", "url", "body"}) 또는 요청 본문입니다.
+결과는 끝나는 순서대로 출력 파일에 추가되며, 중단된 뒤 같은 명령을 다시 실행하면 체크포인트부터 이어서 처리합니다.
+"""
+import argparse
+import asyncio
+import os
+
+from app.services.batch import BatchJob, BatchRunner
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.routing_table import RoutingTableManager
+from app.utils.config_loader import ConfigLoader
+
+
+async def _report(job: BatchJob, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print(
+            f"[{job.id}] line {job.read_line}: {job.counts['completed']} completed, "
+            f"{job.counts['failed']} failed, {job.in_progress} in progress"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="입력 JSONL 파일")
+    parser.add_argument("output", help="결과 JSONL 파일")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--endpoint", help="줄에 url 이 없을 때 사용할 경로 (기본값: batch.endpoint 설정)")
+    parser.add_argument("--checkpoint", help="작업 상태 파일 (기본값: <output>.checkpoint)")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="진행 상황 출력 주기 (초)")
+    args = parser.parse_args()
+
+    config_loader = ConfigLoader(args.config)
+    batch_config = config_loader.get_batch_config()
+    routing_table = RoutingTableManager(config_loader, **config_loader.get_routing_config())
+    metrics_collector = MetricsCollector(
+        servers=routing_table.table.servers_by_model(),
+        update_interval=config_loader.get_metrics_update_interval(),
+        **config_loader.get_metrics_config(),
+    )
+    routing_table.add_listener(metrics_collector.apply_routing_table)
+    load_balancer = LoadBalancer(metrics_collector, config_loader, routing_table)
+    runner = BatchRunner(load_balancer, **batch_config)
+
+    state_path = args.checkpoint or f"{args.output}.checkpoint"
+    if os.path.exists(state_path):
+        job = BatchJob.load(state_path)
+        if job.status != "in_progress":
+            print(f"[{job.id}] already {job.status} (remove {state_path} to run again)")
+            return
+        print(f"[{job.id}] resuming from line {job.line}")
+    else:
+        job = BatchJob(
+            f"batch_{os.urandom(8).hex()}", args.input, args.output, state_path, args.endpoint or runner.endpoint
+        )
+
+    tasks = [
+        asyncio.create_task(metrics_collector.update_metrics()),
+        asyncio.create_task(load_balancer.health.run()),
+        asyncio.create_task(_report(job, args.report_interval)),
+    ]
+    try:
+        await runner.run(job)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await load_balancer.aclose()
+    print(f"[{job.id}] {job.status}: {job.counts['completed']} completed, {job.counts['failed']} failed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,36 +1,125 @@
 from fastapi import FastAPI, Depends
-from app.routers import chat, generate, completions
+from app.routers import admin, batches, chat, generate, completions, metrics
+from app.services.access_log import AccessLog, AccessLogMiddleware
+from app.services.batch import BatchManager, BatchRunner
+from app.services.instrumentation import router_metrics
 from app.services.load_balancer import LoadBalancer
 from app.services.metrics_collector import MetricsCollector
+from app.services.response_cache import ResponseCache
+from app.services.routing_table import RoutingTableManager
+from app.services.scheduler import AdmissionController
+from app.services.shared_state import SharedState
+from app.services.stream_relay import StreamRelay
+from app.services.tracing import Tracer, TracingMiddleware
 from app.utils.config_loader import ConfigLoader
 from app.utils.dependencies import init_dependencies
 import asyncio
+import os
 
 # 전역적으로 초기화된 의존성
 config_loader = ConfigLoader("config.json")
-server_dict = {model_name: model["servers"] for model_name, model in config_loader.config["models"].items()}
-metrics_collector = MetricsCollector(servers=server_dict)  # 딕셔너리 전달
-load_balancer = LoadBalancer(metrics_collector, config_loader)
+
+# config.json + 관리자 API 변경으로 만들어지는 라우팅 테이블 (변경 시 원자적으로 교체)
+routing_table = RoutingTableManager(config_loader, **config_loader.get_routing_config())
+
+# uvicorn --workers N 로 실행할 때 워커 간 공유 상태 (메트릭 스냅샷, 진행 중 카운터, 라운드 로빈 커서)
+shared_state_config = config_loader.get_shared_state_config()
+shared_state = (
+    SharedState(os.path.abspath(config_loader.config_path), **shared_state_config)
+    if shared_state_config.get("enabled") else None
+)
+metrics_collector = MetricsCollector(
+    servers=routing_table.table.servers_by_model(),  # 딕셔너리 전달
+    update_interval=config_loader.get_metrics_update_interval(),
+    shared=shared_state,
+    **config_loader.get_metrics_config(),
+)
+routing_table.add_listener(metrics_collector.apply_routing_table)
+load_balancer = LoadBalancer(metrics_collector, config_loader, routing_table)
+
+# 결정적 요청 응답 캐시 (설정에서 켠 경우에만 사용)
+response_cache_config = config_loader.get_response_cache_config()
+response_cache = (
+    ResponseCache(load_balancer.tenants, **response_cache_config) if response_cache_config.get("enabled") else None
+)
+
+# 모델별 대기열 / 동시성 제어
+admission_controller = AdmissionController(
+    metrics_collector, load_balancer.tenants, **config_loader.get_admission_config()
+)
+
+# 업스트림 SSE 스트림 중계
+stream_relay = StreamRelay(**config_loader.get_stream_relay_config())
+
+# 요청 단계별 추적 (설정에서 켠 경우에만)
+tracing_config = config_loader.get_tracing_config()
+tracer = Tracer(**tracing_config) if tracing_config.get("enabled") else None
+
+# 오프라인 배치 작업 (/v1/batches, 설정에서 켠 경우에만)
+batch_config = config_loader.get_batch_config()
+if batch_config.get("enabled"):
+    batch_runner = BatchRunner(load_balancer, admission_controller, **batch_config)
+    batch_manager = BatchManager(batch_runner, batch_config.get("directory", "batches"))
+else:
+    batch_manager = None
+
+# 구조화된 접근 로그 (설정에서 켠 경우에만)
+access_log_config = config_loader.get_access_log_config()
+access_log = AccessLog(**access_log_config) if access_log_config.get("enabled") else None
+
+# /metrics 수집 시점에 읽을 상태 연결
+router_metrics.bind_state(load_balancer, admission_controller, response_cache, access_log)
 
 # FastAPI 앱 생성
 app = FastAPI()
+if tracer is not None:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+if access_log is not None:
+    app.add_middleware(AccessLogMiddleware, access_log=access_log)
 
 # 백그라운드 작업 추적
 background_tasks = []
 
 # 의존성 초기화
-init_dependencies(load_balancer)
+init_dependencies(
+    load_balancer, response_cache, admission_controller, stream_relay, routing_table,
+    validate=config_loader.get_request_validation_config().get("enabled", False),
+    request_tracer=tracer,
+    batches=batch_manager,
+)
 
 # 라우터 등록
 app.include_router(chat.router, prefix="/v1", tags=["chat"], dependencies=[])  # prefix 유지
 app.include_router(generate.router, prefix="", tags=["generate"], dependencies=[])
 app.include_router(completions.router, prefix="/v1", tags=["completions"], dependencies=[])
+app.include_router(batches.router, prefix="/v1", tags=["batches"], dependencies=[])
+app.include_router(admin.router, prefix="/admin", tags=["admin"], dependencies=[])
+app.include_router(metrics.router, prefix="", tags=["metrics"], dependencies=[])
 
 @app.on_event("startup")
 async def startup_event():
     task = asyncio.create_task(metrics_collector.update_metrics())
     background_tasks.append(task)
     print("Metrics collector started")
+    background_tasks.append(asyncio.create_task(load_balancer.health.run()))
+    print("Health checker started")
+    background_tasks.append(asyncio.create_task(routing_table.watch()))
+    print("Config watcher started")
+    if load_balancer.usage is not None:
+        background_tasks.append(asyncio.create_task(load_balancer.usage.run()))
+        print(f"Usage accounting started ({load_balancer.usage.sink.path})")
+    if access_log is not None:
+        background_tasks.append(asyncio.create_task(access_log.run()))
+        print(f"Access log started ({access_log.path or 'stdout'}, sample rate {access_log.sample_rate})")
+    if tracer is not None:
+        background_tasks.append(asyncio.create_task(tracer.run()))
+        print(f"Tracing started (sample rate {tracer.sample_rate}, slow threshold {tracer.slow_threshold}s)")
+    if batch_manager is not None:
+        await batch_manager.resume()
+        print(f"Batch processing enabled ({batch_manager.directory})")
+    if shared_state is not None:
+        background_tasks.append(asyncio.create_task(load_balancer.inflight.run_sync()))
+        print(f"Shared state attached (worker {shared_state.worker})")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -38,3 +127,6 @@ async def shutdown_event():
     for task in background_tasks:
         task.cancel()
     await asyncio.gather(*background_tasks, return_exceptions=True)
+    if batch_manager is not None:
+        await batch_manager.aclose()
+    await load_balancer.aclose()
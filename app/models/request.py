@@ -1,10 +1,13 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Union
 
 
+# 요청 본문은 원본 그대로 전달되므로 모델은 검증(request_validation)에만 쓰이며, 모르는 필드도 허용
 class CompletionRequest(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
     model: str
-    prompt: str
+    prompt: Union[str, List[str]]
     max_tokens: int
     temperature: Optional[float] = 1.0
     stream: Optional[bool] = False  # 스트리밍 여부 추가
@@ -13,6 +16,8 @@ class CompletionRequest(BaseModel):
     stop: Optional[List[str]] = None
 
 class ChatCompletionRequest(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
     model: str
     messages: List[dict]
     max_tokens: Optional[int] = 100
@@ -20,3 +25,15 @@ class ChatCompletionRequest(BaseModel):
     stream: Optional[bool] = False  # 스트리밍 여부 추가
     repetition_penalty: Optional[float] = 1.0
     presence_penalty: Optional[float] = 0.0
+
+class ModelConfigRequest(BaseModel):
+    model_name: str
+    servers: List[str]
+    strategy: Optional[str] = "round_robin"
+
+class ModelUpdateRequest(BaseModel):
+    servers: Optional[List[str]] = None
+    strategy: Optional[str] = None
+
+class ServerRequest(BaseModel):
+    server: str
@@ -1,48 +1,135 @@
-from fastapi import APIRouter, HTTPException
-from app.utils.config_loader import ConfigLoader
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.models.request import ModelConfigRequest, ModelUpdateRequest, ServerRequest
+from app.services.load_balancer import SUPPORTED_STRATEGIES, LoadBalancer
+from app.services.routing_table import RoutingTableManager
+from app.services.scheduler import AdmissionController
+from app.services.tracing import Tracer
+from app.utils.dependencies import (
+    get_admission_controller, get_load_balancer, get_routing_table, get_tracer, require_admin_token,
+)
 
 router = APIRouter()
-config_loader = ConfigLoader()
+
+
+def _check_strategy(strategy: str):
+    if strategy not in SUPPORTED_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unsupported strategy: {strategy}")
 
 
 @router.get("/models")
-async def list_models():
-    return config_loader.get_models()
+async def list_models(routing: RoutingTableManager = Depends(get_routing_table)):
+    return routing.table.to_config()
 
 
-@router.post("/models")
-async def add_model(model_name: str, servers: list[str], strategy: str = "round_robin"):
-    models = config_loader.get_models()
-    if model_name in models:
+@router.post("/models", dependencies=[Depends(require_admin_token)])
+async def add_model(payload: ModelConfigRequest, routing: RoutingTableManager = Depends(get_routing_table)):
+    if payload.model_name in routing.table.models:
         raise HTTPException(status_code=400, detail="Model already exists")
-    models[model_name] = {"servers": servers, "strategy": strategy}
-    config_loader.save_config(models)
-    return {"message": f"Model {model_name} added successfully."}
+    _check_strategy(payload.strategy)
+    routing.set_model(payload.model_name, payload.servers, payload.strategy)
+    return {"message": f"Model {payload.model_name} added successfully."}
 
 
-@router.put("/models/{model_name}")
+@router.put("/models/{model_name}", dependencies=[Depends(require_admin_token)])
 async def update_model(
-    model_name: str, servers: list[str] = None, strategy: str = None
+    model_name: str, payload: ModelUpdateRequest, routing: RoutingTableManager = Depends(get_routing_table)
 ):
-    models = config_loader.get_models()
-    if model_name not in models:
+    route = routing.table.models.get(model_name)
+    if route is None:
         raise HTTPException(status_code=404, detail="Model not found")
-    if not servers and not strategy:
+    if not payload.servers and not payload.strategy:
         raise HTTPException(status_code=400, detail="No updates provided")
-    if servers:
-        models[model_name]["servers"] = servers
-    if strategy:
-        models[model_name]["strategy"] = strategy
-    config_loader.save_config(models)
+    if payload.strategy:
+        _check_strategy(payload.strategy)
+    routing.set_model(model_name, payload.servers or list(route.servers), payload.strategy or route.strategy)
     return {"message": f"Model {model_name} updated successfully."}
 
 
-@router.delete("/models/{model_name}")
-async def delete_model(model_name: str):
-    models = config_loader.get_models()
-    if model_name in models:
-        del models[model_name]
-        config_loader.save_config(models)
+@router.delete("/models/{model_name}", dependencies=[Depends(require_admin_token)])
+async def delete_model(model_name: str, routing: RoutingTableManager = Depends(get_routing_table)):
+    if model_name in routing.table.models:
+        routing.delete_model(model_name)
         return {"message": f"Model {model_name} deleted successfully."}
     else:
         raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+
+
+@router.get("/servers")
+async def list_servers(
+    load_balancer: LoadBalancer = Depends(get_load_balancer),
+    routing: RoutingTableManager = Depends(get_routing_table),
+):
+    """
+    서버별 소속 모델, 드레이닝 여부, 진행 중 요청/스트림 수, 관측 지연 시간(peak EWMA).
+    드레이닝 중인 노드는 진행 중 요청이 0 이 되면 안전하게 제거할 수 있습니다.
+    """
+    table = routing.table
+    return {
+        server: {
+            "models": [model for model, route in table.models.items() if server in route.servers],
+            "draining": server in table.draining,
+            "inflight_requests": load_balancer.inflight.get_requests(server),
+            "inflight_streams": load_balancer.inflight.get_streams(server),
+            "latency_ewma": load_balancer.peak_ewma.latency(server),
+        }
+        for server in table.unique_servers()
+    }
+
+
+@router.post("/servers/drain", dependencies=[Depends(require_admin_token)])
+async def drain_server(payload: ServerRequest, routing: RoutingTableManager = Depends(get_routing_table)):
+    """
+    노드에 새 요청을 보내지 않습니다. 진행 중 요청/스트림은 끝까지 처리됩니다. admin.token 필요.
+    """
+    if payload.server not in routing.table.unique_servers():
+        raise HTTPException(status_code=404, detail=f"Server {payload.server} not found")
+    routing.drain(payload.server)
+    return {"message": f"Server {payload.server} is draining."}
+
+
+@router.post("/servers/undrain", dependencies=[Depends(require_admin_token)])
+async def undrain_server(payload: ServerRequest, routing: RoutingTableManager = Depends(get_routing_table)):
+    if payload.server not in routing.table.draining:
+        raise HTTPException(status_code=404, detail=f"Server {payload.server} is not draining")
+    routing.undrain(payload.server)
+    return {"message": f"Server {payload.server} is accepting requests."}
+
+
+@router.get("/queues")
+async def list_queues(admission: AdmissionController = Depends(get_admission_controller)):
+    """
+    모델별 대기열 깊이, 동시성 한도, 대기 시간 통계.
+    """
+    if admission is None:
+        return {}
+    return admission.stats()
+
+
+@router.get("/usage", dependencies=[Depends(require_admin_token)])
+async def list_usage(load_balancer: LoadBalancer = Depends(get_load_balancer)):
+    """
+    테넌트별 최근 창의 토큰 사용량과 토큰 속도 한도. 사용량 집계가 꺼져 있으면 빈 딕셔너리. admin.token 필요.
+    """
+    if load_balancer.usage is None:
+        return {}
+    return load_balancer.usage.stats()
+
+
+@router.get("/health")
+async def list_server_health(load_balancer: LoadBalancer = Depends(get_load_balancer)):
+    """
+    서버별 서킷 브레이커 상태, 연속 실패 수, slow-start 가중치.
+    """
+    return load_balancer.health.stats()
+
+
+@router.get("/traces/slowest")
+async def list_slowest_traces(
+    limit: int = Query(20, ge=1, le=1000), tracer: Tracer = Depends(get_tracer)
+):
+    """
+    최근에 남긴 트레이스 중 가장 오래 걸린 요청과 단계별 스팬. 추적이 꺼져 있으면 빈 목록.
+    """
+    if tracer is None:
+        return []
+    return tracer.slowest(limit)
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from app.services.batch import BATCH_ENDPOINTS, BatchJob, BatchManager
+from app.utils.dependencies import get_batch_manager
+
+router = APIRouter()
+
+
+def _manager(batches: BatchManager) -> BatchManager:
+    if batches is None:
+        raise HTTPException(status_code=404, detail="Batch processing is not enabled.")
+    return batches
+
+
+def _job(batches: BatchManager, batch_id: str, request: Request) -> BatchJob:
+    # 다른 테넌트의 작업은 있는지도 드러내지 않음
+    batches = _manager(batches)
+    job = batches.get(batch_id, batches.owner(request.headers))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return job
+
+
+@router.post("/batches")
+async def create_batch(
+    request: Request,
+    endpoint: str = Query(None, description="줄에 url 이 없을 때 사용할 경로"),
+    batches: BatchManager = Depends(get_batch_manager),
+):
+    """
+    요청 본문의 JSONL(OpenAI 배치 입력 형식 또는 요청 본문만 있는 줄)을 그대로 받아 배치 작업을 시작합니다.
+    본문은 메모리에 모으지 않고 파일로 바로 씁니다.
+    """
+    batches = _manager(batches)
+    if endpoint is not None and endpoint not in BATCH_ENDPOINTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported endpoint: {endpoint}")
+    job = await batches.create(request.stream(), endpoint, dict(request.headers))
+    return job.to_dict()
+
+
+@router.get("/batches")
+async def list_batches(request: Request, batches: BatchManager = Depends(get_batch_manager)):
+    """
+    요청자 테넌트가 만든 작업 목록.
+    """
+    batches = _manager(batches)
+    return {"object": "list", "data": [job.to_dict() for job in batches.owned(batches.owner(request.headers))]}
+
+
+@router.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, request: Request, batches: BatchManager = Depends(get_batch_manager)):
+    return _job(batches, batch_id, request).to_dict()
+
+
+@router.get("/batches/{batch_id}/output")
+async def get_batch_output(batch_id: str, request: Request, batches: BatchManager = Depends(get_batch_manager)):
+    """
+    지금까지 기록된 결과 JSONL (작업이 진행 중이면 마지막 체크포인트까지).
+    """
+    job = _job(batches, batch_id, request)
+    if not await asyncio.to_thread(os.path.exists, job.output_path):
+        raise HTTPException(status_code=404, detail="Batch output not found")
+    return FileResponse(job.output_path, media_type="application/jsonl")
+
+
+@router.post("/batches/{batch_id}/cancel")
+async def cancel_batch(batch_id: str, request: Request, batches: BatchManager = Depends(get_batch_manager)):
+    _job(batches, batch_id, request)
+    job = await batches.cancel(batch_id)
+    return job.to_dict()
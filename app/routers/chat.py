@@ -1,41 +1,42 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.responses import StreamingResponse
 from app.models.request import ChatCompletionRequest
 from app.services.load_balancer import LoadBalancer
 from app.services.logger import Logger
-from app.utils.dependencies import get_load_balancer
+from app.services.proxy import forward_completion
+from app.services.response_cache import ResponseCache
+from app.services.scheduler import AdmissionController
+from app.services.stream_relay import StreamRelay
+from app.utils.dependencies import (
+    get_admission_controller, get_load_balancer, get_response_cache, get_stream_relay, request_body,
+)
+from app.utils.request_body import RequestBody, request_schema
 
 router = APIRouter()
 logger = Logger()
 
-@router.post("/chat/completions")
+@router.post("/chat/completions", openapi_extra=request_schema(ChatCompletionRequest))
 async def chat_completions(
     request: Request,
-    payload: ChatCompletionRequest,
-    load_balancer: LoadBalancer = Depends(get_load_balancer)
+    payload: RequestBody = Depends(request_body(ChatCompletionRequest)),
+    load_balancer: LoadBalancer = Depends(get_load_balancer),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    admission: AdmissionController = Depends(get_admission_controller),
+    stream_relay: StreamRelay = Depends(get_stream_relay),
 ):
-    model_name = payload.model
-    stream = payload.stream
+    model_name = payload.get("model")
+    stream = payload.get("stream")
 
     if not model_name:
         raise HTTPException(status_code=400, detail="Model name must be specified.")
 
-    selected_server = await load_balancer.select_server(model_name)
-    if not selected_server:
-        raise HTTPException(status_code=503, detail="No available servers for the model.")
-
-    headers = dict(request.headers)
     try:
-        response = await load_balancer.forward_request(
-            f"{selected_server}/v1/chat/completions", payload.dict(), headers, stream=stream
+        response = await forward_completion(
+            request, payload, "/v1/chat/completions", load_balancer, response_cache, admission
         )
 
         if stream:
-            async def stream_generator():
-                async for chunk in response:
-                    yield chunk
-
-            return StreamingResponse(stream_generator(), media_type="application/json")
+            # 원본 SSE 바이트 중계, 클라이언트 연결 종료 시 업스트림 취소
+            return stream_relay.response(response, request)
         else:
             return response
     except RuntimeError as e:
@@ -1,56 +1,52 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.responses import StreamingResponse
 from app.models.request import CompletionRequest
 from app.services.load_balancer import LoadBalancer
 from app.services.logger import Logger
-from app.utils.dependencies import get_load_balancer
+from app.services.proxy import forward_completion
+from app.services.response_cache import ResponseCache
+from app.services.scheduler import AdmissionController
+from app.services.stream_relay import StreamRelay
+from app.utils.dependencies import (
+    get_admission_controller, get_load_balancer, get_response_cache, get_stream_relay, request_body,
+)
+from app.utils.request_body import RequestBody, request_schema
 
 router = APIRouter()
 logger = Logger()
 
-@router.post("/completions")
+@router.post("/completions", openapi_extra=request_schema(CompletionRequest))
 async def completions(
     request: Request,
-    payload: CompletionRequest,
-    load_balancer: LoadBalancer = Depends(get_load_balancer)
+    payload: RequestBody = Depends(request_body(CompletionRequest)),
+    load_balancer: LoadBalancer = Depends(get_load_balancer),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    admission: AdmissionController = Depends(get_admission_controller),
+    stream_relay: StreamRelay = Depends(get_stream_relay),
 ):
     """
     Completions API 엔드포인트.
     - 요청을 적절한 서버로 라우팅.
     - 스트리밍 및 일반 요청 모두 지원.
+    - 결정적 요청은 응답 캐시 사용 (설정 시).
     """
-    model_name = payload.model
-    stream = payload.stream
+    model_name = payload.get("model")
+    stream = payload.get("stream")
 
     # 모델 이름 검증
     if not model_name:
         raise HTTPException(status_code=400, detail="Model name must be specified.")
 
-    # 로드 밸런서를 통해 서버 선택
-    selected_server = await load_balancer.select_server(model_name)
-    if not selected_server:
-        raise HTTPException(status_code=503, detail="No available servers for the model.")
-
-    # 헤더 및 페이로드 준비
-    headers = dict(request.headers)
-    headers.pop("Content-Length", None)  # Content-Length 제거
     try:
-        # 요청 전달
-        response = await load_balancer.forward_request(
-            f"{selected_server}/v1/completions", payload.dict(), headers, stream=stream
+        # 서버 선택 후 요청 전달 (캐시 적중 시 업스트림 호출 생략)
+        response = await forward_completion(
+            request, payload, "/v1/completions", load_balancer, response_cache, admission
         )
 
         if stream:
-            # 스트리밍 응답 처리
-            async def stream_generator():
-                try:
-                    async for chunk in response:
-                        yield chunk
-                except Exception as e:
-                    logger.log_error(payload, f"Streaming error: {str(e)}")
-                    raise HTTPException(status_code=500, detail="Streaming error occurred.")
-
-            return StreamingResponse(stream_generator(), media_type="application/json")
+            # 원본 SSE 바이트 중계 (도중 오류는 SSE error 이벤트로 전달)
+            return stream_relay.response(
+                response, request, on_error=lambda e: logger.log_error(payload, f"Streaming error: {str(e)}")
+            )
         else:
             # 일반 응답 반환
             return response
@@ -1,7 +1,14 @@
+import time
+
 from fastapi import APIRouter, HTTPException, Request, Depends
+from app.services.access_log import note_request
+from app.services.instrumentation import router_metrics
 from app.services.load_balancer import LoadBalancer
 from app.services.logger import Logger
-from app.utils.dependencies import get_load_balancer
+from app.services.proxy import admit, check_rate_limit
+from app.services.scheduler import AdmissionController
+from app.utils.dependencies import get_admission_controller, get_load_balancer, request_body
+from app.utils.request_body import RequestBody
 
 router = APIRouter()
 logger = Logger()
@@ -9,24 +16,36 @@ logger = Logger()
 @router.post("/generate")  # 상대 경로로 설정
 async def generate(
     request: Request,
-    load_balancer: LoadBalancer = Depends(get_load_balancer)
+    payload: RequestBody = Depends(request_body()),
+    load_balancer: LoadBalancer = Depends(get_load_balancer),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     Generate API 엔드포인트.
     - 모든 요청을 기본 서버로 전달.
     """
+    started_at = time.perf_counter()
+    note_request(payload)
     # 로드 밸런서를 통해 기본 서버 선택
     selected_server = await load_balancer.select_server(is_generate=True)
     if not selected_server:
         raise HTTPException(status_code=503, detail="No available server for /generate requests")
 
-    # 요청 전달
+    # 요청 전달 (기본 서버 대기열에서 실행 권한을 얻은 뒤)
     headers = dict(request.headers)
-    payload = await request.json()
+    check_rate_limit(load_balancer.usage, headers)
+    ticket = await admit(admission, None, headers)
     try:
-        response = await load_balancer.forward_request(f"{selected_server}/generate", payload, headers)
+        response = await load_balancer.forward_with_retries(
+            selected_server, None, "/generate", payload, headers, is_generate=True
+        )
+        router_metrics.observe_request("/generate", "", "ok", time.perf_counter() - started_at)
         logger.log_request(payload, response)
         return response
     except RuntimeError as e:
+        router_metrics.observe_request("/generate", "", "error", time.perf_counter() - started_at)
         logger.log_error(payload, str(e))
         raise HTTPException(status_code=502, detail=f"Error contacting server: {str(e)}")
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.services.instrumentation import router_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    라우터 자체 메트릭 (Prometheus 텍스트 형식).
+    """
+    return Response(generate_latest(router_metrics.registry), media_type=CONTENT_TYPE_LATEST)
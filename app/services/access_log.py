@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Mapping, Optional
+
+DEFAULT_ACCESS_LOG_CONFIG = {
+    "enabled": False,
+    "path": None,  # JSONL 파일 경로 (None 이면 표준 출력)
+    "sample_rate": 1.0,  # 기록할 성공 응답 비율
+    "error_sample_rate": 1.0,  # 기록할 오류 응답(4xx/5xx) 비율
+    "queue_size": 10000,  # 기록 대기열 최대 길이 (가득 차면 버리고 dropped 로 셈)
+    "batch_size": 512,  # 한 번에 쓰는 최대 레코드 수
+    "prompt": "none",  # "none", "truncate" (앞부분만) 또는 "hash" (SHA-256)
+    "prompt_max_chars": 200,
+    "routes": ["/v1/", "/generate"],  # 기록할 경로 접두사
+}
+
+PROMPT_MODES = ("none", "truncate", "hash")
+
+_current: ContextVar[Optional["AccessRecord"]] = ContextVar("llmstream_access_record", default=None)
+
+
+def current_record() -> Optional["AccessRecord"]:
+    """
+    현재 요청의 접근 로그 레코드. 접근 로그가 꺼져 있거나 기록 대상 경로가 아니면 None.
+    """
+    return _current.get()
+
+
+def note_request(body: Mapping):
+    """
+    현재 요청의 레코드에 요청 본문을 연결합니다 (모델, 스트림 여부, 프롬프트는 기록할 때 꺼냄).
+    """
+    record = _current.get()
+    if record is not None:
+        record.body = body
+
+
+class AccessRecord:
+    """
+    요청 하나의 고정 필드 레코드. 요청 경로에서는 값만 채우고 직렬화는 기록 스레드에서 합니다.
+    """
+
+    __slots__ = (
+        "timestamp", "started_at", "method", "path", "status", "latency", "server", "bytes_out",
+        "prompt_tokens", "completion_tokens", "body",
+    )
+
+    def __init__(self, method: str, path: str):
+        self.timestamp = time.time()
+        self.started_at = time.perf_counter()
+        self.method = method
+        self.path = path
+        self.status = 0
+        self.latency = 0.0
+        self.server: Optional[str] = None
+        self.bytes_out = 0
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.body: Optional[Mapping] = None
+
+    def add_usage(self, usage: Optional[Mapping]):
+        """
+        업스트림 응답의 usage 를 더합니다 (n 분할 요청은 하위 요청마다 호출됨).
+        """
+        if not usage:
+            return
+        self.prompt_tokens = (self.prompt_tokens or 0) + (usage.get("prompt_tokens") or 0)
+        self.completion_tokens = (self.completion_tokens or 0) + (usage.get("completion_tokens") or 0)
+
+    def to_dict(self, prompt_mode: str = "none", prompt_max_chars: int = 200) -> Dict:
+        body = self.body or {}
+        record = {
+            "time": round(self.timestamp, 3),
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "latency_ms": round(self.latency * 1000, 3),
+            "model": body.get("model"),
+            "stream": bool(body.get("stream")),
+            "server": self.server,
+            "bytes": self.bytes_out,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+        if prompt_mode != "none" and body:
+            prompt = _prompt_text(body)
+            if prompt_mode == "hash":
+                record["prompt_sha256"] = hashlib.sha256(prompt.encode()).hexdigest()
+            else:
+                record["prompt"] = prompt[:prompt_max_chars]
+        return record
+
+
+def _prompt_text(body: Mapping) -> str:
+    messages = body.get("messages")
+    if isinstance(messages, list):
+        return "\n".join(
+            message["content"] for message in messages
+            if isinstance(message, dict) and isinstance(message.get("content"), str)
+        )
+    prompt = body.get("prompt")
+    if isinstance(prompt, list):
+        return "\n".join(item for item in prompt if isinstance(item, str))
+    return prompt if isinstance(prompt, str) else ""
+
+
+class AccessLog:
+    """
+    구조화된 접근 로그.
+
+    - 요청이 끝나면 샘플링을 거친 레코드를 크기 제한이 있는 대기열에 넣기만 함 (가득 차면 버리고 셈)
+    - 백그라운드 작업이 대기열을 묶어서 꺼내 직렬화와 쓰기를 스레드에서 처리 (이벤트 루프를 막지 않음)
+    """
+
+    def __init__(self, **config):
+        """
+        :param config: DEFAULT_ACCESS_LOG_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_ACCESS_LOG_CONFIG, **config}
+        if options["prompt"] not in PROMPT_MODES:
+            raise ValueError(f"Unsupported prompt logging mode: {options['prompt']}")
+        self.path = options["path"]
+        self.sample_rate = float(options["sample_rate"])
+        self.error_sample_rate = float(options["error_sample_rate"])
+        self.batch_size = int(options["batch_size"])
+        self.prompt_mode = options["prompt"]
+        self.prompt_max_chars = int(options["prompt_max_chars"])
+        self.routes = tuple(options["routes"])
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=int(options["queue_size"]))
+        self.stats = {"logged": 0, "sampled_out": 0, "dropped": 0, "write_errors": 0}
+
+    def logs(self, path: str) -> bool:
+        return path.startswith(self.routes)
+
+    def finish(self, record: AccessRecord, status: int):
+        record.status = status
+        record.latency = time.perf_counter() - record.started_at
+        rate = self.error_sample_rate if status >= 400 else self.sample_rate
+        if rate < 1.0 and random.random() >= rate:
+            self.stats["sampled_out"] += 1
+            return
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+
+    def _write(self, batch: List[AccessRecord]):
+        lines = "".join(
+            json.dumps(record.to_dict(self.prompt_mode, self.prompt_max_chars), ensure_ascii=False) + "\n"
+            for record in batch
+        )
+        if self.path is None:
+            sys.stdout.write(lines)
+            sys.stdout.flush()
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def _write_batch(self, batch: List[AccessRecord]):
+        try:
+            await asyncio.to_thread(self._write, batch)
+            self.stats["logged"] += len(batch)
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            print(f"Failed to write {len(batch)} access log records: {e!r}")
+
+    def _drain(self, first: AccessRecord) -> List[AccessRecord]:
+        batch = [first]
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def run(self):
+        """
+        대기열을 비우는 백그라운드 루프. 취소될 때 남은 레코드를 기록합니다.
+        """
+        writing = None
+        try:
+            while True:
+                writing = asyncio.ensure_future(self._write_batch(self._drain(await self.queue.get())))
+                await asyncio.shield(writing)  # 취소되어도 쓰고 있던 묶음은 마저 기록
+        finally:
+            if writing is not None:
+                await writing
+            while not self.queue.empty():
+                await self._write_batch(self._drain(self.queue.get_nowait()))
+
+
+class AccessLogMiddleware:
+    """
+    기록 대상 경로의 요청마다 레코드를 만들고, 응답을 모두 보낸 뒤(스트림 포함) 상태 코드와 응답 바이트 수를 채워 넘깁니다.
+    """
+
+    def __init__(self, app, access_log: AccessLog):
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.access_log.logs(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        record = AccessRecord(scope["method"], scope["path"])
+        token = _current.set(record)
+        status = 500
+
+        async def logged_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                record.bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, logged_send)
+        finally:
+            self.access_log.finish(record, status)
+            _current.reset(token)
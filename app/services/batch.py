@@ -0,0 +1,587 @@
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, Collection, Dict, List, Mapping, Optional, Tuple
+
+import httpx
+
+from app.services.load_balancer import LoadBalancer
+from app.services.scheduler import AdmissionController
+
+DEFAULT_BATCH_CONFIG = {
+    "enabled": False,  # /v1/batches 엔드포인트 (CLI 는 설정과 관계없이 사용 가능)
+    "directory": "batches",  # 업로드된 입력, 결과, 작업 상태 파일을 두는 디렉터리
+    "endpoint": "/v1/chat/completions",  # 줄에 url 이 없을 때 사용할 경로
+    "initial_concurrency_per_server": 4,
+    "min_concurrency_per_server": 1,
+    "max_concurrency_per_server": 32,
+    "target_waiting": 1,  # vLLM 대기 요청이 이보다 많으면 서버의 배치 동시성을 절반으로 줄임
+    "adjust_interval": 1.0,  # 동시성 재조정 주기 (초)
+    "max_attempts": 3,  # 연결 오류/429/5xx 응답 시 다른 서버로 다시 보내는 최대 시도 수
+    "retry_backoff": 1.0,  # 재시도 대기 시간 (초, 시도마다 두 배)
+    "checkpoint_interval": 5.0,  # 결과 기록과 체크포인트 저장 주기 (초)
+    "read_size": 1 << 20,  # 입력 파일을 한 번에 읽는 크기 (바이트)
+    "no_server_timeout": 60.0,  # 모델에 사용할 수 있는 서버가 이 시간 동안 없으면 남은 줄을 no_servers 오류로 기록 (초)
+}
+
+BATCH_ENDPOINTS = ("/v1/chat/completions", "/v1/completions")
+
+# 작업 요청에 붙여 업스트림으로 전달하는 인증 헤더 (상태 파일이 아닌 별도 파일에 저장)
+CREDENTIAL_HEADERS = ("authorization",)
+
+
+class AdaptiveConcurrency:
+    """
+    서버별 배치 요청 동시성 한도 (AIMD).
+
+    수집된 num_requests_waiting 이 target_waiting 이하이면 한도를 늘리고 (대기 요청이 없으면 두 배, 있으면 +1),
+    넘거나 라우터 대기열에 대화형 요청이 쌓여 있으면 절반으로 줄입니다.
+    배치 요청이 GPU 의 빈 용량만 쓰고 대화형 요청의 대기 시간을 늘리지 않도록 하기 위함입니다.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, target_waiting: float = 1):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_waiting = target_waiting
+        self.limits: Dict[str, int] = {}
+        self.active: Dict[str, int] = {}
+
+    def limit(self, server: str) -> int:
+        return self.limits.get(server, max(self.initial, self.minimum))
+
+    def adjust(self, servers_metrics: Mapping[str, Mapping[str, float]], pressure: bool = False):
+        """
+        :param pressure: 라우터 대기열에 대화형 요청이 기다리고 있으면 True
+        """
+        for server, metrics in servers_metrics.items():
+            limit = self.limit(server)
+            waiting = metrics.get("num_requests_waiting", 0)
+            if pressure or waiting > self.target_waiting:
+                limit //= 2
+            elif self.active.get(server, 0) >= limit:
+                # 한도를 다 쓰고 있을 때만 늘림 (쓰지 않는 한도가 쌓이지 않도록)
+                limit = limit * 2 if waiting == 0 else limit + 1
+            self.limits[server] = min(max(limit, self.minimum), self.maximum)
+
+    def back_off(self, server: str):
+        """
+        서버가 429/503 으로 거절했을 때 한도를 즉시 절반으로 줄입니다.
+        """
+        self.limits[server] = max(self.limit(server) // 2, self.minimum)
+
+    def acquire(self, servers: Collection[str]) -> Optional[str]:
+        """
+        남은 한도가 가장 큰 서버를 골라 점유합니다. 모든 서버가 한도에 도달했으면 None.
+        """
+        best, spare = None, 0
+        for server in servers:
+            free = self.limit(server) - self.active.get(server, 0)
+            if free > spare:
+                best, spare = server, free
+        if best is not None:
+            self.active[best] = self.active.get(best, 0) + 1
+        return best
+
+    def release(self, server: str):
+        self.active[server] = max(self.active.get(server, 1) - 1, 0)
+
+
+class BatchJob:
+    """
+    JSONL 입력 파일 하나를 처리하는 배치 작업과 그 체크포인트.
+
+    결과는 끝나는 순서대로 메모리에 모았다가 주기적으로 출력 파일에 추가하고, 그다음에 상태 파일을 원자적으로 교체합니다.
+    상태 파일에는 모든 결과가 기록된 입력 위치(offset), 그 뒤에서 이미 기록된 줄, 출력 파일 크기를 저장하므로,
+    중단된 작업은 출력 파일을 저장된 크기로 잘라 내고 offset 부터 남은 줄만 다시 처리합니다 (결과가 중복되지 않음).
+    """
+
+    def __init__(
+        self, job_id: str, input_path: str, output_path: str, state_path: str,
+        endpoint: str = "/v1/chat/completions", headers: Optional[Dict[str, str]] = None,
+        credentials: Optional[Dict[str, str]] = None, owner: Optional[str] = None,
+    ):
+        """
+        :param state_path: 작업 상태(체크포인트) 파일 경로
+        :param endpoint: 줄에 url 이 없을 때 사용할 경로
+        :param headers: 모든 요청에 붙일 헤더 (상태 파일에 저장되므로 인증 정보는 넣지 않음)
+        :param credentials: 모든 요청에 붙일 인증 헤더. 소유자만 읽을 수 있는 별도 파일에 저장하고 작업이 끝나면 지움
+        :param owner: 작업을 만든 테넌트 (이 테넌트만 작업을 조회하고 취소할 수 있음)
+        """
+        self.id = job_id
+        self.input_path = input_path
+        self.output_path = output_path
+        self.state_path = state_path
+        self.credentials_path = os.path.splitext(state_path)[0] + ".credentials"
+        self.endpoint = endpoint
+        self.headers = headers or {}
+        self.credentials = credentials or {}
+        self.owner = owner
+        self.status = "in_progress"
+        self.created_at = int(time.time())
+        self.completed_at: Optional[int] = None
+        self.counts = {"completed": 0, "failed": 0}
+        self.offset = 0  # 이 위치 이전의 줄은 모두 결과가 기록됨
+        self.line = 0  # offset 위치의 줄 번호
+        self.output_size = 0
+        self.done: Dict[int, int] = {}  # offset 이후에 결과가 기록된 줄 {시작 위치: 줄 번호}
+        self.read_offset = 0
+        self.read_line = 0
+        self._outstanding: Dict[int, int] = {}  # 읽었지만 결과가 아직 기록되지 않은 줄
+        self._results: List[Tuple[int, str, bool]] = []
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def load(cls, state_path: str) -> "BatchJob":
+        with open(state_path) as f:
+            state = json.load(f)
+        job = cls(
+            state["id"], state["input_path"], state["output_path"], state_path, state["endpoint"], state["headers"],
+            owner=state.get("owner"),
+        )
+        job.status = state["status"]
+        job.created_at = state["created_at"]
+        job.completed_at = state["completed_at"]
+        job.counts = state["counts"]
+        job.offset = job.read_offset = state["offset"]
+        job.line = job.read_line = state["line"]
+        job.output_size = state["output_size"]
+        job.done = {int(offset): line for offset, line in state["done"].items()}
+        if os.path.exists(job.credentials_path):
+            with open(job.credentials_path) as f:
+                job.credentials = json.load(f)
+        return job
+
+    @property
+    def request_headers(self) -> Dict[str, str]:
+        return {**self.headers, **self.credentials}
+
+    @property
+    def in_progress(self) -> int:
+        return len(self._outstanding) - len(self._results)
+
+    def begin(self, offset: int, line: int):
+        self._outstanding[offset] = line
+
+    def add_result(self, offset: int, record: Dict, failed: bool = False):
+        self._results.append((offset, json.dumps(record, ensure_ascii=False) + "\n", failed))
+
+    def _append_output(self, lines: List[str]) -> int:
+        with open(self.output_path, "ab") as f:
+            f.write("".join(lines).encode())
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def _write_state(self, state: Dict):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def save_credentials(self):
+        if not self.credentials:
+            return
+        fd = os.open(self.credentials_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.credentials, f)
+
+    def remove_credentials(self):
+        try:
+            os.remove(self.credentials_path)
+        except FileNotFoundError:
+            pass
+
+    def prepare(self):
+        """
+        출력 파일에서 마지막 체크포인트 이후에 기록된 (상태 파일에 반영되지 않은) 결과를 잘라 냅니다.
+        """
+        with open(self.output_path, "a+b") as f:
+            f.truncate(self.output_size)
+
+    def state(self) -> Dict:
+        return {
+            "id": self.id,
+            "input_path": self.input_path,
+            "output_path": self.output_path,
+            "endpoint": self.endpoint,
+            "headers": self.headers,
+            "owner": self.owner,
+            "status": self.status,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "counts": self.counts,
+            "offset": self.offset,
+            "line": self.line,
+            "output_size": self.output_size,
+            "done": {str(offset): line for offset, line in self.done.items()},
+        }
+
+    async def checkpoint(self):
+        """
+        모인 결과를 출력 파일에 추가한 뒤 상태 파일을 교체합니다 (파일 쓰기는 스레드에서).
+        """
+        async with self._lock:
+            results, self._results = self._results, []
+            if results:
+                self.output_size = await asyncio.to_thread(self._append_output, [line for _, line, _ in results])
+            for offset, _, failed in results:
+                self.done[offset] = self._outstanding.pop(offset)
+                self.counts["failed" if failed else "completed"] += 1
+            if self._outstanding:
+                self.offset = min(self._outstanding)
+                self.line = self._outstanding[self.offset]
+            else:
+                self.offset, self.line = self.read_offset, self.read_line
+            self.done = {offset: line for offset, line in self.done.items() if offset >= self.offset}
+            await asyncio.to_thread(self._write_state, self.state())
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "object": "batch",
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "request_counts": {
+                "total": self.counts["completed"] + self.counts["failed"] + len(self._outstanding),
+                **self.counts,
+            },
+        }
+
+
+def _no_servers_error(model_name: str) -> Dict:
+    return {"code": "no_servers", "message": f"No available servers for model {model_name}."}
+
+
+def _status_of(error: BaseException) -> Optional[int]:
+    cause = error.__cause__ if isinstance(error, RuntimeError) else error
+    if isinstance(cause, httpx.HTTPStatusError):
+        return cause.response.status_code
+    return None
+
+
+def _error_body(error: BaseException) -> object:
+    cause = error.__cause__ if isinstance(error, RuntimeError) else error
+    if isinstance(cause, httpx.HTTPStatusError):
+        try:
+            return cause.response.json()
+        except ValueError:
+            return cause.response.text
+    return None
+
+
+class BatchRunner:
+    """
+    배치 작업의 줄을 모델의 모든 서버에 나눠 보냅니다.
+
+    - 입력은 read_size 단위로 스레드에서 읽어 전체를 메모리에 올리지 않음
+    - 서버별 동시성은 AdaptiveConcurrency 로 제한하며, 한도에 여유가 있을 때만 다음 줄을 읽음
+    - 요청은 대기열(AdmissionController)을 거치지 않고 LoadBalancer.forward_request 로 바로 보냄
+    - 연결 오류와 429/5xx 는 다른 서버로 재시도하고, 그 밖의 오류는 해당 줄의 error 로 기록
+    - 모델에 사용할 수 있는 서버가 no_server_timeout 동안 없으면 기다리지 않고 줄을 no_servers 오류로 기록
+    """
+
+    def __init__(self, load_balancer: LoadBalancer, admission: Optional[AdmissionController] = None, **config):
+        """
+        :param admission: 대화형 요청 대기열 (대기 중인 요청이 있으면 배치 동시성을 줄임)
+        :param config: DEFAULT_BATCH_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_BATCH_CONFIG, **config}
+        self.load_balancer = load_balancer
+        self.admission = admission
+        self.endpoint = options["endpoint"]
+        self.adjust_interval = float(options["adjust_interval"])
+        self.max_attempts = int(options["max_attempts"])
+        self.retry_backoff = float(options["retry_backoff"])
+        self.checkpoint_interval = float(options["checkpoint_interval"])
+        self.read_size = int(options["read_size"])
+        self.no_server_timeout = float(options["no_server_timeout"])
+        self.concurrency = AdaptiveConcurrency(
+            int(options["initial_concurrency_per_server"]),
+            int(options["min_concurrency_per_server"]),
+            int(options["max_concurrency_per_server"]),
+            float(options["target_waiting"]),
+        )
+        self._released = asyncio.Event()
+        self._adjusted: Dict[str, Tuple[Mapping, float]] = {}
+        self._no_servers_since: Dict[str, float] = {}  # 모델 -> 사용할 수 있는 서버가 없어진 시각
+
+    def _pressure(self, model_name: str) -> bool:
+        if self.admission is None or not self.admission.enabled:
+            return False
+        queue = self.admission.queues.get(model_name)
+        return queue is not None and queue.queued > 0
+
+    def _adjust(self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]]):
+        # 새 스냅샷마다 한 번 (대화형 대기열 압력은 adjust_interval 마다) 재조정
+        now = time.monotonic()
+        snapshot, adjusted_at = self._adjusted.get(model_name, (None, 0.0))
+        if snapshot is servers_metrics and now - adjusted_at < self.adjust_interval:
+            return
+        pressure = self._pressure(model_name)
+        if snapshot is not servers_metrics or pressure:
+            self.concurrency.adjust(servers_metrics, pressure)
+        self._adjusted[model_name] = (servers_metrics, now)
+
+    async def _reserve(self, model_name: str, exclude: Optional[str] = None) -> Optional[str]:
+        """
+        한도에 여유가 있는 서버가 생길 때까지 기다렸다가 점유합니다.
+
+        :return: 점유한 서버. 수집된 메트릭이 있고 차단되지 않은 서버가 no_server_timeout 동안 없으면 None
+        """
+        while True:
+            lb = self.load_balancer
+            servers_metrics = lb.health.filter(model_name, lb.metrics_collector.get_metrics(model_name))
+            if not servers_metrics:
+                # 모델 단위로 기록하므로 시간이 지난 뒤의 줄은 기다리지 않고 바로 실패
+                since = self._no_servers_since.setdefault(model_name, time.monotonic())
+                if time.monotonic() - since >= self.no_server_timeout:
+                    return None
+            else:
+                self._no_servers_since.pop(model_name, None)
+                self._adjust(model_name, servers_metrics)
+                candidates = [server for server in servers_metrics if server != exclude] or list(servers_metrics)
+                server = self.concurrency.acquire(candidates)
+                if server is not None:
+                    return server
+            self._released.clear()
+            try:
+                await asyncio.wait_for(self._released.wait(), self.adjust_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release(self, server: str):
+        self.concurrency.release(server)
+        self._released.set()
+
+    def _parse(self, job: BatchJob, raw: bytes, line: int) -> Tuple[str, str, Optional[Dict], Optional[Dict]]:
+        """
+        :return: (custom_id, 경로, 요청 본문, 오류). 줄이 OpenAI 배치 형식이 아니면 줄 전체를 요청 본문으로 봅니다.
+        """
+        custom_id = str(line)
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return custom_id, job.endpoint, None, {"code": "invalid_json", "message": "Line is not valid JSON."}
+        if not isinstance(item, dict):
+            return custom_id, job.endpoint, None, {"code": "invalid_request", "message": "Line must be an object."}
+        if "body" in item:
+            custom_id = str(item.get("custom_id", custom_id))
+            path, body = item.get("url") or job.endpoint, item["body"]
+        else:
+            path, body = job.endpoint, item
+        if path not in BATCH_ENDPOINTS:
+            return custom_id, path, None, {"code": "invalid_url", "message": f"Unsupported url: {path}"}
+        if not isinstance(body, dict) or not isinstance(body.get("model"), str):
+            return custom_id, path, None, {"code": "invalid_request", "message": "Request body must specify a model."}
+        if body["model"] not in self.load_balancer.metrics_collector.servers:
+            return custom_id, path, None, {"code": "model_not_found", "message": f"Unknown model: {body['model']}"}
+        if body.get("stream"):
+            body = {**body, "stream": False}
+        return custom_id, path, body, None
+
+    async def _process(
+        self, job: BatchJob, offset: int, line: int, custom_id: str, path: str, body: Dict, server: str
+    ):
+        record = {"id": f"{job.id}-{line}", "custom_id": custom_id, "response": None, "error": None}
+        attempt = 1
+        while True:
+            try:
+                response = await self.load_balancer.forward_request(server, path, body, job.request_headers)
+                record["response"] = {"status_code": 200, "body": response}
+                break
+            except Exception as e:
+                status = _status_of(e)
+                if status in (429, 503):
+                    self.concurrency.back_off(server)
+                retryable = isinstance(e, RuntimeError) and (status is None or status == 429 or status >= 500)
+                if not retryable or attempt >= self.max_attempts:
+                    if status is not None:
+                        record["response"] = {"status_code": status, "body": _error_body(e)}
+                    record["error"] = {"code": "request_failed", "message": str(e)}
+                    break
+            finally:
+                self._release(server)
+            await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            attempt += 1
+            server = await self._reserve(body["model"], exclude=server)
+            if server is None:
+                record["error"] = _no_servers_error(body["model"])
+                break
+        job.add_result(offset, record, failed=record["error"] is not None)
+
+    async def _checkpoint_loop(self, job: BatchJob):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await job.checkpoint()
+
+    def _open(self, path: str, offset: int):
+        f = open(path, "rb")
+        f.seek(offset)
+        return f
+
+    def _read(self, f, size: int) -> List[bytes]:
+        return f.readlines(size)
+
+    async def run(self, job: BatchJob):
+        """
+        작업을 끝까지 (또는 취소될 때까지) 처리합니다. 취소되어도 그때까지의 결과와 체크포인트를 저장합니다.
+        """
+        await asyncio.to_thread(job.prepare)
+        tasks = set()
+        checkpointer = asyncio.create_task(self._checkpoint_loop(job))
+        try:
+            f = await asyncio.to_thread(self._open, job.input_path, job.read_offset)
+            try:
+                while True:
+                    lines = await asyncio.to_thread(self._read, f, self.read_size)
+                    if not lines:
+                        break
+                    for raw in lines:
+                        offset, line = job.read_offset, job.read_line
+                        job.read_offset += len(raw)
+                        job.read_line += 1
+                        if offset in job.done or not raw.strip():
+                            continue
+                        job.begin(offset, line)
+                        custom_id, path, body, error = self._parse(job, raw, line)
+                        if error is not None:
+                            job.add_result(
+                                offset, {"id": f"{job.id}-{line}", "custom_id": custom_id, "response": None,
+                                         "error": error}, failed=True,
+                            )
+                            continue
+                        server = await self._reserve(body["model"])
+                        if server is None:
+                            job.add_result(
+                                offset, {"id": f"{job.id}-{line}", "custom_id": custom_id, "response": None,
+                                         "error": _no_servers_error(body["model"])}, failed=True,
+                            )
+                            continue
+                        task = asyncio.create_task(self._process(job, offset, line, custom_id, path, body, server))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+            finally:
+                await asyncio.to_thread(f.close)
+            if tasks:
+                await asyncio.gather(*tasks)
+            job.status = "completed"
+            job.completed_at = int(time.time())
+        except Exception as e:
+            print(f"Batch {job.id} failed: {e!r}")
+            job.status = "failed"
+        finally:
+            checkpointer.cancel()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(checkpointer, *tasks, return_exceptions=True)
+            await asyncio.shield(job.checkpoint())
+            if job.status != "in_progress":
+                job.remove_credentials()  # 이어서 처리할 일이 없으면 인증 정보를 남기지 않음
+
+
+class BatchManager:
+    """
+    /v1/batches 로 만든 작업의 입력 저장, 실행, 조회, 취소. 라우터가 다시 시작되면 끝나지 않은 작업을 이어서 처리합니다.
+    """
+
+    def __init__(self, runner: BatchRunner, directory: str = "batches"):
+        self.runner = runner
+        self.directory = directory
+        self.jobs: Dict[str, BatchJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    async def create(
+        self, chunks: AsyncIterator[bytes], endpoint: Optional[str] = None, headers: Optional[Dict[str, str]] = None
+    ) -> BatchJob:
+        """
+        업로드 스트림을 입력 파일로 저장하고 작업을 시작합니다.
+
+        :param headers: 요청 헤더 (테넌트 식별자와 인증 헤더만 작업에 남김)
+        """
+        await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+        job_id = f"batch_{os.urandom(8).hex()}"
+        input_path = self._path(job_id, "input.jsonl")
+        f = await asyncio.to_thread(open, input_path, "wb")
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        headers = headers or {}
+        owner = self.owner(headers)
+        job = BatchJob(
+            job_id, input_path, self._path(job_id, "output.jsonl"), self._path(job_id, "json"),
+            endpoint or self.runner.endpoint, self.runner.load_balancer.tenants.forwarded_headers(owner),
+            {name: headers[name] for name in CREDENTIAL_HEADERS if headers.get(name)}, owner,
+        )
+        await asyncio.to_thread(job.save_credentials)
+        await job.checkpoint()
+        self._start(job)
+        return job
+
+    def _start(self, job: BatchJob):
+        self.jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self.runner.run(job))
+
+    async def resume(self):
+        """
+        디렉터리의 작업 상태 파일을 읽어 끝나지 않은 작업을 다시 시작합니다.
+        """
+        if not await asyncio.to_thread(os.path.isdir, self.directory):
+            return
+        for name in sorted(await asyncio.to_thread(os.listdir, self.directory)):
+            if not name.endswith(".json"):
+                continue
+            job = await asyncio.to_thread(BatchJob.load, os.path.join(self.directory, name))
+            if job.status == "in_progress":
+                self._start(job)
+                print(f"Batch {job.id} resumed from line {job.line}")
+            else:
+                self.jobs[job.id] = job
+
+    def owner(self, headers: Mapping[str, str]) -> str:
+        """
+        요청자의 테넌트. 작업을 만든 테넌트만 작업을 조회하고 취소할 수 있습니다.
+        """
+        return self.runner.load_balancer.tenants(headers)
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[BatchJob]:
+        """
+        :param owner: 지정하면 이 테넌트가 만든 작업만 반환 (다른 테넌트의 작업은 없는 것처럼 None)
+        """
+        job = self.jobs.get(job_id)
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def owned(self, owner: str) -> List[BatchJob]:
+        return [job for job in self.jobs.values() if job.owner == owner]
+
+    async def cancel(self, job_id: str) -> Optional[BatchJob]:
+        job = self.jobs.get(job_id)
+        task = self._tasks.pop(job_id, None)
+        if job is None or task is None or task.done():
+            return job
+        job.status = "cancelled"
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return job
+
+    async def aclose(self):
+        """
+        실행 중인 작업을 멈춥니다. 상태는 in_progress 로 남아 다음 시작 시 이어서 처리됩니다.
+        """
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+DEFAULT_FANOUT_CONFIG = {
+    "enabled": False,
+    "min_n": 2,  # n 이 이 값 이상인 요청만 나눔
+    "max_splits": 8,  # 요청 하나를 나눌 최대 서버 수
+}
+
+
+class FanOut:
+    """
+    n > 1 요청을 여러 서버로 나누고 결과를 합칩니다.
+
+    - 서버 k 개에 n 을 고르게 나눔 (앞쪽 서버가 나머지를 하나씩 더 받음)
+    - seed 가 있으면 하위 요청마다 seed 를 앞선 choice 수만큼 늘려 같은 표본이 반복되지 않게 함
+    - 일반 응답은 choices 를 이어 붙이고 index 를 다시 매기며 usage 는 합산
+    - 스트림은 하위 스트림의 이벤트를 도착 순서대로 섞어 하나의 SSE 스트림으로 내보냄
+    """
+
+    def __init__(self, **config):
+        """
+        :param config: DEFAULT_FANOUT_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_FANOUT_CONFIG, **config}
+        self.enabled = bool(options["enabled"])
+        self.min_n = max(int(options["min_n"]), 2)
+        self.max_splits = int(options["max_splits"])
+        self.stats = {"requests": 0, "sub_requests": 0}
+
+    def splits(self, body: Dict) -> int:
+        """
+        요청을 나눌 최대 하위 요청 수. 나누지 않을 요청이면 1.
+        """
+        n = body.get("n")
+        if not self.enabled or not isinstance(n, int) or n < self.min_n:
+            return 1
+        if body.get("best_of") is not None or body.get("use_beam_search"):
+            return 1  # 후보 전체를 한 서버에서 비교해야 하는 요청
+        return min(n, self.max_splits)
+
+    @staticmethod
+    def sub_requests(body: Dict, parts: int) -> List[Dict]:
+        """
+        :return: 서버별 하위 요청 본문 (원본 바이트 없이 다시 인코딩되는 dict)
+        """
+        n = body["n"]
+        counts = [n // parts + (1 if i < n % parts else 0) for i in range(parts)]
+        requests, offset = [], 0
+        for count in counts:
+            request = {**body, "n": count}
+            if isinstance(body.get("seed"), int):
+                request["seed"] = body["seed"] + offset
+            requests.append(request)
+            offset += count
+        return requests
+
+    @staticmethod
+    def merge_responses(responses: List[Dict]) -> Dict:
+        """
+        하위 응답의 choices 를 차례로 이어 붙여 index 를 다시 매기고 usage 의 숫자 필드를 합산합니다.
+        """
+        merged = dict(responses[0])
+        choices, usage = [], {}
+        for response in responses:
+            offset = len(choices)
+            for choice in sorted(response.get("choices") or [], key=lambda c: c.get("index", 0)):
+                choices.append({**choice, "index": offset + choice.get("index", 0)})
+            _add_usage(usage, response.get("usage"))
+        merged["choices"] = choices
+        if usage:
+            merged["usage"] = usage
+        return merged
+
+    async def merge_streams(self, streams: List[AsyncIterator[bytes]], offsets: List[int]) -> AsyncIterator[bytes]:
+        """
+        하위 스트림을 동시에 읽어 이벤트 단위로 섞습니다.
+
+        choice index 에 하위 스트림의 offset 을 더하고 id 는 첫 이벤트의 id 로 맞춥니다.
+        하위 스트림의 usage 전용 청크와 [DONE] 은 모아 두었다가 끝에 한 번만 보냅니다.
+        하위 스트림 하나가 실패하면 나머지를 닫고 오류를 전파합니다.
+
+        :param offsets: 하위 스트림별 첫 choice 의 index
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=len(streams) * 4)
+
+        async def pump(position: int, chunks: AsyncIterator[bytes]):
+            events = _SseEvents()
+            try:
+                async for chunk in chunks:
+                    for event in events.feed(chunk):
+                        await queue.put((position, event))
+                await queue.put((position, None))
+            except Exception as e:
+                await queue.put((position, e))
+
+        tasks = [asyncio.create_task(pump(position, chunks)) for position, chunks in enumerate(streams)]
+        remaining = len(tasks)
+        response_id: Optional[str] = None
+        last: Optional[Dict] = None
+        usage: Dict = {}
+        try:
+            while remaining:
+                position, event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                if isinstance(event, Exception):
+                    raise event
+                data = _event_data(event)
+                if data is None:
+                    yield event + b"\n\n"  # 주석/keep-alive 등 data 가 아닌 이벤트
+                    continue
+                if data == b"[DONE]":
+                    continue
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    yield event + b"\n\n"
+                    continue
+                if response_id is None:
+                    response_id = chunk.get("id")
+                chunk["id"] = response_id
+                choices = chunk.get("choices") or []
+                if not choices and chunk.get("usage"):
+                    _add_usage(usage, chunk["usage"])
+                    last = chunk
+                    continue
+                for choice in choices:
+                    choice["index"] = offsets[position] + choice.get("index", 0)
+                yield b"data: " + json.dumps(chunk, ensure_ascii=False).encode() + b"\n\n"
+            if usage:
+                yield b"data: " + json.dumps({**last, "usage": usage}, ensure_ascii=False).encode() + b"\n\n"
+            yield b"data: [DONE]\n\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for chunks in streams:
+                await chunks.aclose()
+
+
+def _add_usage(total: Dict, usage: Optional[Dict]):
+    for key, value in (usage or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+
+
+def _event_data(event: bytes) -> Optional[bytes]:
+    """
+    이벤트의 data 필드 값. data 줄이 없으면 None.
+    """
+    lines = [line[5:].strip() for line in event.split(b"\n") if line.startswith(b"data:")]
+    return b"\n".join(lines) if lines else None
+
+
+class _SseEvents:
+    """
+    청크 경계와 무관하게 SSE 바이트를 이벤트(빈 줄로 끝나는 단위) 단위로 나눕니다.
+    """
+
+    __slots__ = ("_tail",)
+
+    def __init__(self):
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        data = self._tail + chunk
+        if b"\r" in data:
+            data = data.replace(b"\r\n", b"\n")
+        events = data.split(b"\n\n")
+        self._tail = events.pop()
+        return [event for event in events if event]
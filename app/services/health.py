@@ -0,0 +1,238 @@
+import asyncio
+import random
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+import httpx
+
+DEFAULT_HEALTH_CONFIG = {
+    "enabled": True,
+    "probe_path": "/health",
+    "probe_interval": 5.0,  # 능동 헬스 체크 주기 (초)
+    "probe_timeout": 2.0,
+    "consecutive_failures": 5,  # 연속 실패가 이 횟수에 도달하면 차단
+    "base_ejection_time": 10.0,  # 첫 차단 시간 (초), 반복될수록 배수로 증가
+    "max_ejection_time": 300.0,
+    "trial_timeout": 30.0,  # half-open 시험 요청 결과를 기다리는 최대 시간
+    "slow_start": 30.0,  # 복구 후 가중치를 1 까지 올리는 시간 (초)
+    "slow_start_min_weight": 0.1,
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+PROBING = "probing"  # half-open 상태에서 시험 요청이 진행 중
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    서버 이상으로 볼 오류인지 판단합니다. 5xx, 타임아웃, 연결 거부/끊김만 해당하며 4xx 는 클라이언트 오류로 봅니다.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class ServerHealth:
+    """
+    서버 하나의 서킷 브레이커 상태.
+    """
+
+    __slots__ = ("state", "consecutive_failures", "ejections", "opened_until", "probing_since")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.opened_until = 0.0
+        self.probing_since = 0.0
+
+
+class HealthChecker:
+    """
+    능동 헬스 체크 + 수동 이상치 감지 기반 서킷 브레이커.
+
+    - 연속 5xx/타임아웃/연결 실패가 consecutive_failures 에 도달하면 서버를 차단(open)
+    - 차단 시간이 지나면 half-open 으로 전환해 시험 요청 하나만 허용, 성공 시 복구(closed)
+    - 복구된 서버는 slow_start 동안 선택 가중치를 점진적으로 올림
+    - 차단된 서버는 모든 전략의 후보에서 제외 (전부 차단되면 전체 후보를 그대로 사용)
+    """
+
+    def __init__(
+        self,
+        servers: Callable[[], Iterable[str]],
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **config,
+    ):
+        """
+        :param servers: 능동 헬스 체크 대상 서버 목록을 반환하는 함수
+        :param transport: 테스트/벤치마크용 httpx 트랜스포트
+        """
+        options = {**DEFAULT_HEALTH_CONFIG, **config}
+        self.servers = servers
+        self.transport = transport
+        self.enabled = bool(options["enabled"])
+        self.probe_path = options["probe_path"]
+        self.probe_interval = float(options["probe_interval"])
+        self.probe_timeout = float(options["probe_timeout"])
+        self.consecutive_failures = int(options["consecutive_failures"])
+        self.base_ejection_time = float(options["base_ejection_time"])
+        self.max_ejection_time = float(options["max_ejection_time"])
+        self.trial_timeout = float(options["trial_timeout"])
+        self.slow_start = float(options["slow_start"])
+        self.slow_start_min_weight = float(options["slow_start_min_weight"])
+
+        self._health: Dict[str, ServerHealth] = {}
+        self._unavailable: set = set()  # open 또는 probing 상태 서버
+        self._slow_start: Dict[str, float] = {}  # 서버 -> 복구 시각
+        self._version = 0
+        self._filtered: Dict[str, Tuple[Mapping, int, Mapping]] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get(self, server: str) -> ServerHealth:
+        health = self._health.get(server)
+        if health is None:
+            health = self._health[server] = ServerHealth()
+        return health
+
+    def _set_state(self, server: str, health: ServerHealth, state: str):
+        health.state = state
+        if state in (OPEN, PROBING):
+            self._unavailable.add(server)
+        else:
+            self._unavailable.discard(server)
+        self._version += 1
+
+    def state(self, server: str) -> str:
+        health = self._health.get(server)
+        return health.state if health else CLOSED
+
+    def is_available(self, server: str) -> bool:
+        return server not in self._unavailable
+
+    def filter(self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]]) -> Mapping:
+        """
+        차단된 서버를 뺀 후보 스냅샷을 반환합니다. 스냅샷과 상태가 그대로면 이전 결과를 재사용합니다.
+        """
+        if not self.enabled or not self._unavailable:
+            return servers_metrics
+        cached = self._filtered.get(model_name)
+        if cached is not None and cached[0] is servers_metrics and cached[1] == self._version:
+            return cached[2]
+        available = {server: metrics for server, metrics in servers_metrics.items() if server not in self._unavailable}
+        # 모든 서버가 차단되면 (panic) 전체 후보로 라우팅
+        filtered = MappingProxyType(available) if available else servers_metrics
+        self._filtered[model_name] = (servers_metrics, self._version, filtered)
+        return filtered
+
+    def weight(self, server: str) -> float:
+        """
+        slow-start 가중치 (0~1). 복구 직후에는 slow_start_min_weight 에서 시작해 선형으로 증가합니다.
+        """
+        recovered_at = self._slow_start.get(server)
+        if recovered_at is None:
+            return 1.0
+        progress = (time.monotonic() - recovered_at) / self.slow_start if self.slow_start > 0 else 1.0
+        if progress >= 1.0:
+            del self._slow_start[server]
+            return 1.0
+        return self.slow_start_min_weight + (1.0 - self.slow_start_min_weight) * progress
+
+    def admit_slow_start(self, server: str) -> bool:
+        """
+        slow-start 중인 서버를 가중치 확률로만 통과시킵니다.
+        """
+        return not self._slow_start or random.random() < self.weight(server)
+
+    def on_selected(self, server: str):
+        """
+        half-open 서버가 선택되면 시험 요청으로 표시해 결과가 나올 때까지 다른 요청을 막습니다.
+        """
+        health = self._health.get(server)
+        if health is not None and health.state == HALF_OPEN:
+            health.probing_since = time.monotonic()
+            self._set_state(server, health, PROBING)
+
+    def record_success(self, server: str):
+        health = self._health.get(server)
+        if health is None:
+            return
+        health.consecutive_failures = 0
+        if health.state in (HALF_OPEN, PROBING):
+            health.ejections = 0
+            self._slow_start[server] = time.monotonic()
+            self._set_state(server, health, CLOSED)
+
+    def record_failure(self, server: str):
+        if not self.enabled:
+            return
+        health = self._get(server)
+        health.consecutive_failures += 1
+        if health.state in (HALF_OPEN, PROBING) or (
+            health.state == CLOSED and health.consecutive_failures >= self.consecutive_failures
+        ):
+            self._eject(server, health)
+
+    def _eject(self, server: str, health: ServerHealth):
+        health.ejections += 1
+        ejection_time = min(self.base_ejection_time * health.ejections, self.max_ejection_time)
+        health.opened_until = time.monotonic() + ejection_time
+        self._slow_start.pop(server, None)
+        self._set_state(server, health, OPEN)
+        print(f"Ejected {server} for {ejection_time:.0f}s after {health.consecutive_failures} failures")
+
+    def tick(self):
+        """
+        시간 경과에 따른 상태 전환: 차단 시간이 끝난 서버는 half-open, 응답 없는 시험 요청은 다시 half-open.
+        """
+        now = time.monotonic()
+        for server, health in self._health.items():
+            if health.state == OPEN and now >= health.opened_until:
+                self._set_state(server, health, HALF_OPEN)
+            elif health.state == PROBING and now - health.probing_since >= self.trial_timeout:
+                self._set_state(server, health, HALF_OPEN)
+
+    async def probe(self, server: str):
+        """
+        능동 헬스 체크 1회. 실패는 수동 감지와 같은 방식으로 집계하고,
+        차단 시간이 지난 서버의 성공은 half-open 시험을 거치지 않고 바로 복구합니다.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.probe_timeout, transport=self.transport)
+        try:
+            response = await self._client.get(f"{server}{self.probe_path}")
+            healthy = response.status_code < 500
+        except httpx.HTTPError:
+            healthy = False
+        if not healthy:
+            self.record_failure(server)
+        elif self.state(server) in (HALF_OPEN, PROBING):
+            self.record_success(server)
+
+    async def run(self):
+        """
+        주기적으로 상태를 전환하고 모든 서버에 능동 헬스 체크를 보냅니다.
+        """
+        if not self.enabled:
+            return
+        try:
+            while True:
+                self.tick()
+                await asyncio.gather(*(self.probe(server) for server in self.servers()))
+                await asyncio.sleep(self.probe_interval)
+        finally:
+            if self._client is not None:
+                client, self._client = self._client, None
+                await client.aclose()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            server: {
+                "state": health.state,
+                "consecutive_failures": health.consecutive_failures,
+                "ejections": health.ejections,
+                "weight": self.weight(server),
+            }
+            for server, health in self._health.items()
+        }
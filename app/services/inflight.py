@@ -0,0 +1,219 @@
+import asyncio
+import heapq
+import random
+from typing import Callable, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.services.shared_state import REQUESTS, STREAMS, SharedState
+
+
+class InflightTracker:
+    """
+    라우터가 직접 관리하는 서버별 진행 중 요청/스트림 카운터.
+
+    수집 주기와 무관하게 요청 전달 시점에 증가하고, 응답 완료/스트림 종료/취소 시점에 감소합니다.
+    shared 가 있으면 카운터를 워커 프로세스 간에 공유하고, 조회 시 모든 워커의 합계를 반환합니다.
+    """
+
+    def __init__(self, shared: Optional[SharedState] = None):
+        """
+        :param shared: 여러 워커 프로세스가 공유하는 상태 (없으면 이 프로세스의 카운터만 사용)
+        """
+        self.requests: Dict[str, int] = {}
+        self.streams: Dict[str, int] = {}
+        self.shared = shared
+        self._totals: Dict[str, int] = {}  # 마지막으로 본 전체 워커 합계 (다른 워커의 변경 감지용)
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """
+        카운터가 바뀔 때마다 호출될 콜백을 등록합니다.
+
+        :param callback: callback(server_url)
+        """
+        self._listeners.append(callback)
+
+    def acquire(self, server: str, stream: bool = False):
+        self.requests[server] = self.requests.get(server, 0) + 1
+        if stream:
+            self.streams[server] = self.streams.get(server, 0) + 1
+        if self.shared is not None:
+            self.shared.add(REQUESTS, f"s:{server}", 1)
+            if stream:
+                self.shared.add(STREAMS, f"s:{server}", 1)
+        for callback in self._listeners:
+            callback(server)
+
+    def release(self, server: str, stream: bool = False):
+        if self.shared is not None and self.requests.get(server, 0) > 0:
+            self.shared.add(REQUESTS, f"s:{server}", -1)
+            if stream and self.streams.get(server, 0) > 0:
+                self.shared.add(STREAMS, f"s:{server}", -1)
+        self.requests[server] = max(self.requests.get(server, 0) - 1, 0)
+        if stream:
+            self.streams[server] = max(self.streams.get(server, 0) - 1, 0)
+        for callback in self._listeners:
+            callback(server)
+
+    def get_requests(self, server: str) -> int:
+        if self.shared is not None:
+            total = self.shared.total(REQUESTS, f"s:{server}")
+            if total is not None:
+                self._totals[server] = total
+                return total
+        return self.requests.get(server, 0)
+
+    def get_streams(self, server: str) -> int:
+        if self.shared is not None:
+            total = self.shared.total(STREAMS, f"s:{server}")
+            if total is not None:
+                return total
+        return self.streams.get(server, 0)
+
+    def sync_shared(self):
+        """
+        다른 워커가 바꾼 서버의 카운터를 감지해 리스너(인덱스)에 알립니다.
+        """
+        for server, previous in list(self._totals.items()):
+            total = self.shared.total(REQUESTS, f"s:{server}")
+            if total != previous:
+                self._totals[server] = total
+                for callback in self._listeners:
+                    callback(server)
+
+    async def run_sync(self):
+        """
+        shared 가 있을 때 주기적으로 종료된 워커의 카운터를 지우고 sync_shared 를 실행합니다.
+        """
+        if self.shared is None:
+            return
+        while True:
+            await asyncio.sleep(self.shared.poll_interval)
+            self.shared.reap_workers()
+            self.sync_shared()
+
+
+def pick_two(servers: Sequence[str], exclude: Collection[str] = ()) -> Tuple[Optional[str], Optional[str]]:
+    """
+    exclude 에 없는 서로 다른 두 서버를 무작위로 고릅니다. 후보가 하나면 (서버, None), 없으면 (None, None).
+    재시도 제외 목록은 보통 몇 개뿐이므로 다시 뽑고, 몇 번 뽑아도 모자랄 때만 후보를 걸러서 고릅니다.
+    """
+    if not exclude:
+        if len(servers) < 2:
+            return (servers[0] if servers else None), None
+        i = random.randrange(len(servers))
+        j = random.randrange(len(servers) - 1)
+        return servers[i], servers[j + 1 if j >= i else j]
+    picked: List[str] = []
+    for _ in range(8 if servers else 0):
+        server = servers[random.randrange(len(servers))]
+        if server not in exclude and server not in picked:
+            picked.append(server)
+            if len(picked) == 2:
+                return picked[0], picked[1]
+    candidates = [server for server in servers if server not in exclude]
+    if len(candidates) < 2:
+        return (candidates[0] if candidates else None), None
+    first, second = random.sample(candidates, 2)
+    return first, second
+
+
+class OutstandingRequestsIndex:
+    """
+    모델별 최소 미처리 요청(least outstanding requests) 서버를 O(log n) 으로 찾기 위한 힙 인덱스.
+
+    점수 = 진행 중 요청 수 + queue_weight * 수집된 대기 요청 수.
+    카운터가 바뀌면 새 항목을 힙에 넣고, 오래된 항목은 꺼낼 때 버리는 지연 무효화 방식을 사용합니다.
+    인덱스는 모델 스냅샷이 바뀔 때만 다시 만들고, 재시도 제외 목록은 꺼내는 동안 건너뜁니다.
+    """
+
+    def __init__(self, inflight: InflightTracker, queue_weight: float = 1.0):
+        self.inflight = inflight
+        self.queue_weight = queue_weight
+        self._snapshots: Dict[str, Mapping[str, Mapping[str, float]]] = {}
+        self._servers: Dict[str, Tuple[str, ...]] = {}
+        self._heaps: Dict[str, List[Tuple[float, str]]] = {}
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._models_by_server: Dict[str, List[str]] = {}
+        inflight.add_listener(self._on_change)
+
+    def score(self, server: str, metrics: Mapping[str, float]) -> float:
+        return self.inflight.get_requests(server) + self.queue_weight * metrics.get("num_requests_waiting", 0)
+
+    def _rebuild(self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]]):
+        previous = self._servers.get(model_name, ())
+        for server in previous:
+            models = self._models_by_server.get(server, [])
+            if model_name in models:
+                models.remove(model_name)
+        scores = {server: self.score(server, metrics) for server, metrics in servers_metrics.items()}
+        heap = [(score, server) for server, score in scores.items()]
+        heapq.heapify(heap)
+        self._snapshots[model_name] = servers_metrics
+        self._servers[model_name] = tuple(servers_metrics)
+        self._scores[model_name] = scores
+        self._heaps[model_name] = heap
+        for server in servers_metrics:
+            self._models_by_server.setdefault(server, []).append(model_name)
+
+    def servers(self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]]) -> Tuple[str, ...]:
+        """
+        스냅샷이 바뀌었으면 인덱스를 다시 만들고 후보 서버 튜플을 반환합니다.
+        """
+        if self._snapshots.get(model_name) is not servers_metrics:
+            self._rebuild(model_name, servers_metrics)
+        return self._servers[model_name]
+
+    def _on_change(self, server: str):
+        for model_name in self._models_by_server.get(server, ()):
+            snapshot = self._snapshots[model_name]
+            score = self.score(server, snapshot[server])
+            self._scores[model_name][server] = score
+            heap = self._heaps[model_name]
+            heapq.heappush(heap, (score, server))
+            if len(heap) > 4 * len(snapshot) + 16:
+                # 오래된 항목이 쌓이면 현재 점수로 다시 압축
+                self._heaps[model_name] = [(s, name) for name, s in self._scores[model_name].items()]
+                heapq.heapify(self._heaps[model_name])
+
+    def least_outstanding(
+        self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]], exclude: Collection[str] = ()
+    ) -> Optional[str]:
+        """
+        점수가 가장 낮은 서버를 반환합니다.
+
+        :param exclude: 건너뛸 서버 (재시도/헤징 시 이미 시도한 서버). 꺼냈다가 고른 뒤 다시 넣는다
+        """
+        if not servers_metrics:
+            return None
+        self.servers(model_name, servers_metrics)
+        heap = self._heaps[model_name]
+        scores = self._scores[model_name]
+        skipped = []
+        try:
+            while heap:
+                score, server = heap[0]
+                if scores.get(server) != score:
+                    heapq.heappop(heap)
+                elif server in exclude:
+                    skipped.append(heapq.heappop(heap))
+                else:
+                    return server
+            return None
+        finally:
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+
+    def power_of_two_choices(
+        self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]], exclude: Collection[str] = ()
+    ) -> Optional[str]:
+        """
+        무작위로 두 서버를 뽑아 점수가 낮은 쪽을 반환합니다.
+
+        :param exclude: 후보에서 뺄 서버
+        """
+        servers = self.servers(model_name, servers_metrics) if servers_metrics else ()
+        first, second = pick_two(servers, exclude)
+        if second is None:
+            return first
+        scores = self._scores[model_name]
+        return first if scores[first] <= scores[second] else second
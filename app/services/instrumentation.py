@@ -0,0 +1,258 @@
+import time
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.utils.streams import ClosingStream
+
+# 요청 지연 시간 구간 (초): 짧은 캐시 응답부터 긴 생성 요청까지
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# 스트림 청크 간격 구간 (초)
+GAP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SCRAPE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+OVERFLOW_LABEL = "other"  # 라벨 조합이 max_series 를 넘으면 사용
+
+
+class _Children:
+    """
+    라벨 조합별 자식 메트릭 캐시.
+
+    prometheus_client 의 labels() 는 호출마다 라벨 문자열 변환과 잠금을 거치므로,
+    튜플 키로 한 번 만든 자식을 재사용합니다. 요청에서 온 모델 이름처럼 값이 제한되지 않는 라벨을 위해
+    조합 수를 max_series 로 제한합니다.
+    """
+
+    __slots__ = ("metric", "children", "max_series", "overflow")
+
+    def __init__(self, metric, max_series: int):
+        self.metric = metric
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self.max_series = max_series
+        self.overflow = None
+
+    def get(self, labels: Tuple[str, ...]):
+        child = self.children.get(labels)
+        if child is not None:
+            return child
+        if len(self.children) >= self.max_series:
+            if self.overflow is None:
+                self.overflow = self.metric.labels(*(OVERFLOW_LABEL for _ in labels))
+            return self.overflow
+        child = self.children[labels] = self.metric.labels(*labels)
+        return child
+
+
+class RouterMetrics:
+    """
+    라우터 자체 Prometheus 메트릭.
+
+    요청 경로에서는 미리 만든 자식 메트릭에 값만 기록하고(문자열 포맷팅 없음),
+    진행 중 요청/대기열/서킷 브레이커 같은 상태 값은 /metrics 수집 시점에 StateCollector 가 읽습니다.
+    """
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None, max_series: int = 1024):
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.max_series = max_series
+        self._state_collector: Optional[Collector] = None
+
+        self.requests = self._children(Counter(
+            "llmstream_requests_total", "Requests handled by the router.",
+            ["route", "model", "outcome"], registry=self.registry,
+        ))
+        self.request_duration = self._children(Histogram(
+            "llmstream_request_duration_seconds", "End-to-end request latency, including the full stream.",
+            ["route", "model"], buckets=LATENCY_BUCKETS, registry=self.registry,
+        ))
+        self.upstream_duration = self._children(Histogram(
+            "llmstream_upstream_duration_seconds",
+            "Latency of a single upstream attempt (until response headers for streams).",
+            ["server"], buckets=LATENCY_BUCKETS, registry=self.registry,
+        ))
+        self.upstream_errors = self._children(Counter(
+            "llmstream_upstream_errors_total", "Failed upstream attempts.", ["server"], registry=self.registry,
+        ))
+        self.stream_ttfb = self._children(Histogram(
+            "llmstream_stream_time_to_first_byte_seconds", "Time until the first streamed chunk.",
+            ["model"], buckets=LATENCY_BUCKETS, registry=self.registry,
+        ))
+        self.stream_chunk_gap = self._children(Histogram(
+            "llmstream_stream_chunk_gap_seconds", "Gap between consecutive streamed chunks.",
+            ["model"], buckets=GAP_BUCKETS, registry=self.registry,
+        ))
+        self.selections = self._children(Counter(
+            "llmstream_selections_total", "Servers chosen by each routing strategy.",
+            ["model", "strategy", "server"], registry=self.registry,
+        ))
+        self.scrape_duration = self._children(Histogram(
+            "llmstream_scrape_duration_seconds", "Duration of vLLM /metrics scrapes.",
+            ["server"], buckets=SCRAPE_BUCKETS, registry=self.registry,
+        ))
+        self.scrape_failures = self._children(Counter(
+            "llmstream_scrape_failures_total", "Failed vLLM /metrics scrapes.", ["server"], registry=self.registry,
+        ))
+
+    def _children(self, metric) -> _Children:
+        return _Children(metric, self.max_series)
+
+    def observe_request(self, route: str, model: str, outcome: str, duration: float):
+        self.requests.get((route, model, outcome)).inc()
+        self.request_duration.get((route, model)).observe(duration)
+
+    def observe_upstream(self, server: str, duration: float, failed: bool = False):
+        self.upstream_duration.get((server,)).observe(duration)
+        if failed:
+            self.upstream_errors.get((server,)).inc()
+
+    def observe_selection(self, model: str, strategy: str, server: str):
+        self.selections.get((model, strategy, server)).inc()
+
+    def observe_scrape(self, server: str, duration: float, failed: bool = False):
+        self.scrape_duration.get((server,)).observe(duration)
+        if failed:
+            self.scrape_failures.get((server,)).inc()
+
+    def track_stream(
+        self, route: str, model: str, started_at: float, chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        스트림의 첫 바이트까지 시간, 청크 간격, 전체 시간을 기록합니다.
+        반복을 시작하기 전에 닫혀도 요청은 cancelled 로 기록되고 하위 스트림이 닫힙니다.
+
+        :param started_at: 요청 시작 시각 (time.perf_counter)
+        """
+        ttfb = self.stream_ttfb.get((model,))
+        gap = self.stream_chunk_gap.get((model,))
+        outcome = "cancelled"  # 끝까지 읽지 않고 닫힌 경우 (클라이언트 연결 종료)
+
+        async def observe():
+            nonlocal outcome
+            last = None
+            try:
+                async for chunk in chunks:
+                    now = time.perf_counter()
+                    if last is None:
+                        ttfb.observe(now - started_at)
+                    else:
+                        gap.observe(now - last)
+                    last = now
+                    yield chunk
+                outcome = "ok"
+            except Exception:
+                outcome = "error"
+                raise
+
+        def finish():
+            self.observe_request(route, model, outcome, time.perf_counter() - started_at)
+
+        return ClosingStream(observe(), chunks, on_close=finish)
+
+    def bind_state(self, load_balancer, admission=None, response_cache=None, access_log=None):
+        """
+        /metrics 수집 시점에 읽을 상태(진행 중 요청, 커넥션 풀 사용률, 대기열, 브레이커, 캐시, 접근 로그)를 등록합니다.
+        """
+        if self._state_collector is not None:
+            self.registry.unregister(self._state_collector)
+        self._state_collector = StateCollector(load_balancer, admission, response_cache, access_log)
+        self.registry.register(self._state_collector)
+
+
+class StateCollector(Collector):
+    """
+    요청 경로에 비용을 더하지 않도록 상태 값은 수집 시점에 계산합니다.
+    """
+
+    def __init__(self, load_balancer, admission=None, response_cache=None, access_log=None):
+        self.load_balancer = load_balancer
+        self.admission = admission
+        self.response_cache = response_cache
+        self.access_log = access_log
+
+    def collect(self) -> Iterator:
+        load_balancer = self.load_balancer
+        inflight = load_balancer.inflight
+        requests = GaugeMetricFamily(
+            "llmstream_inflight_requests", "Requests currently forwarded to each server.", labels=["server"]
+        )
+        streams = GaugeMetricFamily(
+            "llmstream_inflight_streams", "Streams currently open to each server.", labels=["server"]
+        )
+        pool = GaugeMetricFamily(
+            "llmstream_upstream_pool_utilization",
+            "In-flight requests divided by the server's connection pool size.", labels=["server"],
+        )
+        breaker = GaugeMetricFamily(
+            "llmstream_circuit_open", "1 if the server's circuit breaker is not closed.", labels=["server"]
+        )
+        tokens = GaugeMetricFamily(
+            "llmstream_outstanding_tokens",
+            "Estimated prefill/decode tokens of requests in flight to each server.", labels=["server", "phase"],
+        )
+        token_load = load_balancer.token_load
+        for server in load_balancer.metrics_collector.unique_servers():
+            count = inflight.get_requests(server)
+            requests.add_metric([server], count)
+            streams.add_metric([server], inflight.get_streams(server))
+            pool.add_metric([server], count / max(load_balancer.upstream_client.pool_size(server), 1))
+            breaker.add_metric([server], 0 if load_balancer.health.state(server) == "closed" else 1)
+            tokens.add_metric([server, "prefill"], token_load.prefill.get(server, 0.0))
+            tokens.add_metric([server, "decode"], token_load.decode.get(server, 0.0))
+        yield from (requests, streams, pool, breaker, tokens)
+
+        retries = CounterMetricFamily(
+            "llmstream_retries", "Retried, hedged and failed-over upstream attempts.", labels=["kind"]
+        )
+        for kind, value in load_balancer.retry_stats.items():
+            retries.add_metric([kind], value)
+        yield retries
+
+        fanout = CounterMetricFamily(
+            "llmstream_fanout", "n > 1 requests split across servers and the sub-requests sent.", labels=["kind"]
+        )
+        for kind, value in load_balancer.fanout.stats.items():
+            fanout.add_metric([kind], value)
+        yield fanout
+
+        if self.admission is not None:
+            families = {
+                name: GaugeMetricFamily(f"llmstream_admission_{name}", description, labels=["model"])
+                for name, description in (
+                    ("queued", "Requests waiting in the admission queue."),
+                    ("active", "Requests admitted and not yet finished."),
+                    ("limit", "Current concurrency limit of the model."),
+                    ("wait_time_avg_seconds", "Moving average of queueing time."),
+                )
+            }
+            for model, stats in self.admission.stats().items():
+                families["queued"].add_metric([model], stats["queued"])
+                families["active"].add_metric([model], stats["active"])
+                families["limit"].add_metric([model], stats["limit"])
+                families["wait_time_avg_seconds"].add_metric([model], stats["wait_time_avg"])
+            yield from families.values()
+
+        if self.response_cache is not None:
+            stats = self.response_cache.stats()
+            cache = CounterMetricFamily(
+                "llmstream_response_cache", "Response cache lookups by result.", labels=["result"]
+            )
+            for result in ("hits", "disk_hits", "misses", "coalesced"):
+                cache.add_metric([result], stats[result])
+            yield cache
+            yield GaugeMetricFamily("llmstream_response_cache_bytes", "Bytes held in memory.", value=stats["bytes"])
+
+        if self.access_log is not None:
+            records = CounterMetricFamily(
+                "llmstream_access_log_records", "Access log records by outcome.", labels=["outcome"]
+            )
+            for outcome, value in self.access_log.stats.items():
+                records.add_metric([outcome], value)
+            yield records
+            yield GaugeMetricFamily(
+                "llmstream_access_log_queue", "Records waiting to be written.", value=self.access_log.queue.qsize()
+            )
+
+
+# 프로세스 전역 메트릭 (main 에서 bind_state 로 상태를 연결)
+router_metrics = RouterMetrics()
@@ -1,27 +1,133 @@
-import random
-import json
-from typing import Dict, Generator
-from concurrent.futures import ThreadPoolExecutor
-
-import requests
 import asyncio
+import time
+from types import MappingProxyType
+from typing import AsyncIterator, Collection, Dict, List, Mapping, Optional, Union
+
+import httpx
 
+from app.services.access_log import AccessRecord, current_record
+from app.services.fanout import FanOut
+from app.services.health import HealthChecker, is_upstream_failure
+from app.services.inflight import InflightTracker, OutstandingRequestsIndex
+from app.services.instrumentation import router_metrics
 from app.services.metrics_collector import MetricsCollector
+from app.services.peak_ewma import PeakEwmaIndex
+from app.services.prefix_affinity import PrefixAffinityRouter
+from app.services.retry import DEFAULT_RETRY_CONFIG, LatencyTracker, RetryBudget, is_retryable
+from app.services.routing_table import RoutingTableManager
+from app.services.scheduler import TenantResolver
+from app.services.selectors import COMPILED_STRATEGIES, SelectorCache
+from app.services.token_cost import ProjectedWorkIndex, RequestCost, TokenCostEstimator, TokenLoadTracker
+from app.services.tracing import Trace, current_trace, new_span_id
+from app.services.upstream_client import UpstreamClient
+from app.services.usage import StreamUsage, UsageMeter
 from app.utils.config_loader import ConfigLoader
+from app.utils.streams import ClosingStream
+
+SUPPORTED_STRATEGIES = (
+    "real_time_metrics",
+    "round_robin",
+    "weighted_round_robin",
+    "least_connection",
+    "random",
+    "prefix_affinity",
+    "least_outstanding_requests",
+    "power_of_two_choices",
+    "token_weighted",
+    "peak_ewma",
+)
+
+
+def _without(servers_metrics: Mapping[str, Mapping[str, float]], exclude: Collection[str]) -> Mapping:
+    if not exclude:
+        return servers_metrics
+    return MappingProxyType({name: m for name, m in servers_metrics.items() if name not in exclude})
+
 
 class LoadBalancer:
-    def __init__(self, metrics_collector: MetricsCollector, config_loader: ConfigLoader):
+    def __init__(
+        self, metrics_collector: MetricsCollector, config_loader: ConfigLoader,
+        routing: Optional[RoutingTableManager] = None,
+    ):
+        """
+        :param routing: 모델별 전략을 읽을 라우팅 테이블 (없으면 config_loader 설정으로 만든다)
+        """
         self.metrics_collector = metrics_collector
         self.config_loader = config_loader
-        self.server_weights = {}
-        self.round_robin_counters = {}
+        self.routing = routing or RoutingTableManager(config_loader, **config_loader.get_routing_config())
+
+        # 서버별 커넥션 풀을 유지하는 공유 HTTP 클라이언트
+        self.upstream_client = UpstreamClient(config_loader.get_upstream_config())
+        self.prefix_router = PrefixAffinityRouter(**config_loader.get_prefix_affinity_config())
+
+        # 진행 중 요청/스트림 카운터와 이를 사용하는 최소 미처리 요청 인덱스
+        self.inflight = InflightTracker(metrics_collector.shared)
+        self.outstanding = OutstandingRequestsIndex(
+            self.inflight, queue_weight=config_loader.get_outstanding_queue_weight()
+        )
+
+        # 라우터가 관측한 서버별 TTFT/응답 시간의 peak EWMA (peak_ewma 전략)
+        self.peak_ewma = PeakEwmaIndex(self.inflight, **config_loader.get_peak_ewma_config())
+
+        # 요청별 예상 토큰 비용과 서버별 진행 중 토큰 (token_weighted 전략, 토큰 예산 기반 대기열)
+        self.token_costs = TokenCostEstimator(**config_loader.get_token_cost_config())
+        self.token_load = TokenLoadTracker(self.token_costs)
+        self.projected_work = ProjectedWorkIndex(
+            self.token_load, queue_weight=config_loader.get_outstanding_queue_weight()
+        )
+
+        # 요청의 테넌트 (자격 증명 또는 신뢰하는 앞단의 헤더로 결정)
+        self.tenants = TenantResolver(**config_loader.get_tenant_config())
+
+        # 테넌트/모델/서버별 토큰 사용량 집계와 테넌트 토큰 속도 제한 (설정에서 켠 경우에만)
+        usage_config = config_loader.get_usage_config()
+        self.usage = UsageMeter(self.tenants, **usage_config) if usage_config.get("enabled") else None
 
-        # ThreadPoolExecutor 생성 (필요 시 max_workers 조정)
-        self.executor = ThreadPoolExecutor(max_workers=10)
+        # 서버별 서킷 브레이커 (능동 헬스 체크는 main 에서 백그라운드 작업으로 실행)
+        self.health = HealthChecker(metrics_collector.unique_servers, **config_loader.get_health_config())
 
-    async def select_server(self, model_name: str = None, is_generate: bool = False) -> str:
+        # 재시도/헤징 설정과 이를 제한하는 재시도 예산
+        self.retry_config = {**DEFAULT_RETRY_CONFIG, **config_loader.get_retry_config()}
+        self.retry_budget = RetryBudget(
+            ratio=self.retry_config["budget_ratio"],
+            min_per_second=self.retry_config["budget_min_per_second"],
+            max_tokens=self.retry_config["budget_max_tokens"],
+        )
+        self.latencies = LatencyTracker()
+        self.retry_stats = {"retries": 0, "hedges": 0, "hedge_wins": 0, "stream_failovers": 0}
+
+        # n > 1 요청을 여러 서버로 나눠 보내는 설정 (기본값: 끔)
+        self.fanout = FanOut(**config_loader.get_fanout_config())
+
+        # 스냅샷만 보는 전략은 모델별로 컴파일된 선택기를, 요청마다 상태를 보는 전략은 각 인덱스를 사용
+        self.selectors = SelectorCache(metrics_collector.shared)
+        self._dynamic_strategies = {
+            "prefix_affinity": lambda model, servers_metrics, payload, exclude: (
+                self.prefix_router.select(model, _without(servers_metrics, exclude), payload)
+            ),
+            "least_outstanding_requests": lambda model, servers_metrics, payload, exclude: (
+                self.outstanding.least_outstanding(model, servers_metrics, exclude)
+            ),
+            "power_of_two_choices": lambda model, servers_metrics, payload, exclude: (
+                self.outstanding.power_of_two_choices(model, servers_metrics, exclude)
+            ),
+            "token_weighted": lambda model, servers_metrics, payload, exclude: (
+                self.projected_work.least_outstanding(model, servers_metrics, exclude)
+            ),
+            "peak_ewma": lambda model, servers_metrics, payload, exclude: (
+                self.peak_ewma.select(model, servers_metrics, exclude)
+            ),
+        }
+
+    async def select_server(
+        self, model_name: Optional[str] = None, is_generate: bool = False, payload: Optional[Dict] = None,
+        exclude: Optional[Collection[str]] = None,
+    ) -> str:
         """
         서버 선택 로직.
+
+        :param payload: 요청 본문 (프롬프트를 보는 전략에서 사용)
+        :param exclude: 후보에서 뺄 서버 (재시도/헤징 시 이미 시도한 서버)
         """
         if is_generate:
             return self.config_loader.get_default_generate_server()
@@ -29,103 +135,333 @@ class LoadBalancer:
         if not model_name:
             raise ValueError("model_name must be provided unless is_generate is True")
 
-        servers_metrics = self.metrics_collector.get_metrics(model_name)
+        trace = current_trace()
+        started_at = time.perf_counter() if trace is not None else 0.0
+        # 차단된 서버는 모든 전략의 후보에서 제외
+        servers_metrics = self.health.filter(model_name, self.metrics_collector.get_metrics(model_name))
         if not servers_metrics:
             return None
 
-        strategy = self.config_loader.get_strategy(model_name)
-        if strategy == "real_time_metrics":
-            return self._real_time_metrics(servers_metrics, model_name)
-        elif strategy == "round_robin":
-            return self._round_robin(list(servers_metrics.keys()), model_name)
-        elif strategy == "least_connection":
-            return self._least_connection(servers_metrics)
-        elif strategy == "random":
-            return self._random(list(servers_metrics.keys()))
-        else:
+        strategy = self.routing.table.strategy(model_name)
+        exclude = exclude or ()
+        server = self._select(strategy, model_name, servers_metrics, payload, exclude)
+        if server is not None and not self.health.admit_slow_start(server):
+            # 복구 직후(slow-start) 서버는 가중치 확률로만 선택하고 나머지는 다른 서버에서 다시 고른다
+            other = self._select(strategy, model_name, servers_metrics, payload, {*exclude, server})
+            if other is not None:
+                server = other
+        if server is not None:
+            self.health.on_selected(server)
+            router_metrics.observe_selection(model_name, strategy, server)
+        if trace is not None:
+            trace.add_span("select", started_at, time.perf_counter(), {"strategy": strategy, "server": server})
+        return server
+
+    def _select(
+        self, strategy: str, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]],
+        payload: Optional[Dict], exclude: Collection[str] = (),
+    ) -> Optional[str]:
+        """
+        :param exclude: 후보에서 뺄 서버 (재시도 제외, slow-start 재선택). 인덱스를 쓰는 전략은 모델 스냅샷의
+            인덱스를 그대로 두고 건너뛰며, 컴파일된 선택기는 캐시하지 않는 임시 선택기를 만든다
+        """
+        if strategy in COMPILED_STRATEGIES:
+            candidates = _without(servers_metrics, exclude)
+            if not candidates:
+                return None
+            return self.selectors.get(model_name, strategy, candidates, cache=not exclude).select()
+        select = self._dynamic_strategies.get(strategy)
+        if select is None:
             raise ValueError(f"Unsupported strategy: {strategy}")
+        return select(model_name, servers_metrics, payload, exclude)
 
     async def forward_request(
-        self, url: str, payload: Dict, headers: Dict, stream: bool = False
-    ) -> Generator or Dict:
-        def _sync_request(url: str, payload: Dict, headers: Dict, stream: bool):
-            headers.pop("Content-Length", None)
-            headers["Content-Type"] = "application/json"
-
-            response = requests.post(url, json=payload, headers=headers, stream=stream, timeout=10)
-            response.raise_for_status()
-
-            if stream:
-                for chunk in response.iter_lines(decode_unicode=True):
-                    if chunk:
-                        yield chunk
-            else:
-                return response.json()
+        self, server: str, path: str, payload: Dict, headers: Dict, stream: bool = False
+    ) -> Union[AsyncIterator[bytes], Dict]:
+        """
+        선택된 서버로 요청을 전달합니다.
 
-        loop = asyncio.get_running_loop()
+        :param server: 업스트림 서버 URL
+        :param path: 업스트림 경로 (예: "/v1/chat/completions")
+        :param stream: True 이면 원본 바이트 청크를 내보내는 비동기 이터레이터 반환
+        :raises RuntimeError: 연결 실패 또는 업스트림 오류 응답
+        """
+        started_at = time.perf_counter()
+        model_name = payload.get("model")
+        cost = self.token_costs.estimate(model_name, payload)
+        record = current_record()
+        if record is not None:
+            record.server = server
+        trace = current_trace()
+        if trace is not None:
+            # 업스트림 호출 스팬 ID 를 담은 W3C traceparent 전달
+            span_id = new_span_id()
+            headers = {**headers, "traceparent": trace.traceparent(span_id)}
+        self.inflight.acquire(server, stream=stream)
+        self.token_load.acquire(server, cost)
         try:
             if stream:
-                return _sync_request(url, payload, headers, stream)
+                chunks = await self.upstream_client.open_stream(server, path, payload, headers)
             else:
-                return await loop.run_in_executor(
-                    self.executor,
-                    _sync_request,
-                    url,
-                    payload,
-                    headers,
-                    stream,
+                response = await self.upstream_client.post_json(server, path, payload, headers)
+                self.health.record_success(server)
+                elapsed = time.perf_counter() - started_at
+                router_metrics.observe_upstream(server, elapsed)
+                self.peak_ewma.observe_total(server, elapsed)
+                if trace is not None:
+                    trace.add_span("upstream", started_at, started_at + elapsed, {"server": server}, span_id)
+                if isinstance(response, dict):
+                    self.token_costs.observe_usage(model_name, payload, cost, response.get("usage"))
+                    if record is not None:
+                        record.add_usage(response.get("usage"))
+                    if self.usage is not None:
+                        self.usage.record_response(
+                            self.usage.tenant(headers), model_name, server, response.get("usage")
+                        )
+                return response
+        except BaseException as e:
+            if stream:
+                self.inflight.release(server, stream=True)
+                self.token_load.release(server, cost)
+            if is_upstream_failure(e):
+                self.health.record_failure(server)
+                self.peak_ewma.observe_failure(server, time.perf_counter() - started_at)
+            if isinstance(e, Exception):
+                router_metrics.observe_upstream(server, time.perf_counter() - started_at, failed=True)
+            if trace is not None:
+                trace.add_span(
+                    "connect" if stream else "upstream", started_at, time.perf_counter(),
+                    {"server": server, "error": type(e).__name__}, span_id,
                 )
-        except requests.RequestException as e:
-            raise RuntimeError(f"Request failed to {url}: {e}")
+            if isinstance(e, httpx.HTTPError):
+                raise RuntimeError(f"Request failed to {server}{path}: {e}") from e
+            raise
+        finally:
+            if not stream:
+                self.inflight.release(server)
+                self.token_load.release(server, cost)
+        self.health.record_success(server)
+        connected_at = time.perf_counter()
+        router_metrics.observe_upstream(server, connected_at - started_at)
+        if trace is not None:
+            trace.add_span("connect", started_at, connected_at, {"server": server}, span_id)
+        # 스트림은 마지막 청크 이후(또는 취소 시) 카운터를 감소
+        return self._track_stream(
+            server, chunks, cost, model_name, headers, started_at, trace, connected_at, record
+        )
 
-    def _real_time_metrics(self, servers_metrics, model_name):
-        self._update_weights(servers_metrics)
-        if model_name not in self.round_robin_counters:
-            self.round_robin_counters[model_name] = {server: 0 for server in self.server_weights}
+    async def forward_with_retries(
+        self, server: str, model_name: Optional[str], path: str, payload: Dict, headers: Dict,
+        stream: bool = False, is_generate: bool = False,
+    ) -> Union[AsyncIterator[bytes], Dict]:
+        """
+        forward_request 에 재시도, 헤징, 스트림 장애 조치를 더한 버전.
 
-        servers = list(self.server_weights.keys())
-        weights = list(self.server_weights.values())
+        - 연결 오류와 retry_on_status 응답은 select_server 로 고른 다른 서버에 다시 보냄 (재시도 예산 안에서)
+        - 헤징이 켜져 있으면 p95 지연 후에도 응답이 없을 때 두 번째 서버로 중복 전송하고 늦은 쪽을 취소
+          (헤지는 max_retries 에 세지 않고 재시도 예산만 함께 씀)
+        - 스트림은 첫 청크를 받기 전에 실패하면 다른 서버로 다시 연결
 
-        selected_index = random.choices(range(len(servers)), weights=weights, k=1)[0]
-        selected_server = servers[selected_index]
-        self.round_robin_counters[model_name][selected_server] += 1
-        return selected_server
+        /generate 는 기본 서버 하나만 있으므로 같은 서버로 재시도합니다.
 
-    def _update_weights(self, servers_metrics):
-        weights = {}
-        k = 0.7  # GPU 사용량 중요도
-        m = 0.3  # 대기 요청 수 중요도
+        :param server: 첫 시도 서버 (select_server 결과)
+        :raises RuntimeError: 모든 시도가 실패했을 때 마지막 오류
+        """
+        options = self.retry_config
+        self.retry_budget.deposit()
+        tried = [server]  # 헤지 서버도 포함 (재시도 후보에서 제외)
+        retries = 0
+        while True:
+            try:
+                if stream:
+                    return await self._open_stream(server, path, payload, headers)
+                return await self._forward_hedged(server, tried, model_name, path, payload, headers, is_generate)
+            except RuntimeError as e:
+                if stream:
+                    # 첫 바이트 이전이면 클라이언트에 보낸 것이 없으므로 전송 오류 전반을 다시 연결
+                    retryable = options["stream_failover"] and (
+                        is_retryable(e, options["retry_on_status"]) or isinstance(e.__cause__, httpx.TransportError)
+                    )
+                else:
+                    retryable = is_retryable(e, options["retry_on_status"])
+                if not retryable or retries >= options["max_retries"] or not self.retry_budget.try_withdraw():
+                    raise
+                next_server = await self.select_server(
+                    model_name, is_generate=is_generate, payload=payload, exclude=None if is_generate else tried
+                )
+                if not next_server:
+                    raise
+                server = next_server
+                tried.append(server)
+                retries += 1
+                self.retry_stats["stream_failovers" if stream else "retries"] += 1
 
-        for server, metrics in servers_metrics.items():
-            gpu_cache = metrics.get("gpu_cache_usage", 1.0)
-            num_waiting = metrics.get("num_requests_waiting", 0)
-            weights[server] = 1 / ((k * gpu_cache) + (m * num_waiting) + 1e-6)
+    async def forward_fanout(
+        self, model_name: str, path: str, payload: Dict, headers: Dict, stream: bool = False, parts: int = 2
+    ) -> Union[AsyncIterator[bytes], Dict, None]:
+        """
+        n > 1 요청을 최대 parts 대의 서버로 나눠 동시에 보내고 결과를 합칩니다.
 
-        total_weight = sum(weights.values())
-        for server in weights:
-            weights[server] /= total_weight
+        서버는 모델의 전략으로 하나씩 고르되 이미 고른 서버는 제외하므로 부하가 낮은 서버부터 채워지며,
+        하위 요청마다 forward_with_retries 의 재시도/장애 조치가 적용됩니다.
 
-        self.server_weights = weights
+        :param parts: 나눌 최대 하위 요청 수 (FanOut.splits 결과)
+        :return: 합친 응답 또는 SSE 스트림. 사용 가능한 서버가 없으면 None
+        :raises RuntimeError: 하위 요청 중 하나라도 실패했을 때 (나머지는 취소)
+        """
+        servers: List[str] = []
+        while len(servers) < parts:
+            server = await self.select_server(model_name, payload=payload, exclude=servers)
+            if server is None:
+                break
+            servers.append(server)
+        if not servers:
+            return None
+        if len(servers) == 1:
+            return await self.forward_with_retries(servers[0], model_name, path, payload, headers, stream=stream)
 
-    def _round_robin(self, servers, model_name):
-        if model_name not in self.round_robin_counters:
-            self.round_robin_counters[model_name] = 0
+        bodies = self.fanout.sub_requests(payload, len(servers))
+        self.fanout.stats["requests"] += 1
+        self.fanout.stats["sub_requests"] += len(bodies)
+        tasks = [
+            asyncio.create_task(self.forward_with_retries(server, model_name, path, body, headers, stream=stream))
+            for server, body in zip(servers, bodies)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            for result in await asyncio.gather(*tasks, return_exceptions=True):
+                if stream and not isinstance(result, BaseException):
+                    await result.aclose()  # 이미 열린 하위 스트림
+            raise
+        if not stream:
+            return self.fanout.merge_responses(results)
+        offsets = [sum(body["n"] for body in bodies[:position]) for position in range(len(bodies))]
+        return ClosingStream(self.fanout.merge_streams(results, offsets), *results)
 
-        index = self.round_robin_counters[model_name] % len(servers)
-        server = servers[index]
-        self.round_robin_counters[model_name] += 1
-        return server
+    async def _open_stream(self, server: str, path: str, payload: Dict, headers: Dict) -> AsyncIterator[bytes]:
+        """
+        첫 청크까지 미리 받아, 첫 바이트 이전의 실패를 RuntimeError 로 드러냅니다.
+        """
+        chunks = await self.forward_request(server, path, payload, headers, stream=True)
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            return chunks
+        except httpx.HTTPError as e:
+            await chunks.aclose()
+            raise RuntimeError(f"Stream failed before the first byte from {server}{path}: {e}") from e
+        return ClosingStream(self._prepend(first, chunks), chunks)
 
-    def _least_connection(self, servers_metrics):
-        if not servers_metrics:
-            return None
-        sorted_servers = sorted(
-            servers_metrics.items(),
-            key=lambda item: item[1].get("num_requests_running", float("inf"))
-        )
-        return sorted_servers[0][0]
+    @staticmethod
+    async def _prepend(first: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        yield first
+        async for chunk in chunks:
+            yield chunk
 
-    def _random(self, servers):
-        if not servers:
+    async def _forward_hedged(
+        self, server: str, tried: List[str], model_name: Optional[str], path: str, payload: Dict,
+        headers: Dict, is_generate: bool,
+    ) -> Dict:
+        """
+        일반 요청을 전달하고, 헤지 지연 시간이 지나도 응답이 없으면 두 번째 서버로 중복 전송합니다.
+        """
+        started_at = time.monotonic()
+        delay = self._hedge_delay(model_name, is_generate)
+        if delay is None:
+            response = await self.forward_request(server, path, payload, headers)
+            self.latencies.record(model_name, time.monotonic() - started_at)
+            return response
+
+        primary = asyncio.ensure_future(self.forward_request(server, path, payload, headers))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self.retry_budget.try_withdraw():
+                hedge_server = await self.select_server(model_name, payload=payload, exclude=tried)
+                if hedge_server:
+                    tried.append(hedge_server)
+                    tasks.add(asyncio.ensure_future(self.forward_request(hedge_server, path, payload, headers)))
+                    self.retry_stats["hedges"] += 1
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None or not tasks:
+                        # 성공했거나 마지막으로 끝난 시도의 결과(오류 포함)를 사용
+                        response = task.result()
+                        if task is not primary:
+                            self.retry_stats["hedge_wins"] += 1
+                        self.latencies.record(model_name, time.monotonic() - started_at)
+                        return response
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _hedge_delay(self, model_name: Optional[str], is_generate: bool) -> Optional[float]:
+        options = self.retry_config
+        if not options["hedge"] or is_generate:
             return None
-        return random.choice(servers)
+        if self.latencies.count(model_name) < options["hedge_min_samples"]:
+            return None
+        return max(self.latencies.quantile(model_name, options["hedge_quantile"]), options["hedge_min_delay"])
+
+    def _track_stream(
+        self, server: str, chunks: AsyncIterator[bytes], cost: RequestCost, model_name: Optional[str],
+        headers: Dict, started_at: float, trace: Optional[Trace] = None, connected_at: float = 0.0,
+        record: Optional[AccessRecord] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        스트림이 끝나거나 닫힐 때 진행 중 카운터를 감소시킵니다.
+        반복을 시작하기 전에 닫혀도(클라이언트가 본문을 읽기 전에 연결 종료) 카운터를 반납합니다.
+        첫 청크가 오면 prefill 이 끝난 것으로 보고 예상 prefill 토큰을 빼고 TTFT 를 기록합니다.
+        끝까지 받은 스트림은 전체 응답 시간도, 도중에 끊긴 스트림은 실패 벌점을 기록합니다 (peak_ewma).
+        사용량 집계가 켜져 있으면 중계한 바이트에서 usage 를 찾아 스트림이 끝날 때 기록합니다.
+        trace 가 있으면 first_byte(응답 헤더 ~ 첫 청크), last_byte(첫 청크 ~ 끝) 스팬을 기록합니다.
+        접근 로그 레코드가 있으면 토큰 수를 채웁니다 (usage 청크가 없으면 이벤트 수를 생성 토큰 수로).
+        """
+        prefilled = False
+        first_at = None
+        stream_usage = StreamUsage() if self.usage is not None or record is not None else None
+
+        async def relay():
+            nonlocal prefilled, first_at
+            try:
+                async for chunk in chunks:
+                    if not prefilled:
+                        prefilled = True
+                        self.token_load.prefill_done(server, cost)
+                        first_at = time.perf_counter()
+                        self.peak_ewma.observe_ttft(server, first_at - started_at)
+                    if stream_usage is not None:
+                        stream_usage.feed(chunk)
+                    yield chunk
+                self.peak_ewma.observe_total(server, time.perf_counter() - started_at)
+            except httpx.HTTPError as e:
+                # 스트림 도중 끊긴 경우도 서버 이상으로 집계
+                if is_upstream_failure(e):
+                    self.health.record_failure(server)
+                    self.peak_ewma.observe_failure(server, time.perf_counter() - started_at)
+                raise
+
+        def release():
+            if trace is not None and first_at is not None:
+                trace.add_span("first_byte", connected_at, first_at, {"server": server})
+                trace.add_span("last_byte", first_at, time.perf_counter(), {"server": server})
+            self.inflight.release(server, stream=True)
+            self.token_load.release(server, cost, prefilled=prefilled)
+            if self.usage is not None:
+                self.usage.record_stream(
+                    self.usage.tenant(headers), model_name, server, stream_usage, cost.prompt_tokens
+                )
+            if record is not None:
+                record.add_usage(stream_usage.usage or {"completion_tokens": stream_usage.events})
+
+        return ClosingStream(relay(), chunks, on_close=release)
+
+    async def aclose(self):
+        await self.upstream_client.aclose()
@@ -1,15 +1,31 @@
 import logging
 
+from pydantic import BaseModel
+
+# 프로세스에서 한 번만 설정 (라우터 모듈마다 Logger 를 만들어도 다시 설정하지 않음)
+logging.basicConfig(format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO)
+# httpx 는 업스트림 요청마다 INFO 로그를 남기므로 경고 이상만 출력
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 
 class Logger:
+    """
+    오류 로그. 요청별 기록은 access_log(샘플링, 백그라운드 기록)가 담당하므로
+    여기서는 프롬프트와 응답 본문을 직렬화하지 않고 라우팅 필드만 남깁니다.
+    """
+
     def __init__(self):
-        logging.basicConfig(
-            format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO
-        )
         self.logger = logging.getLogger("LLMStreamLogger")
 
+    @staticmethod
+    def _describe(request) -> str:
+        # pydantic 모델과 요청 본문 딕셔너리 모두 지원
+        body = request.model_dump() if isinstance(request, BaseModel) else request
+        return f"model={body.get('model')} stream={bool(body.get('stream'))}"
+
     def log_request(self, request, response):
-        self.logger.info(f"Request: {request.dict()} | Response: {response}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Request: {self._describe(request)} | Response: {response}")
 
     def log_error(self, request, error_message):
-        self.logger.error(f"Request: {request.dict()} | Error: {error_message}")
+        self.logger.error(f"Request: {self._describe(request)} | Error: {error_message}")
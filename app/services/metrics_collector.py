@@ -1,75 +1,260 @@
 import httpx
 import asyncio
-from typing import Dict, List
+import random
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from app.services.instrumentation import router_metrics
+from app.services.routing_table import RoutingTable
+from app.services.shared_state import SharedState
+from app.utils.prometheus_parser import MetricSample, PrometheusParser, SeriesConfig
+
+EMPTY_SNAPSHOT: Mapping[str, Mapping[str, float]] = MappingProxyType({})
 
 
 class MetricsCollector:
-    def __init__(self, servers: Dict[str, List[str]], update_interval: int = 10):
+    def __init__(
+        self,
+        servers: Dict[str, List[str]],
+        update_interval: int = 10,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        scrape_timeout: Optional[float] = None,
+        jitter: float = 0.1,
+        series: Optional[SeriesConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        shared: Optional[SharedState] = None,
+    ):
         """
         MetricsCollector 초기화.
-        
+
         :param servers: 모델별 서버 목록 딕셔너리 {model_name: [server_url1, server_url2, ...]}
         :param update_interval: 메트릭 갱신 주기 (초 단위)
+        :param min_interval: 바쁜 노드의 최소 수집 주기 (기본값: update_interval / 2)
+        :param max_interval: 유휴 노드의 최대 수집 주기 (기본값: update_interval * 3)
+        :param scrape_timeout: 수집 1회의 마감 시간 (기본값: min(update_interval, 2))
+        :param jitter: 수집 주기에 곱해지는 무작위 편차 비율
+        :param series: 수집할 vLLM 시계열 설정 (기본값: DEFAULT_VLLM_SERIES)
+        :param transport: 테스트/벤치마크용 httpx 트랜스포트
+        :param shared: 워커 프로세스 간 공유 상태. 지정 시 한 워커만 수집하고 나머지는 공유 스냅샷을 읽는다
         """
         self.servers = servers
-        self.metrics = {model: {} for model in servers.keys()}  # 모델별 메트릭 초기화
+        # 선택 후보로 발행할 서버 (드레이닝 중인 노드는 수집은 계속하되 스냅샷에서 제외)
+        self._routable: Dict[str, Tuple[str, ...]] = {model: tuple(s) for model, s in servers.items()}
         self.update_interval = update_interval
-        self.streaming_request_counts = {model: 0 for model in servers.keys()}  # 스트리밍 카운터 추가
+        self.min_interval = min_interval if min_interval is not None else update_interval / 2
+        self.max_interval = max_interval if max_interval is not None else update_interval * 3
+        self.scrape_timeout = scrape_timeout if scrape_timeout is not None else min(update_interval, 2.0)
+        self.jitter = jitter
+        self.transport = transport
+        self.parser = PrometheusParser(series)
+        self.shared = shared
+        self._shared_seq: Dict[str, int] = {}
+
+        # 모델별 불변 스냅샷 {model_name: {server_url: {metric_name: value}}}
+        # 발행 시 딕셔너리 전체를 교체하므로 읽기 측은 잠금 없이 참조만 하면 된다.
+        self.metrics: Dict[str, Mapping[str, Mapping[str, float]]] = {
+            model: EMPTY_SNAPSHOT for model in servers.keys()
+        }
+        self._server_metrics: Dict[str, Mapping[str, float]] = {}
+        self._samples: Dict[str, Tuple[float, MetricSample]] = {}  # 증가율 계산용 직전 수집 결과
+        self._intervals: Dict[str, float] = {}
+        self._listeners: List[Callable[[str, Mapping[str, Mapping[str, float]]], None]] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = False
+
+    def add_listener(self, callback: Callable[[str, Mapping[str, Mapping[str, float]]], None]):
+        """
+        모델 스냅샷이 새로 발행될 때마다 호출될 콜백을 등록합니다.
+
+        :param callback: callback(model_name, snapshot)
+        """
+        self._listeners.append(callback)
 
-    def increment_streaming_count(self, model_name: str):
-        if model_name in self.streaming_request_counts:
-            self.streaming_request_counts[model_name] += 1
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.scrape_timeout, transport=self.transport)
+        return self._client
 
-    def get_streaming_count(self, model_name: str) -> int:
-        return self.streaming_request_counts.get(model_name, 0)
-    
     async def fetch_metrics(self, server_url: str) -> Dict[str, float]:
         """
         주어진 서버의 메트릭을 가져옵니다.
-        
+
         :param server_url: 메트릭을 가져올 서버 URL
         :return: 메트릭 딕셔너리 {metric_name: value}
         """
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(f"{server_url}/metrics")
-                response.raise_for_status()
-                return self.parse_metrics(response.text)
-        except httpx.RequestError as e:
-            print(f"Failed to fetch metrics from {server_url}: {e}")
+            response = await asyncio.wait_for(
+                self._get_client().get(f"{server_url}/metrics"), self.scrape_timeout
+            )
+            response.raise_for_status()
+            return self.parse_metrics(response.text, server_url)
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            print(f"Failed to fetch metrics from {server_url}: {e!r}")
             return {}
 
-    def parse_metrics(self, metrics_text: str) -> Dict[str, float]:
+    def parse_metrics(self, metrics_text: str, server_url: Optional[str] = None) -> Dict[str, float]:
         """
         Prometheus 형식의 메트릭 텍스트를 파싱합니다.
-        
+
         :param metrics_text: 메트릭 텍스트
+        :param server_url: 지정 시 같은 서버의 직전 수집 결과와 비교해 증가율/구간 통계를 계산
         :return: 파싱된 메트릭 딕셔너리 {metric_name: value}
         """
-        metrics = {}
-        for line in metrics_text.splitlines():
-            if line.startswith("vllm:num_requests_waiting"):
-                _, value = line.split()
-                metrics["num_requests_waiting"] = float(value)
-        return metrics
+        sample = self.parser.parse(metrics_text)
+        if server_url is None:
+            return sample.to_metrics()
+        now = time.monotonic()
+        previous = self._samples.get(server_url)
+        self._samples[server_url] = (now, sample)
+        if previous is None:
+            return sample.to_metrics()
+        return sample.to_metrics(previous[1], now - previous[0])
 
-    async def update_metrics(self):
+    def unique_servers(self) -> List[str]:
+        """
+        여러 모델에 중복 등록된 노드를 한 번만 수집하도록 서버 목록을 정리합니다.
+        """
+        return list(dict.fromkeys(server for servers in self.servers.values() for server in servers))
+
+    def _next_interval(self, server_url: str, metrics: Dict[str, float]) -> float:
+        """
+        노드 부하에 따라 다음 수집 주기를 계산합니다. 바쁘면 짧게, 유휴 상태가 이어지면 점점 길게.
+        """
+        if not metrics:
+            interval = self.update_interval
+        elif metrics.get("num_requests_running", 0) > 0 or metrics.get("num_requests_waiting", 0) > 0:
+            interval = self.min_interval
+        else:
+            previous = self._intervals.get(server_url, self.update_interval)
+            interval = min(previous * 1.5, self.max_interval)
+        self._intervals[server_url] = interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _publish(self, server_url: str):
+        """
+        해당 노드를 포함하는 모델들의 스냅샷을 새로 만들어 교체하고 리스너에 알립니다.
+        """
+        metrics = dict(self.metrics)
+        updated = []
+        for model_name, servers in self._routable.items():
+            if server_url not in servers:
+                continue
+            snapshot = self._snapshot(servers)
+            metrics[model_name] = snapshot
+            updated.append((model_name, snapshot))
+        self.metrics = metrics
+        self._notify(updated)
+
+    def _snapshot(self, servers: Tuple[str, ...]) -> Mapping[str, Mapping[str, float]]:
+        return MappingProxyType(
+            {server: self._server_metrics[server] for server in servers if server in self._server_metrics}
+        )
+
+    def _notify(self, updated: List[Tuple[str, Mapping[str, Mapping[str, float]]]]):
+        for model_name, snapshot in updated:
+            for callback in self._listeners:
+                callback(model_name, snapshot)
+
+    def apply_routing_table(self, table: RoutingTable):
+        """
+        새 라우팅 테이블을 반영합니다. 모든 모델 스냅샷을 다시 발행하고,
+        추가된 노드의 수집을 시작하며 제거된 노드의 수집과 상태를 정리합니다.
+
+        :param table: 교체된 RoutingTable
+        """
+        self.servers = table.servers_by_model()
+        self._routable = dict(table.active)
+        current = set(self.unique_servers())
+        for state in (self._server_metrics, self._samples, self._intervals):
+            for server in [server for server in state if server not in current]:
+                del state[server]
+
+        updated = [(model, self._snapshot(servers)) for model, servers in self._routable.items()]
+        self.metrics = dict(updated)
+        self._notify(updated)
+        if self._running:
+            self._sync_scrape_tasks()
+
+    async def scrape_server(self, server_url: str) -> float:
         """
-        주기적으로 메트릭을 갱신합니다.
+        노드 하나를 수집하고 스냅샷을 발행합니다.
+
+        :return: 다음 수집까지 대기할 시간 (초)
         """
+        started_at = time.perf_counter()
+        metrics = await self.fetch_metrics(server_url)
+        router_metrics.observe_scrape(server_url, time.perf_counter() - started_at, failed=not metrics)
+        if metrics:
+            self._server_metrics[server_url] = MappingProxyType(metrics)
+            self._publish(server_url)
+            if self.shared is not None:
+                self.shared.publish_metrics(server_url, metrics)
+        return self._next_interval(server_url, metrics)
+
+    async def _scrape_loop(self, server_url: str):
+        # 모든 노드가 같은 순간에 수집되지 않도록 시작 시점을 분산
+        await asyncio.sleep(random.uniform(0, self.jitter * self.update_interval))
         while True:
-            for model_name, servers in self.servers.items():
-                for server in servers:
-                    metrics = await self.fetch_metrics(server)
-                    if metrics:
-                        self.metrics[model_name][server] = metrics
-            await asyncio.sleep(self.update_interval)
+            delay = await self.scrape_server(server_url)
+            await asyncio.sleep(delay)
+
+    async def update_metrics(self):
+        """
+        노드마다 독립된 주기로 메트릭을 동시에 갱신합니다.
+        shared 가 있으면 리더로 선출된 워커만 수집하고, 나머지 워커는 리더가 끝날 때까지 공유 스냅샷을 따라 읽습니다.
+        """
+        if self.shared is not None:
+            while not self.shared.try_lead():
+                self.follow_shared()
+                await asyncio.sleep(self.shared.poll_interval)
+            print(f"Metrics scraper elected (worker {self.shared.worker})")
+        self._running = True
+        self._sync_scrape_tasks()
+        try:
+            # 수집 작업은 라우팅 테이블이 바뀔 때 추가/취소되므로 취소될 때까지 대기
+            await asyncio.Event().wait()
+        finally:
+            self._running = False
+            tasks = list(self._tasks.values())
+            self._tasks.clear()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.aclose()
+
+    def follow_shared(self):
+        """
+        리더 워커가 공유 메모리에 새로 발행한 서버 스냅샷을 읽어 이 워커의 스냅샷으로 발행합니다.
+        """
+        for server_url in self.unique_servers():
+            published = self.shared.read_metrics(server_url, self._shared_seq.get(server_url, 0))
+            if published is None:
+                continue
+            self._shared_seq[server_url], metrics = published
+            self._server_metrics[server_url] = MappingProxyType(metrics)
+            self._publish(server_url)
+
+    def _sync_scrape_tasks(self):
+        servers = self.unique_servers()
+        for server in [server for server in self._tasks if server not in servers]:
+            self._tasks.pop(server).cancel()
+        for server in servers:
+            if server not in self._tasks:
+                self._tasks[server] = asyncio.create_task(self._scrape_loop(server))
 
-    def get_metrics(self, model_name: str) -> Dict[str, Dict[str, float]]:
+    async def aclose(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    def get_metrics(self, model_name: str) -> Mapping[str, Mapping[str, float]]:
         """
         특정 모델의 메트릭을 반환합니다.
-        
+
         :param model_name: 모델 이름
         :return: 모델별 메트릭 {server_url: {metric_name: value}}
         """
-        return self.metrics.get(model_name, {})
+        return self.metrics.get(model_name, EMPTY_SNAPSHOT)
@@ -0,0 +1,155 @@
+import math
+import time
+from typing import Collection, Dict, Mapping, Optional, Tuple
+
+from app.services.inflight import InflightTracker, pick_two
+
+DEFAULT_PEAK_EWMA_CONFIG = {
+    "decay_time": 10.0,  # 지수 이동 평균의 감쇠 시간 상수 (초)
+    "ttft_weight": 0.5,  # 지연 시간 = ttft_weight * TTFT + (1 - ttft_weight) * 전체 응답 시간
+    "default_latency": 0.1,  # 모델의 어느 서버도 관측하지 못했을 때의 지연 시간 (초)
+    "failure_penalty": 5.0,  # 업스트림 실패 시 현재 지연 시간에 곱해 기록할 배수
+}
+
+BASELINE_REFRESH = 1.0  # 모델 기준 지연 시간을 다시 계산하는 최소 간격 (초)
+
+
+class _Ewma:
+    """
+    peak-sensitive 지수 이동 평균. 표본이 현재 값보다 크면 곧바로 그 값으로 올라가고,
+    작으면 마지막 관측 이후 경과 시간에 따라 exp(-경과/decay_time) 비율로 천천히 내려갑니다.
+    """
+
+    __slots__ = ("value", "stamp")
+
+    def __init__(self, value: float, stamp: float):
+        self.value = value
+        self.stamp = stamp
+
+    def observe(self, sample: float, now: float, decay_time: float):
+        if sample > self.value:
+            self.value = sample
+        else:
+            weight = math.exp(-(now - self.stamp) / decay_time)
+            self.value = self.value * weight + sample * (1 - weight)
+        self.stamp = now
+
+    def get(self, now: float, decay_time: float, target: float = 0.0) -> float:
+        # 관측이 없는 동안에는 target(모델 기준값)으로 수렴 (느렸던 서버도 시간이 지나면 다시 시도하되,
+        # 오래 쉬었던 서버가 다른 서버보다 훨씬 빨라 보이지는 않음)
+        return target + (self.value - target) * math.exp(-(now - self.stamp) / decay_time)
+
+
+class PeakEwmaIndex:
+    """
+    peak_ewma 전략 (Finagle/Linkerd 의 Peak EWMA 로드 밸런서와 같은 방식).
+
+    서버별로 라우터가 직접 관측한 TTFT 와 전체 응답 시간의 peak EWMA 를 두고,
+    점수 = 지연 시간 * (진행 중 요청 수 + 1) 이 낮은 서버를 power-of-two-choices 로 고릅니다.
+    응답마다 갱신되므로 수집 주기(기본 10 초)를 기다리지 않고 느려진 노드를 피합니다.
+    실패한 요청은 벌점 표본으로 기록해 빨리 실패하는 노드가 빠른 노드로 보이지 않게 합니다.
+    아직 관측하지 못한 서버는 모델의 현재 지연 시간(관측한 서버들의 평균)에서 시작하므로,
+    새로 추가되거나 복구된 서버가 첫 응답 전까지 요청을 몰아 받지 않습니다.
+    """
+
+    def __init__(self, inflight: InflightTracker, **config):
+        """
+        :param config: DEFAULT_PEAK_EWMA_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_PEAK_EWMA_CONFIG, **config}
+        self.inflight = inflight
+        self.decay_time = float(options["decay_time"])
+        self.ttft_weight = float(options["ttft_weight"])
+        self.default_latency = float(options["default_latency"])
+        self.failure_penalty = float(options["failure_penalty"])
+        self._ttft: Dict[str, _Ewma] = {}
+        self._total: Dict[str, _Ewma] = {}
+        self._snapshots: Dict[str, Mapping] = {}
+        self._servers: Dict[str, Tuple[str, ...]] = {}
+        self._baselines: Dict[str, Tuple[Mapping, float, float]] = {}  # 모델 -> (스냅샷, 계산 시각, 기준값)
+
+    def _observe(self, table: Dict[str, _Ewma], server: str, seconds: float):
+        now = time.monotonic()
+        ewma = table.get(server)
+        if ewma is None:
+            table[server] = _Ewma(seconds, now)
+        else:
+            ewma.observe(seconds, now, self.decay_time)
+
+    def observe_ttft(self, server: str, seconds: float):
+        self._observe(self._ttft, server, seconds)
+
+    def observe_total(self, server: str, seconds: float):
+        self._observe(self._total, server, seconds)
+
+    def observe_failure(self, server: str, seconds: float):
+        """
+        업스트림 실패를 기록합니다. 현재 지연 시간과 실패까지 걸린 시간 중 큰 값에 failure_penalty 를 곱해
+        TTFT 와 전체 응답 시간 모두에 넣습니다 (peak 이므로 곧바로 반영되고 이후 시간에 따라 감쇠).
+        """
+        sample = max(self.latency(server), seconds) * self.failure_penalty
+        self._observe(self._ttft, server, sample)
+        self._observe(self._total, server, sample)
+
+    def latency(self, server: str, baseline: Optional[float] = None) -> float:
+        """
+        TTFT 와 전체 응답 시간 EWMA 의 가중 평균. 한쪽만 관측했으면 그 값, 둘 다 없으면 baseline.
+
+        :param baseline: 관측하지 못한 서버의 값이자 관측이 끊긴 서버가 수렴할 값 (없으면 default_latency)
+        """
+        if baseline is None:
+            baseline = self.default_latency
+        now = time.monotonic()
+        ttft = self._ttft.get(server)
+        total = self._total.get(server)
+        if ttft is None and total is None:
+            return baseline
+        if total is None:
+            return ttft.get(now, self.decay_time, baseline)
+        if ttft is None:
+            return total.get(now, self.decay_time, baseline)
+        return (
+            self.ttft_weight * ttft.get(now, self.decay_time, baseline)
+            + (1 - self.ttft_weight) * total.get(now, self.decay_time, baseline)
+        )
+
+    def baseline(self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]]) -> float:
+        """
+        모델의 현재 지연 시간: 관측한 서버들의 마지막 EWMA 평균 (관측한 서버가 없으면 default_latency).
+        스냅샷이 바뀌거나 BASELINE_REFRESH 가 지났을 때만 다시 계산합니다.
+        """
+        now = time.monotonic()
+        cached = self._baselines.get(model_name)
+        if cached is not None and cached[0] is servers_metrics and now - cached[1] < BASELINE_REFRESH:
+            return cached[2]
+        observed = []
+        for server in servers_metrics:
+            ttft = self._ttft.get(server)
+            total = self._total.get(server)
+            if ttft is not None and total is not None:
+                observed.append(self.ttft_weight * ttft.value + (1 - self.ttft_weight) * total.value)
+            elif ttft is not None or total is not None:
+                observed.append((ttft or total).value)
+        baseline = sum(observed) / len(observed) if observed else self.default_latency
+        self._baselines[model_name] = (servers_metrics, now, baseline)
+        return baseline
+
+    def score(self, server: str, baseline: Optional[float] = None) -> float:
+        return self.latency(server, baseline) * (self.inflight.get_requests(server) + 1)
+
+    def select(
+        self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]], exclude: Collection[str] = ()
+    ) -> Optional[str]:
+        """
+        무작위로 두 서버를 뽑아 점수가 낮은 쪽을 반환합니다.
+
+        :param exclude: 후보에서 뺄 서버
+        """
+        if self._snapshots.get(model_name) is not servers_metrics:
+            self._snapshots[model_name] = servers_metrics
+            self._servers[model_name] = tuple(servers_metrics)
+        first, second = pick_two(self._servers[model_name], exclude)
+        if second is None:
+            return first
+        baseline = self.baseline(model_name, servers_metrics)
+        return first if self.score(first, baseline) <= self.score(second, baseline) else second
@@ -0,0 +1,173 @@
+import bisect
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_PREFIX_AFFINITY_CONFIG = {
+    "block_size": 256,  # 프리픽스 블록 크기 (문자 수)
+    "max_blocks": 128,  # 요청당 해시할 최대 블록 수
+    "virtual_nodes": 64,  # 서버당 해시 링 가상 노드 수
+    "load_factor": 1.25,  # bounded-load 계수 (평균 부하 대비 허용 배수)
+    "max_entries": 200_000,  # 프리픽스 -> 서버 기억 테이블 최대 크기
+    "saturation_waiting": 8,  # 이 이상 대기 요청이 쌓이면 포화로 간주
+    "saturation_cache_usage": 0.95,  # 이 이상 KV 캐시를 쓰면 포화로 간주
+}
+
+
+def prompt_text(payload: Mapping) -> str:
+    """
+    Chat(messages) / Completion(prompt) 요청에서 프리픽스 해싱에 사용할 텍스트를 만듭니다.
+    """
+    messages = payload.get("messages")
+    if messages is not None:
+        parts = []
+        for message in messages:
+            content = message.get("content", "")
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+            parts.append(f"{message.get('role', '')}\x1f{content}\x1e")
+        return "".join(parts)
+    prompt = payload.get("prompt", "")
+    if isinstance(prompt, str):
+        return prompt
+    return json.dumps(prompt, ensure_ascii=False)
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class PrefixAffinityRouter:
+    """
+    KV 프리픽스 캐시 친화 라우팅.
+
+    프롬프트를 고정 크기 문자 블록으로 나누어 누적 해시를 만들고,
+    1) 같은 프리픽스를 최근에 처리한 서버가 있으면 가장 긴 일치 프리픽스의 서버로,
+    2) 처음 보는 프리픽스는 첫 블록 해시로 consistent hashing(bounded load) 링에서 서버를 고릅니다.
+    선호 서버가 허용 부하(bounded load)를 넘으면 링의 다음 서버로 넘어가고,
+    수집된 메트릭상 포화 상태이면 가장 부하가 적은 서버로 대체합니다.
+    """
+
+    def __init__(self, **config):
+        options = {**DEFAULT_PREFIX_AFFINITY_CONFIG, **config}
+        self.block_size = int(options["block_size"])
+        self.max_blocks = int(options["max_blocks"])
+        self.virtual_nodes = int(options["virtual_nodes"])
+        self.load_factor = float(options["load_factor"])
+        self.max_entries = int(options["max_entries"])
+        self.saturation_waiting = options["saturation_waiting"]
+        self.saturation_cache_usage = options["saturation_cache_usage"]
+
+        self._table: "OrderedDict[bytes, str]" = OrderedDict()
+        self._rings: Dict[Tuple[str, ...], Tuple[List[int], List[str]]] = {}
+
+    def prefix_hashes(self, model_name: str, payload: Mapping) -> List[bytes]:
+        """
+        블록 단위 누적 프리픽스 해시 목록을 반환합니다 (짧은 프리픽스부터).
+
+        마지막의 불완전한 블록은 vLLM 이 캐시하지 않으므로 제외하되,
+        프롬프트가 한 블록보다 짧으면 전체를 하나의 키로 사용합니다.
+        """
+        text = prompt_text(payload)
+        hasher = hashlib.blake2b(model_name.encode(), digest_size=16)
+        block_count = min(len(text) // self.block_size, self.max_blocks)
+        if block_count == 0:
+            hasher.update(text.encode())
+            return [hasher.digest()]
+        hashes = []
+        for index in range(block_count):
+            start = index * self.block_size
+            hasher.update(text[start : start + self.block_size].encode())
+            hashes.append(hasher.digest())
+        return hashes
+
+    def _ring(self, servers: Sequence[str]) -> Tuple[List[int], List[str]]:
+        key = tuple(sorted(servers))
+        ring = self._rings.get(key)
+        if ring is None:
+            points = sorted(
+                (_ring_hash(f"{server}#{i}"), server) for server in key for i in range(self.virtual_nodes)
+            )
+            ring = ([point for point, _ in points], [server for _, server in points])
+            if len(self._rings) > 64:
+                self._rings.clear()
+            self._rings[key] = ring
+        return ring
+
+    def load(self, metrics: Mapping[str, float]) -> float:
+        return metrics.get("num_requests_running", 0) + metrics.get("num_requests_waiting", 0)
+
+    def is_saturated(self, metrics: Mapping[str, float]) -> bool:
+        return (
+            metrics.get("num_requests_waiting", 0) >= self.saturation_waiting
+            or metrics.get("gpu_cache_usage", 0.0) >= self.saturation_cache_usage
+        )
+
+    def least_loaded(self, servers_metrics: Mapping[str, Mapping[str, float]]) -> str:
+        return min(servers_metrics, key=lambda server: self.load(servers_metrics[server]))
+
+    def select(
+        self, model_name: str, servers_metrics: Mapping[str, Mapping[str, float]], payload: Optional[Mapping]
+    ) -> Optional[str]:
+        """
+        요청 프리픽스에 맞는 서버를 선택하고 선택 결과를 기억합니다.
+
+        :param servers_metrics: 후보 서버별 메트릭 {server_url: {metric_name: value}}
+        :param payload: 요청 본문 (없으면 최소 부하 서버)
+        """
+        if not servers_metrics:
+            return None
+        if not payload:
+            return self.least_loaded(servers_metrics)
+
+        hashes = self.prefix_hashes(model_name, payload)
+        loads = {server: self.load(metrics) for server, metrics in servers_metrics.items()}
+        capacity = math.ceil(self.load_factor * (sum(loads.values()) + 1) / len(loads))
+
+        selected = None
+        for prefix_hash in reversed(hashes):
+            server = self._table.get(prefix_hash)
+            if server is not None and server in loads:
+                if loads[server] + 1 <= capacity:
+                    selected = server
+                break
+        if selected is None:
+            selected = self._ring_select(servers_metrics, loads, capacity, hashes[0])
+        if self.is_saturated(servers_metrics[selected]):
+            selected = self.least_loaded(servers_metrics)
+
+        table = self._table
+        for prefix_hash in hashes:
+            table[prefix_hash] = selected
+            table.move_to_end(prefix_hash)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+        return selected
+
+    def _ring_select(
+        self,
+        servers_metrics: Mapping[str, Mapping[str, float]],
+        loads: Dict[str, float],
+        capacity: float,
+        prefix_hash: bytes,
+    ) -> str:
+        """
+        Consistent hashing with bounded loads: 링에서 시계 방향으로 돌며 허용 부하 이하인 첫 서버를 고릅니다.
+        허용 부하는 평균 부하의 load_factor 배입니다.
+        """
+        points, owners = self._ring(list(servers_metrics))
+
+        start = bisect.bisect(points, int.from_bytes(prefix_hash[:8], "big")) % len(points)
+        seen = set()
+        for offset in range(len(points)):
+            server = owners[(start + offset) % len(points)]
+            if server in seen:
+                continue
+            seen.add(server)
+            if loads[server] + 1 <= capacity:
+                return server
+            if len(seen) == len(loads):
+                break
+        return self.least_loaded(servers_metrics)
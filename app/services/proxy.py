@@ -0,0 +1,175 @@
+import time
+from typing import AsyncIterator, Dict, Optional, Union
+
+from fastapi import HTTPException, Request
+
+from app.services.access_log import note_request
+from app.services.instrumentation import router_metrics
+from app.services.load_balancer import LoadBalancer
+from app.services.response_cache import ResponseCache, replay_as_sse
+from app.services.scheduler import AdmissionController, AdmissionRejected, Ticket
+from app.services.tracing import current_trace
+from app.services.usage import RateLimited, UsageMeter
+
+
+async def admit(
+    admission: Optional[AdmissionController], model_name: Optional[str], headers: Dict, cost: float = 0.0
+) -> Optional[Ticket]:
+    """
+    모델 대기열에서 실행 권한을 얻습니다. 스케줄러가 꺼져 있으면 None.
+
+    :param cost: 요청의 예상 토큰 비용 (토큰 예산 기반 대기열)
+
+    :raises HTTPException: 대기열 초과(429) 또는 마감 시간 초과(503), Retry-After 헤더 포함
+    """
+    if admission is None or not admission.enabled:
+        return None
+    priority, tenant, timeout = admission.request_context(headers)
+    trace = current_trace()
+    started_at = time.perf_counter()
+    try:
+        return await admission.acquire(model_name, priority, tenant, timeout, cost)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)}
+        )
+    finally:
+        if trace is not None:
+            trace.add_span("queue", started_at, time.perf_counter(), {"priority": priority})
+
+
+def check_rate_limit(usage: Optional[UsageMeter], headers: Dict):
+    """
+    테넌트 토큰 속도 제한을 확인합니다. 사용량 집계가 꺼져 있으면 아무것도 하지 않습니다.
+
+    :raises HTTPException: 최근 창의 토큰 사용량이 한도 이상일 때 (429), Retry-After 헤더 포함
+    """
+    if usage is None:
+        return
+    try:
+        usage.check(usage.tenant(headers))
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+
+async def forward_completion(
+    request: Request,
+    body: Dict,
+    path: str,
+    load_balancer: LoadBalancer,
+    response_cache: Optional[ResponseCache] = None,
+    admission: Optional[AdmissionController] = None,
+) -> Union[AsyncIterator[bytes], Dict]:
+    """
+    OpenAI 호환 요청(/v1/chat/completions, /v1/completions)을 서버 선택 후 전달합니다.
+
+    응답 캐시가 켜져 있고 결정적인 요청이면 캐시된 응답을 사용하며,
+    스트리밍 요청에는 캐시된 응답을 SSE 청크로 재생합니다.
+    업스트림 호출은 모델 대기열에서 실행 권한을 얻은 뒤에만 이루어지며, 스트림은 끝날 때까지 권한을 유지합니다.
+    연결 오류/503 은 다른 서버로 재시도하고, 스트림은 첫 바이트 이전 실패 시 다른 서버로 다시 연결합니다.
+    fanout 설정이 켜져 있으면 n > 1 요청을 여러 서버로 나눠 보내고 choices 를 합칩니다.
+
+    :param body: 요청 본문 딕셔너리
+    :param path: 업스트림 경로
+    :raises HTTPException: 라우팅 테이블에 없는 모델 (404), 사용 가능한 서버가 없을 때 (503),
+        대기열에서 거절될 때 (429/503)
+    :raises RuntimeError: 업스트림 요청 실패
+    """
+    started_at = time.perf_counter()
+    model_name = body.get("model") or ""
+    trace = current_trace()
+    if trace is not None:
+        trace.attributes["model"] = model_name
+    note_request(body)
+    try:
+        response = await _forward_completion(request, body, path, load_balancer, response_cache, admission)
+    except HTTPException:
+        router_metrics.observe_request(path, model_name, "rejected", time.perf_counter() - started_at)
+        raise
+    except BaseException:
+        router_metrics.observe_request(path, model_name, "error", time.perf_counter() - started_at)
+        raise
+    if body.get("stream"):
+        # 스트림은 첫 바이트/청크 간격/종료 시점을 기록
+        return router_metrics.track_stream(path, model_name, started_at, response)
+    router_metrics.observe_request(path, model_name, "ok", time.perf_counter() - started_at)
+    return response
+
+
+async def _forward_completion(
+    request: Request,
+    body: Dict,
+    path: str,
+    load_balancer: LoadBalancer,
+    response_cache: Optional[ResponseCache],
+    admission: Optional[AdmissionController],
+) -> Union[AsyncIterator[bytes], Dict]:
+    model_name = body.get("model")
+    stream = bool(body.get("stream"))
+    headers = dict(request.headers)
+    # 모르는 모델은 대기열(모델별로 계속 남음)을 만들기 전에 거절
+    if model_name not in load_balancer.routing.table.models:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+
+    # 캐시 적중도 테넌트 토큰 속도 제한을 받음
+    check_rate_limit(load_balancer.usage, headers)
+
+    async def fetch():
+        cost = load_balancer.token_costs.estimate(model_name, body).work if admission is not None else 0.0
+        ticket = await admit(admission, model_name, headers, cost)
+        try:
+            parts = load_balancer.fanout.splits(body)
+            if parts > 1:
+                # n > 1 요청은 여러 서버로 나눠 보내고 결과를 합침
+                response = await load_balancer.forward_fanout(model_name, path, body, headers, stream, parts)
+                if response is None:
+                    raise HTTPException(status_code=503, detail="No available servers for the model.")
+            else:
+                selected_server = await load_balancer.select_server(model_name, payload=body)
+                if not selected_server:
+                    raise HTTPException(status_code=503, detail="No available servers for the model.")
+                response = await load_balancer.forward_with_retries(
+                    selected_server, model_name, path, body, headers, stream=stream
+                )
+        except BaseException:
+            if ticket is not None:
+                admission.release(ticket)
+            raise
+        if ticket is None:
+            return response
+        if stream:
+            return admission.hold_stream(ticket, response)
+        admission.release(ticket)
+        return response
+
+    if response_cache is None or not response_cache.is_cacheable(body):
+        return await fetch()
+
+    cache_key = response_cache.make_key(path, body, response_cache.scope(headers))
+    if not stream:
+        fetched = False
+
+        async def fetch_once():
+            nonlocal fetched
+            fetched = True
+            return await fetch()
+
+        response = await response_cache.get_or_fetch(cache_key, fetch_once)
+        if not fetched:
+            # 캐시 적중 또는 다른 요청의 응답을 함께 받은 경우
+            _record_cache_hit(load_balancer.usage, headers, model_name, response)
+        return response
+
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        _record_cache_hit(load_balancer.usage, headers, model_name, cached)
+        return replay_as_sse(cached)
+    return await fetch()
+
+
+def _record_cache_hit(usage: Optional[UsageMeter], headers: Dict, model_name: Optional[str], response: Dict):
+    """
+    캐시에서 받은 응답의 usage 를 테넌트 사용량으로 기록합니다 (서버는 "cache").
+    """
+    if usage is not None:
+        usage.record_response(usage.tenant(headers), model_name, "cache", response.get("usage"))
@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from app.services.scheduler import TenantResolver
+
+DEFAULT_RESPONSE_CACHE_CONFIG = {
+    "enabled": False,
+    "max_bytes": 64 * 1024 * 1024,  # 메모리 계층 최대 크기
+    "max_entry_bytes": 1024 * 1024,  # 이보다 큰 응답은 캐시하지 않음
+    "ttl": 600,  # 초
+    "disk_path": None,  # 지정 시 디스크 계층 사용
+    "disk_max_bytes": 1024 * 1024 * 1024,
+}
+
+# 캐시 키에서 제외할 필드 (응답 내용에 영향을 주지 않음)
+_KEY_EXCLUDED_FIELDS = ("stream", "stream_options", "user")
+
+
+class ResponseCache:
+    """
+    결정적(temperature=0 또는 seed 지정) 요청의 응답 캐시.
+
+    - 메모리 계층: 직렬화된 응답 바이트 기준 용량 제한 + TTL + LRU 제거
+    - 디스크 계층(선택): 메모리에서 밀려난 항목도 TTL 동안 재사용
+    - 동일한 요청이 동시에 들어오면 업스트림 호출 한 번으로 합침(coalescing)
+    - 키에 인증 정보와 테넌트가 들어가므로 캐시된 응답은 같은 자격 증명을 보낸 요청끼리만 공유
+    """
+
+    def __init__(self, tenants: Optional[TenantResolver] = None, **config):
+        """
+        :param tenants: 테넌트를 정하는 방법 (없으면 tenants 기본 설정)
+        """
+        options = {**DEFAULT_RESPONSE_CACHE_CONFIG, **config}
+        self.tenants = tenants or TenantResolver()
+        self.max_bytes = int(options["max_bytes"])
+        self.max_entry_bytes = int(options["max_entry_bytes"])
+        self.ttl = float(options["ttl"])
+        self.disk_path = options["disk_path"]
+        self.disk_max_bytes = int(options["disk_max_bytes"])
+
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._disk_files: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()  # 디스크 입출력은 워커 스레드에서 실행
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.disk_path:
+            os.makedirs(self.disk_path, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def is_cacheable(body: Dict) -> bool:
+        """
+        같은 요청이 같은 응답을 내는 경우에만 캐시합니다.
+        """
+        return body.get("temperature") == 0 or body.get("seed") is not None
+
+    def scope(self, headers: Mapping[str, str]) -> str:
+        """
+        캐시를 공유하는 범위. Authorization 헤더와 테넌트 식별자가 모두 같은 요청끼리만 응답을 재사용합니다.
+        """
+        return f"{headers.get('authorization', '')}\n{self.tenants(headers)}"
+
+    @staticmethod
+    def make_key(path: str, body: Dict, scope: str = "") -> str:
+        """
+        정규화된 요청 본문의 해시를 캐시 키로 사용합니다. 스트리밍 여부는 키에 포함하지 않습니다.
+
+        :param scope: scope() 로 만든 요청자 범위 (다른 테넌트에게 응답이 새지 않도록 키에 포함)
+        """
+        normalized = {key: value for key, value in body.items() if key not in _KEY_EXCLUDED_FIELDS}
+        canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(f"{scope}\n{path}\n{canonical}".encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """
+        캐시된 응답을 반환합니다. 없으면 None.
+        """
+        data = self._get_memory(key)
+        if data is None and self.disk_path:
+            data = await asyncio.to_thread(self._read_disk, key)
+            if data is not None:
+                self.disk_hits += 1
+                self._put_memory(key, data)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(data)
+
+    async def put(self, key: str, value: Dict):
+        data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+        if len(data) > self.max_entry_bytes:
+            return
+        self._put_memory(key, data)
+        if self.disk_path:
+            await asyncio.to_thread(self._write_disk, key, data)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        캐시에 있으면 반환하고, 없으면 fetch 를 한 번만 호출해 결과를 캐시합니다.
+
+        같은 키로 진행 중인 호출이 있으면 그 결과를 함께 기다립니다.
+        fetch 는 별도 작업으로 실행되므로 처음 요청한 클라이언트가 연결을 끊어도
+        함께 기다리는 요청은 취소되지 않습니다.
+        """
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = asyncio.ensure_future(self._fetch(key, fetch))
+            pending.add_done_callback(lambda task: self._fetched(key, task))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(pending)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        value = await self.get(key)
+        if value is None:
+            value = await fetch()
+            await self.put(key, value)
+        return value
+
+    def _fetched(self, key: str, task: asyncio.Future):
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # 기다리던 요청이 모두 끊긴 경우 예외가 회수되지 않았다는 경고를 막는다
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            self._remove_memory(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def _put_memory(self, key: str, data: bytes):
+        if key in self._entries:
+            self._remove_memory(key)
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove_memory(oldest)
+            self.evictions += 1
+
+    def _remove_memory(self, key: str):
+        _, data = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.json")
+
+    def _load_disk_index(self):
+        files = []
+        for name in os.listdir(self.disk_path):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.disk_path, name))
+                files.append((stat.st_mtime, name[: -len(".json")], stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk_files[key] = size
+            self._disk_bytes += size
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        with self._disk_lock:
+            if key not in self._disk_files:
+                return None
+            path = self._disk_file(key)
+            try:
+                if os.path.getmtime(path) + self.ttl < time.time():
+                    self._remove_disk(key)
+                    self.expirations += 1
+                    return None
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                self._disk_bytes -= self._disk_files.pop(key, 0)
+                return None
+
+    def _write_disk(self, key: str, data: bytes):
+        path = self._disk_file(key)
+        with self._disk_lock:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(data) - self._disk_files.pop(key, 0)
+            self._disk_files[key] = len(data)
+            while self._disk_bytes > self.disk_max_bytes and self._disk_files:
+                self._remove_disk(next(iter(self._disk_files)))
+                self.evictions += 1
+
+    def _remove_disk(self, key: str):
+        self._disk_bytes -= self._disk_files.pop(key, 0)
+        try:
+            os.remove(self._disk_file(key))
+        except FileNotFoundError:
+            pass
+
+
+def _sse(data: Dict) -> bytes:
+    return b"data: " + json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode() + b"\n\n"
+
+
+async def replay_as_sse(response: Dict) -> AsyncIterator[bytes]:
+    """
+    캐시된 일반 응답을 OpenAI 스트리밍(SSE) 청크 형식으로 다시 내보냅니다.
+    """
+    is_chat = response.get("object") == "chat.completion"
+    base = {
+        "id": response.get("id"),
+        "object": "chat.completion.chunk" if is_chat else "text_completion",
+        "created": response.get("created"),
+        "model": response.get("model"),
+    }
+    for choice in response.get("choices", []):
+        index = choice.get("index", 0)
+        if is_chat:
+            message = choice.get("message") or {}
+            delta = {"role": message.get("role", "assistant"), "content": message.get("content", "")}
+            if message.get("tool_calls"):
+                delta["tool_calls"] = message["tool_calls"]
+            yield _sse({**base, "choices": [{"index": index, "delta": delta, "finish_reason": None}]})
+            final = {"index": index, "delta": {}, "finish_reason": choice.get("finish_reason")}
+        else:
+            yield _sse(
+                {
+                    **base,
+                    "choices": [
+                        {"index": index, "text": choice.get("text", ""), "logprobs": choice.get("logprobs"), "finish_reason": None}
+                    ],
+                }
+            )
+            final = {"index": index, "text": "", "logprobs": None, "finish_reason": choice.get("finish_reason")}
+        yield _sse({**base, "choices": [final]})
+    if response.get("usage") is not None:
+        yield _sse({**base, "choices": [], "usage": response["usage"]})
+    yield b"data: [DONE]\n\n"
@@ -0,0 +1,102 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+import httpx
+
+DEFAULT_RETRY_CONFIG = {
+    "max_retries": 2,  # 실패한 요청을 다른 서버로 다시 보내는 최대 횟수 (헤지는 세지 않음)
+    "retry_on_status": [503],
+    "budget_ratio": 0.2,  # 요청 하나당 적립되는 재시도 토큰 (재시도 비율 상한 20%)
+    "budget_min_per_second": 5.0,  # 트래픽이 적을 때도 허용하는 초당 재시도 수
+    "budget_max_tokens": 20.0,
+    "hedge": False,  # 지연된 요청을 두 번째 서버로 중복 전송 (예산 토큰은 재시도와 함께 씀)
+    "hedge_quantile": 0.95,
+    "hedge_min_delay": 0.05,  # 초
+    "hedge_min_samples": 20,  # 이보다 지연 표본이 적으면 헤징하지 않음
+    "stream_failover": True,  # 첫 바이트 이전에 실패한 스트림을 다른 서버로 다시 연결
+}
+
+# 요청이 서버에서 처리되지 않았다고 볼 수 있는 연결 오류
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+def is_retryable(error: BaseException, retry_on_status: Iterable[int] = (503,)) -> bool:
+    """
+    LoadBalancer.forward_request 가 던진 오류(원인 예외 포함)가 재시도 대상인지 판단합니다.
+    """
+    cause = error.__cause__ if isinstance(error, RuntimeError) and error.__cause__ else error
+    if isinstance(cause, httpx.HTTPStatusError):
+        return cause.response.status_code in retry_on_status
+    return isinstance(cause, RETRYABLE_ERRORS)
+
+
+class RetryBudget:
+    """
+    재시도/헤지 요청이 장애를 증폭시키지 않도록 제한하는 토큰 버킷.
+
+    원 요청마다 ratio 만큼, 시간에 따라 초당 min_per_second 만큼 토큰이 쌓이고 재시도 한 번에 1 을 씁니다.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 5.0, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated_at = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self.updated_at) * self.min_per_second, self.max_tokens)
+        self.updated_at = now
+
+    def deposit(self):
+        self._refill()
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def try_withdraw(self) -> bool:
+        self._refill()
+        if self.tokens < 1.0:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class LatencyTracker:
+    """
+    모델별 최근 응답 시간 표본. 헤지 지연 시간(p95 등)을 계산하는 데 사용합니다.
+    """
+
+    def __init__(self, window: int = 512, refresh_every: int = 32):
+        self.window = window
+        self.refresh_every = refresh_every
+        self._samples: Dict[Optional[str], Deque[float]] = {}
+        self._pending: Dict[Optional[str], int] = {}
+        self._quantiles: Dict[Tuple, float] = {}
+
+    def record(self, model_name: Optional[str], seconds: float):
+        samples = self._samples.get(model_name)
+        if samples is None:
+            samples = self._samples[model_name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self._pending[model_name] = self._pending.get(model_name, 0) + 1
+
+    def count(self, model_name: Optional[str]) -> int:
+        return len(self._samples.get(model_name, ()))
+
+    def quantile(self, model_name: Optional[str], q: float) -> Optional[float]:
+        """
+        최근 표본의 분위수. 정렬 비용을 줄이기 위해 refresh_every 개의 새 표본마다 다시 계산합니다.
+        """
+        samples = self._samples.get(model_name)
+        if not samples:
+            return None
+        key = (model_name, q)
+        cached = self._quantiles.get(key)
+        if cached is None or self._pending.get(model_name, 0) >= self.refresh_every:
+            ordered = sorted(samples)
+            cached = self._quantiles[key] = ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+            self._pending[model_name] = 0
+        return cached
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import os
+import tempfile
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from app.utils.config_loader import ConfigLoader
+
+DEFAULT_ROUTING_CONFIG = {
+    "watch": True,  # config.json 변경을 감시해 라우팅 테이블을 다시 만든다
+    "watch_interval": 1.0,  # 파일 변경 확인 주기 (초)
+}
+
+DEFAULT_STRATEGY = "round_robin"
+
+
+class ModelRoute(NamedTuple):
+    servers: Tuple[str, ...]
+    strategy: str
+
+
+class RoutingTable:
+    """
+    모델별 서버 목록/전략과 드레이닝 중인 노드를 담은 불변 라우팅 테이블.
+
+    변경 시 테이블 전체를 새로 만들어 참조를 교체하므로, 읽기 측은 잠금 없이 현재 테이블을 참조만 하면 됩니다.
+    """
+
+    __slots__ = ("models", "draining", "active", "version")
+
+    def __init__(
+        self, models: Mapping[str, ModelRoute], draining: Iterable[str] = (), version: int = 0
+    ):
+        """
+        :param models: {model_name: ModelRoute}
+        :param draining: 새 요청을 받지 않는 노드 (진행 중 요청/스트림은 끝까지 처리)
+        :param version: 교체될 때마다 1 씩 증가하는 번호
+        """
+        self.models: Mapping[str, ModelRoute] = MappingProxyType(dict(models))
+        servers = {server for route in self.models.values() for server in route.servers}
+        # 더 이상 어떤 모델에도 없는 노드는 드레이닝 목록에서도 뺀다
+        self.draining: FrozenSet[str] = frozenset(server for server in draining if server in servers)
+        # 선택 후보가 되는 서버 목록은 테이블을 만들 때 한 번만 계산
+        self.active: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+            model: tuple(server for server in route.servers if server not in self.draining)
+            for model, route in self.models.items()
+        })
+        self.version = version
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, draining: Optional[Iterable[str]] = None, version: int = 0
+    ) -> "RoutingTable":
+        """
+        :param draining: 지정하지 않으면 config 의 "draining" 목록을 사용
+        """
+        if draining is None:
+            draining = config.get("draining", ())
+        models = {
+            model_name: ModelRoute(
+                tuple(dict.fromkeys(model.get("servers", []))), model.get("strategy", DEFAULT_STRATEGY)
+            )
+            for model_name, model in config.get("models", {}).items()
+        }
+        return cls(models, draining, version)
+
+    def strategy(self, model_name: str) -> str:
+        route = self.models.get(model_name)
+        return route.strategy if route is not None else DEFAULT_STRATEGY
+
+    def servers(self, model_name: str) -> Tuple[str, ...]:
+        route = self.models.get(model_name)
+        return route.servers if route is not None else ()
+
+    def servers_by_model(self) -> Dict[str, List[str]]:
+        return {model: list(route.servers) for model, route in self.models.items()}
+
+    def unique_servers(self) -> List[str]:
+        return list(dict.fromkeys(server for route in self.models.values() for server in route.servers))
+
+    def to_config(self) -> Dict[str, Dict]:
+        """
+        config.json 의 "models" 섹션 형식으로 변환합니다.
+        """
+        return {
+            model: {"servers": list(route.servers), "strategy": route.strategy}
+            for model, route in self.models.items()
+        }
+
+
+class RoutingTableManager:
+    """
+    config.json 과 관리자 API 변경 사항으로 라우팅 테이블을 만들고 원자적으로 교체합니다.
+
+    - 관리자 API 변경은 새 테이블로 교체한 뒤 config.json 에 원자적으로(임시 파일 + rename) 저장
+    - watch() 는 config.json 의 변경을 감시해 다시 읽고, 파싱에 실패하면 기존 테이블을 유지
+    - 드레이닝 상태도 config.json 의 "draining" 목록에 저장하므로 파일을 감시하는 다른 워커와 재시작 후에도 유지
+    - 교체될 때마다 리스너(MetricsCollector 등)에 새 테이블을 알림
+    """
+
+    def __init__(self, config_loader: ConfigLoader, **config):
+        """
+        :param config_loader: 설정 파일 경로와 현재 설정을 가진 ConfigLoader
+        :param config: DEFAULT_ROUTING_CONFIG 를 덮어쓸 설정
+        """
+        config = {**DEFAULT_ROUTING_CONFIG, **config}
+        self.config_loader = config_loader
+        self.watch_enabled = config["watch"]
+        self.watch_interval = config["watch_interval"]
+        self.table = RoutingTable.from_config(config_loader.config)
+        self.reloads = 0
+        self.reload_errors = 0
+        self._listeners: List[Callable[[RoutingTable], None]] = []
+        self._file_state = self._stat()
+
+    def add_listener(self, callback: Callable[[RoutingTable], None]):
+        """
+        라우팅 테이블이 교체될 때마다 호출될 콜백을 등록합니다.
+
+        :param callback: callback(table)
+        """
+        self._listeners.append(callback)
+
+    def _swap(self, models: Mapping[str, ModelRoute], draining: Iterable[str]) -> RoutingTable:
+        table = RoutingTable(models, draining, self.table.version + 1)
+        self.table = table
+        for callback in self._listeners:
+            callback(table)
+        return table
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.config_loader.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        """
+        config.json 을 다시 읽어 테이블을 교체합니다.
+
+        :return: 성공 여부 (실패 시 기존 테이블 유지)
+        """
+        try:
+            config = self.config_loader.load_config()
+        except RuntimeError as e:
+            self.reload_errors += 1
+            print(f"Failed to reload {self.config_loader.config_path}: {e}")
+            return False
+        self.config_loader.config = config
+        table = RoutingTable.from_config(config)
+        self._swap(table.models, table.draining)
+        self.reloads += 1
+        return True
+
+    def _persist(self):
+        config = {**self.config_loader.config, "models": self.table.to_config()}
+        config.pop("draining", None)
+        if self.table.draining:
+            config["draining"] = sorted(self.table.draining)
+        path = self.config_loader.config_path
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=2)
+                f.write("\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.config_loader.config = config
+        # 방금 쓴 파일을 감시자가 다시 읽지 않도록 기록
+        self._file_state = self._stat()
+
+    def set_model(self, model_name: str, servers: List[str], strategy: str) -> RoutingTable:
+        """
+        모델을 추가하거나 서버 목록/전략을 바꾸고 설정 파일에 저장합니다.
+        """
+        models = dict(self.table.models)
+        models[model_name] = ModelRoute(tuple(dict.fromkeys(servers)), strategy)
+        table = self._swap(models, self.table.draining)
+        self._persist()
+        return table
+
+    def delete_model(self, model_name: str) -> RoutingTable:
+        """
+        모델을 라우팅 테이블과 설정 파일에서 제거합니다. 진행 중 요청/스트림은 그대로 끝까지 처리됩니다.
+        """
+        models = dict(self.table.models)
+        models.pop(model_name, None)
+        table = self._swap(models, self.table.draining)
+        self._persist()
+        return table
+
+    def drain(self, server: str) -> RoutingTable:
+        """
+        노드에 새 요청이 가지 않도록 하고 설정 파일에 저장합니다. 진행 중 요청/스트림은 끝까지 처리됩니다.
+        """
+        table = self._swap(self.table.models, self.table.draining | {server})
+        self._persist()
+        return table
+
+    def undrain(self, server: str) -> RoutingTable:
+        table = self._swap(self.table.models, self.table.draining - {server})
+        self._persist()
+        return table
+
+    async def watch(self):
+        """
+        config.json 의 수정 시각/크기를 주기적으로 확인해 바뀌면 다시 읽습니다.
+        """
+        if not self.watch_enabled:
+            return
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            state = self._stat()
+            if state is not None and state != self._file_state:
+                self._file_state = state
+                self.reload()
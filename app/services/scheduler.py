@@ -0,0 +1,378 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Mapping, Optional
+
+from app.services.metrics_collector import MetricsCollector
+from app.utils.streams import ClosingStream
+
+DEFAULT_ADMISSION_CONFIG = {
+    "enabled": True,
+    "per_server_concurrency": 64,  # 서버당 동시에 전달할 최대 요청 수
+    "min_per_server_concurrency": 2,  # 대기열이 길어져도 서버당 보장하는 최소 동시성
+    "max_queue_size": 512,  # 모델별 대기열 최대 길이
+    "max_queue_wait": 30.0,  # 대기열 최대 대기 시간 (초)
+    "per_server_token_budget": 0,  # 서버당 동시에 처리할 최대 예상 토큰 (prefill + decode), 0 이면 사용 안 함
+    "priority_header": "x-priority",
+    "timeout_header": "x-request-timeout",  # 클라이언트가 허용하는 대기 시간 (초)
+}
+
+DEFAULT_TENANT_CONFIG = {
+    # 인증을 마친 앞단 게이트웨이가 채우는 테넌트 헤더. None 이면 클라이언트가 보낸 테넌트 헤더는 무시
+    "trusted_header": None,
+    "api_keys": {},  # API 키 (Bearer 토큰) -> 테넌트
+}
+
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2, "batch": 3}
+DEFAULT_PRIORITY = PRIORITY_CLASSES["normal"]
+
+
+class AdmissionRejected(Exception):
+    """
+    대기열이 가득 찼거나 마감 시간 안에 처리할 수 없어 요청을 거절할 때 발생합니다.
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+def tenant_id(
+    headers: Mapping[str, str], trusted_header: Optional[str] = None, api_keys: Optional[Mapping[str, str]] = None
+) -> str:
+    """
+    테넌트 식별자. 클라이언트가 다른 테넌트를 사칭하거나 한도를 피하지 못하도록 자격 증명에서 정합니다.
+
+    - trusted_header 가 설정되어 있고 요청에 있으면 그 값 (신뢰할 수 있는 앞단만 라우터에 접근할 때 설정)
+    - api_keys 에 등록된 API 키면 해당 테넌트
+    - 그 밖에는 Authorization 헤더의 해시, Authorization 헤더도 없으면 "anonymous"
+    """
+    if trusted_header:
+        tenant = headers.get(trusted_header)
+        if tenant:
+            return tenant
+    authorization = headers.get("authorization")
+    if not authorization:
+        return "anonymous"
+    if api_keys:
+        key = authorization[7:].strip() if authorization[:7].lower() == "bearer " else authorization
+        tenant = api_keys.get(key)
+        if tenant:
+            return tenant
+    return hashlib.sha256(authorization.encode()).hexdigest()[:16]
+
+
+class TenantResolver:
+    """
+    tenants 설정으로 요청 헤더의 테넌트를 정합니다 (대기열 공정 분배, 사용량 집계, 응답 캐시, 배치 작업이 공유).
+    """
+
+    def __init__(self, **config):
+        """
+        :param config: DEFAULT_TENANT_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_TENANT_CONFIG, **config}
+        self.trusted_header = options["trusted_header"]
+        self.api_keys: Dict[str, str] = dict(options["api_keys"])
+
+    def __call__(self, headers: Mapping[str, str]) -> str:
+        return tenant_id(headers, self.trusted_header, self.api_keys)
+
+    def forwarded_headers(self, tenant: str) -> Dict[str, str]:
+        """
+        라우터가 직접 만든 요청(배치 작업)이 같은 테넌트로 처리되도록 붙일 헤더.
+        신뢰하는 테넌트 헤더가 없으면 함께 전달하는 Authorization 헤더로 같은 테넌트가 됩니다.
+        """
+        return {self.trusted_header: tenant} if self.trusted_header else {}
+
+
+class _Waiter:
+    __slots__ = ("future", "tenant", "enqueued_at", "cost")
+
+    def __init__(self, future: asyncio.Future, tenant: str, enqueued_at: float, cost: float = 0.0):
+        self.future = future
+        self.tenant = tenant
+        self.enqueued_at = enqueued_at
+        self.cost = cost
+
+
+class ModelQueue:
+    """
+    모델 하나의 동시성 한도와 우선순위/테넌트별 대기열.
+    """
+
+    def __init__(self, model_name: Optional[str]):
+        self.model_name = model_name
+        self.limit = 0
+        self.active = 0
+        self.queued = 0
+        self.token_limit = 0.0  # 0 이면 토큰 예산 없음
+        self.active_tokens = 0.0
+        # 우선순위 -> 테넌트 -> 대기 요청 (테넌트 순서는 라운드로빈 용도로 회전)
+        self.waiters: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {}
+        self.active_by_tenant: Dict[str, int] = {}
+        self.snapshot: Optional[Mapping] = None
+
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+        self.wait_time_avg = 0.0
+        self.wait_time_max = 0.0
+        self.service_time_avg = 0.0  # 측정값이 생기기 전에는 예상 대기 시간으로 거절하지 않음
+
+    def record_wait(self, wait: float):
+        self.wait_time_avg += 0.1 * (wait - self.wait_time_avg)
+        self.wait_time_max = max(self.wait_time_max, wait)
+
+    def record_service(self, duration: float):
+        if self.service_time_avg == 0.0:
+            self.service_time_avg = duration
+        else:
+            self.service_time_avg += 0.1 * (duration - self.service_time_avg)
+
+    def estimated_wait(self, position: int) -> float:
+        """
+        대기열 위치와 평균 처리 시간으로 예상 대기 시간을 계산합니다.
+        """
+        return (position + 1) * self.service_time_avg / max(self.limit, 1)
+
+    def fits(self, cost: float) -> bool:
+        """
+        토큰 예산 안에 들어가는지 확인합니다. 처리 중인 요청이 없으면 예산보다 큰 요청도 통과시킵니다.
+        """
+        return not self.token_limit or self.active == 0 or self.active_tokens + cost <= self.token_limit
+
+    def next_waiter(self) -> Optional[_Waiter]:
+        """
+        가장 높은 우선순위에서, 현재 처리 중인 요청이 가장 적은 테넌트의 요청을 꺼냅니다.
+        그 요청이 토큰 예산에 들어가지 않으면 꺼내지 않고 None 을 반환합니다 (앞선 요청이 계속 밀리지 않도록).
+        """
+        for priority in sorted(self.waiters):
+            tenants = self.waiters[priority]
+            while tenants:
+                tenant = min(tenants, key=lambda name: self.active_by_tenant.get(name, 0))
+                queue = tenants[tenant]
+                while queue and queue[0].future.done():
+                    queue.popleft()  # 마감 시간 초과로 이미 빠진 요청
+                if not queue:
+                    del tenants[tenant]
+                    continue
+                if not self.fits(queue[0].cost):
+                    return None
+                waiter = queue.popleft()
+                if queue:
+                    tenants.move_to_end(tenant)
+                else:
+                    del tenants[tenant]
+                return waiter
+            del self.waiters[priority]
+        return None
+
+
+class Ticket:
+    """
+    대기열을 통과한 요청의 실행 권한. 요청(스트림 포함)이 끝나면 release 해야 합니다.
+    """
+
+    __slots__ = ("queue", "tenant", "started_at", "released", "cost")
+
+    def __init__(self, queue: ModelQueue, tenant: str, cost: float = 0.0):
+        self.queue = queue
+        self.tenant = tenant
+        self.started_at = time.monotonic()
+        self.released = False
+        self.cost = cost
+
+
+class AdmissionController:
+    """
+    라우터와 LoadBalancer.select_server 사이의 스케줄링 계층.
+
+    - 모델별 동시성 한도: 서버당 한도에서 수집된 대기 요청 수를 빼 합산 (메트릭이 바뀌면 재계산)
+    - 설정 시 요청의 예상 토큰 비용 합계도 서버당 토큰 예산으로 제한 (긴 프롬프트가 몰리지 않도록)
+    - 우선순위 헤더 기반 우선순위 클래스, 같은 클래스 안에서는 테넌트별 공정 분배
+    - 대기열 초과 시 429, 마감 시간 안에 처리할 수 없으면 503 (둘 다 Retry-After 포함)
+    """
+
+    def __init__(self, metrics_collector: MetricsCollector, tenants: Optional[TenantResolver] = None, **config):
+        """
+        :param tenants: 테넌트를 정하는 방법 (없으면 tenants 기본 설정)
+        """
+        options = {**DEFAULT_ADMISSION_CONFIG, **config}
+        self.metrics_collector = metrics_collector
+        self.tenants = tenants or TenantResolver()
+        self.enabled = bool(options["enabled"])
+        self.per_server_concurrency = int(options["per_server_concurrency"])
+        self.min_per_server_concurrency = int(options["min_per_server_concurrency"])
+        self.max_queue_size = int(options["max_queue_size"])
+        self.max_queue_wait = float(options["max_queue_wait"])
+        self.per_server_token_budget = float(options["per_server_token_budget"])
+        self.priority_header = options["priority_header"]
+        self.timeout_header = options["timeout_header"]
+        self.queues: Dict[Optional[str], ModelQueue] = {}
+        metrics_collector.add_listener(self._on_snapshot)
+
+    def _on_snapshot(self, model_name: str, snapshot: Mapping):
+        # 새 메트릭으로 한도가 늘어났으면 대기 중인 요청을 바로 깨운다
+        queue = self.queues.get(model_name)
+        if queue is not None:
+            self._dispatch(queue)
+
+    def request_context(self, headers: Mapping[str, str]):
+        """
+        요청 헤더에서 (우선순위, 테넌트, 최대 대기 시간)을 읽습니다.
+        """
+        priority = headers.get(self.priority_header)
+        if priority is None:
+            priority = DEFAULT_PRIORITY
+        elif priority in PRIORITY_CLASSES:
+            priority = PRIORITY_CLASSES[priority]
+        else:
+            try:
+                priority = int(priority)
+            except ValueError:
+                priority = DEFAULT_PRIORITY
+        timeout = self.max_queue_wait
+        if headers.get(self.timeout_header):
+            try:
+                timeout = min(float(headers[self.timeout_header]), timeout)
+            except ValueError:
+                pass
+        return priority, self.tenants(headers), timeout
+
+    def _queue(self, model_name: Optional[str]) -> ModelQueue:
+        queue = self.queues.get(model_name)
+        if queue is None:
+            queue = self.queues[model_name] = ModelQueue(model_name)
+        snapshot = self.metrics_collector.get_metrics(model_name) if model_name else None
+        if queue.limit == 0 or snapshot is not queue.snapshot:
+            queue.snapshot = snapshot
+            queue.limit = self._compute_limit(model_name, snapshot)
+            if self.per_server_token_budget:
+                servers = len(snapshot) if snapshot else len(self.metrics_collector.servers.get(model_name, ()))
+                queue.token_limit = self.per_server_token_budget * max(servers, 1)
+        return queue
+
+    def _compute_limit(self, model_name: Optional[str], snapshot: Optional[Mapping]) -> int:
+        if not snapshot:
+            servers = self.metrics_collector.servers.get(model_name, ()) if model_name else ()
+            return self.per_server_concurrency * max(len(servers), 1)
+        limit = 0
+        for metrics in snapshot.values():
+            waiting = int(metrics.get("num_requests_waiting", 0))
+            limit += max(self.per_server_concurrency - waiting, self.min_per_server_concurrency)
+        return limit
+
+    async def acquire(
+        self, model_name: Optional[str], priority: int = DEFAULT_PRIORITY, tenant: str = "anonymous",
+        timeout: Optional[float] = None, cost: float = 0.0,
+    ) -> Ticket:
+        """
+        실행 권한을 얻을 때까지 대기합니다.
+
+        :param cost: 요청의 예상 토큰 비용 (토큰 예산을 쓸 때)
+
+        :raises AdmissionRejected: 대기열이 가득 찼거나(429) 마감 시간 안에 처리할 수 없을 때(503)
+        """
+        queue = self._queue(model_name)
+        timeout = self.max_queue_wait if timeout is None else timeout
+
+        if queue.active < queue.limit and queue.queued == 0 and queue.fits(cost):
+            return self._start(queue, tenant, 0.0, cost)
+
+        if queue.queued >= self.max_queue_size:
+            queue.rejected_full += 1
+            raise AdmissionRejected(429, "Too many queued requests for the model.", queue.estimated_wait(queue.queued))
+        estimated = queue.estimated_wait(queue.queued)
+        if estimated > timeout:
+            queue.rejected_deadline += 1
+            raise AdmissionRejected(503, "Request cannot be scheduled before its deadline.", estimated)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tenant, time.monotonic(), cost)
+        queue.waiters.setdefault(priority, OrderedDict()).setdefault(tenant, deque()).append(waiter)
+        queue.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 권한 배정과 시간 초과/취소가 겹친 경우
+                if isinstance(e, asyncio.TimeoutError):
+                    return waiter.future.result()
+                self.release(waiter.future.result())
+                raise
+            queue.queued -= 1
+            waiter.future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise  # 클라이언트가 대기 중 연결을 끊은 경우
+            queue.rejected_deadline += 1
+            raise AdmissionRejected(
+                503, "Timed out waiting for an available server.", queue.estimated_wait(queue.queued)
+            )
+        return waiter.future.result()
+
+    def hold_stream(self, ticket: Ticket, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        스트림이 끝나거나 닫힐 때까지 실행 권한을 유지합니다. 반복을 시작하기 전에 닫혀도 권한을 반납합니다.
+        """
+        return ClosingStream(chunks, on_close=lambda: self.release(ticket))
+
+    def _start(self, queue: ModelQueue, tenant: str, wait: float, cost: float = 0.0) -> Ticket:
+        queue.active += 1
+        queue.active_tokens += cost
+        queue.admitted += 1
+        queue.active_by_tenant[tenant] = queue.active_by_tenant.get(tenant, 0) + 1
+        queue.record_wait(wait)
+        return Ticket(queue, tenant, cost)
+
+    def release(self, ticket: Ticket):
+        """
+        실행 권한을 반납하고 대기 중인 다음 요청을 깨웁니다.
+        """
+        if ticket.released:
+            return
+        ticket.released = True
+        queue = ticket.queue
+        queue.active -= 1
+        queue.active_tokens = max(queue.active_tokens - ticket.cost, 0.0)
+        remaining = queue.active_by_tenant.get(ticket.tenant, 1) - 1
+        if remaining:
+            queue.active_by_tenant[ticket.tenant] = remaining
+        else:
+            queue.active_by_tenant.pop(ticket.tenant, None)
+        queue.record_service(time.monotonic() - ticket.started_at)
+        self._dispatch(queue)
+
+    def _dispatch(self, queue: ModelQueue):
+        if queue.model_name is not None:
+            self._queue(queue.model_name)  # 메트릭이 바뀌었으면 한도 갱신
+        now = time.monotonic()
+        while queue.active < queue.limit:
+            waiter = queue.next_waiter()
+            if waiter is None:
+                break
+            queue.queued -= 1
+            waiter.future.set_result(self._start(queue, waiter.tenant, now - waiter.enqueued_at, waiter.cost))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        모델별 대기열 깊이, 동시성 한도, 대기 시간 통계를 반환합니다.
+        """
+        return {
+            model_name or "generate": {
+                "limit": queue.limit,
+                "active": queue.active,
+                "queued": queue.queued,
+                "active_tokens": queue.active_tokens,
+                "token_limit": queue.token_limit,
+                "admitted": queue.admitted,
+                "rejected_full": queue.rejected_full,
+                "rejected_deadline": queue.rejected_deadline,
+                "wait_time_avg": queue.wait_time_avg,
+                "wait_time_max": queue.wait_time_max,
+                "service_time_avg": queue.service_time_avg,
+            }
+            for model_name, queue in self.queues.items()
+        }
@@ -0,0 +1,203 @@
+import heapq
+import random
+from functools import partial
+from typing import Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+from app.services.shared_state import SharedState
+
+GPU_CACHE_WEIGHT = 0.7  # GPU 사용량 중요도
+WAITING_WEIGHT = 0.3  # 대기 요청 수 중요도
+
+
+def metric_weight(metrics: Mapping[str, float]) -> float:
+    """
+    real_time_metrics / weighted_round_robin 전략의 서버 가중치. KV 캐시 사용률과 대기 요청이 적을수록 큽니다.
+    """
+    gpu_cache = metrics.get("gpu_cache_usage", 1.0)
+    num_waiting = metrics.get("num_requests_waiting", 0)
+    return 1 / ((GPU_CACHE_WEIGHT * gpu_cache) + (WAITING_WEIGHT * num_waiting) + 1e-6)
+
+
+class AliasTable:
+    """
+    Vose alias method 가중치 표본 추출기. 만들 때 O(n), 추출할 때 O(1).
+    """
+
+    __slots__ = ("items", "prob", "alias")
+
+    def __init__(self, items: Sequence[str], weights: Sequence[float]):
+        n = len(items)
+        total = sum(weights)
+        self.items = tuple(items)
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        if n == 0 or total <= 0:
+            return
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 남은 항목은 부동소수점 오차로 1 근처에 머문 것들
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self) -> str:
+        r = random.random() * len(self.items)
+        i = int(r)
+        return self.items[i] if r - i < self.prob[i] else self.items[self.alias[i]]
+
+
+class Selector:
+    """
+    모델 하나의 스냅샷으로 컴파일된 서버 선택기.
+
+    스냅샷(또는 전략)이 바뀔 때만 다시 만들며, 라운드 로빈 위치처럼 이어져야 하는 상태는 이전 선택기에서 넘겨받습니다.
+    """
+
+    __slots__ = ("servers",)
+
+    def __init__(self, servers_metrics: Mapping[str, Mapping[str, float]], previous: Optional["Selector"] = None):
+        self.servers: Tuple[str, ...] = tuple(servers_metrics)
+
+    def select(self) -> Optional[str]:
+        raise NotImplementedError
+
+
+class RoundRobinSelector(Selector):
+    __slots__ = ("counter", "cursor")
+
+    def __init__(self, servers_metrics, previous=None):
+        super().__init__(servers_metrics)
+        self.counter = previous.counter if previous is not None else 0
+        # 워커 프로세스 간 공유 커서 (SelectorCache 가 SharedState 로 연결)
+        self.cursor: Optional[Callable[[], int]] = previous.cursor if previous is not None else None
+
+    def select(self):
+        if not self.servers:
+            return None
+        counter = self.cursor() if self.cursor is not None else self.counter
+        self.counter = counter + 1
+        return self.servers[counter % len(self.servers)]
+
+
+class RandomSelector(Selector):
+    __slots__ = ()
+
+    def select(self):
+        if not self.servers:
+            return None
+        return random.choice(self.servers)
+
+
+class LeastConnectionSelector(Selector):
+    """
+    수집된 num_requests_running 이 가장 적은 서버. 스냅샷이 바뀔 때만 계산합니다.
+    """
+
+    __slots__ = ("best",)
+
+    def __init__(self, servers_metrics, previous=None):
+        super().__init__(servers_metrics)
+        self.best = min(
+            servers_metrics, key=lambda server: servers_metrics[server].get("num_requests_running", float("inf")),
+            default=None,
+        )
+
+    def select(self):
+        return self.best
+
+
+class WeightedRandomSelector(Selector):
+    """
+    metric_weight 비례 확률 선택 (real_time_metrics). alias table 로 O(1) 추출.
+    """
+
+    __slots__ = ("table",)
+
+    def __init__(self, servers_metrics, previous=None):
+        super().__init__(servers_metrics)
+        self.table = AliasTable(self.servers, [metric_weight(metrics) for metrics in servers_metrics.values()])
+
+    def select(self):
+        if not self.servers:
+            return None
+        return self.table.sample()
+
+
+class SmoothWeightedRoundRobinSelector(Selector):
+    """
+    metric_weight 비례 smooth weighted round robin (weighted_round_robin).
+
+    서버마다 다음 차례의 가상 시각(due)을 두고 가장 이른 서버를 고른 뒤 1/weight 만큼 미룹니다.
+    가중치 비율대로 고르게 섞여 선택되며(한 서버로 몰리지 않음) 선택은 힙으로 O(log n) 입니다.
+    다시 컴파일될 때는 남아 있는 서버의 due 를 이어받아 순서가 처음부터 다시 시작되지 않습니다.
+    """
+
+    __slots__ = ("clock", "steps", "heap")
+
+    def __init__(self, servers_metrics, previous=None):
+        super().__init__(servers_metrics)
+        self.clock = previous.clock if previous is not None else 0.0
+        self.steps: Dict[str, float] = {
+            server: 1.0 / metric_weight(metrics) for server, metrics in servers_metrics.items()
+        }
+        due = {server: value for value, server in previous.heap} if previous is not None else {}
+        self.heap = [(due.get(server, self.clock + step), server) for server, step in self.steps.items()]
+        heapq.heapify(self.heap)
+
+    def select(self):
+        if not self.heap:
+            return None
+        due, server = self.heap[0]
+        self.clock = due
+        heapq.heapreplace(self.heap, (due + self.steps[server], server))
+        return server
+
+
+COMPILED_STRATEGIES = {
+    "round_robin": RoundRobinSelector,
+    "random": RandomSelector,
+    "least_connection": LeastConnectionSelector,
+    "real_time_metrics": WeightedRandomSelector,
+    "weighted_round_robin": SmoothWeightedRoundRobinSelector,
+}
+
+
+class SelectorCache:
+    """
+    모델별로 컴파일된 선택기를 스냅샷 identity 와 전략으로 캐시합니다.
+    모델마다 선택기가 따로 있으므로 한 모델의 가중치/순서가 다른 모델에 영향을 주지 않습니다.
+    """
+
+    def __init__(self, shared: Optional[SharedState] = None):
+        """
+        :param shared: 지정 시 라운드 로빈 커서를 워커 프로세스 간에 공유
+        """
+        self.shared = shared
+        self._compiled: Dict[str, Tuple[Mapping, str, Selector]] = {}
+
+    def get(
+        self, model_name: str, strategy: str, servers_metrics: Mapping[str, Mapping[str, float]], cache: bool = True
+    ) -> Selector:
+        """
+        :param cache: False 이면 캐시를 바꾸지 않는 일회용 선택기를 만든다 (재시도 제외 목록 등 임시 후보)
+        """
+        entry = self._compiled.get(model_name)
+        if entry is not None and entry[0] is servers_metrics and entry[1] == strategy:
+            return entry[2]
+        previous = entry[2] if entry is not None and entry[1] == strategy else None
+        selector = COMPILED_STRATEGIES[strategy](servers_metrics, previous)
+        if self.shared is not None and isinstance(selector, RoundRobinSelector) and selector.cursor is None:
+            selector.cursor = partial(self.shared.next_cursor, model_name)
+        if cache:
+            self._compiled[model_name] = (servers_metrics, strategy, selector)
+        return selector
+
+    def get_compiled(self, model_name: str) -> Optional[Selector]:
+        entry = self._compiled.get(model_name)
+        return entry[2] if entry is not None else None
@@ -0,0 +1,285 @@
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Mapping, Optional, Tuple
+
+DEFAULT_SHARED_STATE_CONFIG = {
+    "enabled": False,
+    "path": None,  # 기본값: /dev/shm/llmstream-<설정 파일 경로 해시>.state (없으면 임시 디렉터리)
+    "max_keys": 1024,  # 서버 + 모델 수 상한
+    "max_workers": 64,
+    "metrics_bytes": 4096,  # 서버 하나의 메트릭 스냅샷(JSON) 최대 크기
+    "poll_interval": 0.1,  # 수집 담당이 아닌 워커가 공유 스냅샷/카운터를 확인하는 주기 (초)
+}
+
+MAGIC = b"LLMS"
+LAYOUT_VERSION = 2
+HEADER = struct.Struct("<4sIIII")  # magic, layout version, max_keys, max_workers, metrics_bytes
+HEADER_SIZE = 64
+WORKERS_WORD = 3  # 헤더 안: 지금까지 등록된 워커 자리 수 (합산 범위)
+KEY_BYTES = 256
+ENTRY_WORDS = 3  # 키 이름 뒤: 메트릭 seq, 메트릭 길이, 라운드 로빈 커서
+
+# 워커별 카운터 열
+REQUESTS = 0
+STREAMS = 1
+COUNTERS = 2
+
+
+def default_path(instance: str = "") -> str:
+    """
+    :param instance: 라우터 인스턴스 식별자 (설정 파일 경로). 같은 호스트의 다른 인스턴스와 파일을 나눠 씁니다.
+    """
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    if not instance:
+        return os.path.join(directory, "llmstream.state")
+    return os.path.join(directory, f"llmstream-{hashlib.sha256(instance.encode()).hexdigest()[:12]}.state")
+
+
+class SharedState:
+    """
+    여러 라우터 워커 프로세스가 공유하는 mmap 기반 고정 레이아웃 상태.
+
+    레이아웃: [헤더][워커 테이블: pid x max_workers][키 항목 x max_keys]
+    키 항목(서버 또는 모델): [키 이름][seq][길이][커서][메트릭 JSON][워커별 카운터 (요청, 스트림) x max_workers]
+
+    - 메트릭 스냅샷은 수집 담당 워커 하나만 쓰고(seqlock), 나머지 워커는 seq 가 바뀐 서버만 다시 읽는다
+    - 진행 중 요청/스트림 수는 워커마다 자기 열에만 쓰고 읽을 때 모든 워커 열을 합산한다
+      (쓰는 쪽이 하나뿐이므로 잠금이나 원자 연산 없이도 갱신이 유실되지 않음)
+    - 라운드 로빈 커서는 모델마다 하나이며 파일 잠금(flock) 안에서 읽고 증가시킨다 (두 워커가 같은 값을 받지 않음)
+    - 죽은 워커의 열은 reap_workers() 가 0 으로 지워 남은 카운트를 버린다 (새 워커가 자리를 차지할 때도 지움)
+    - 그 밖에는 키 등록/워커 등록처럼 드문 작업만 파일 잠금을 사용
+    """
+
+    def __init__(self, instance: str = "", **config):
+        """
+        :param instance: path 가 없을 때 기본 경로를 정할 라우터 인스턴스 식별자 (설정 파일 경로)
+        :param config: DEFAULT_SHARED_STATE_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_SHARED_STATE_CONFIG, **config}
+        self.path = options["path"] or default_path(instance)
+        self.max_keys = int(options["max_keys"])
+        self.max_workers = int(options["max_workers"])
+        self.metrics_bytes = -(-int(options["metrics_bytes"]) // 8) * 8
+        self.poll_interval = options["poll_interval"]
+
+        # 항목 안의 오프셋 (모두 8 바이트 정렬)
+        self._entry_size = KEY_BYTES + ENTRY_WORDS * 8 + self.metrics_bytes + self.max_workers * COUNTERS * 8
+        self._entries_offset = HEADER_SIZE + self.max_workers * 8
+        size = self._entries_offset + self.max_keys * self._entry_size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(
+                    self._fd,
+                    HEADER.pack(MAGIC, LAYOUT_VERSION, self.max_keys, self.max_workers, self.metrics_bytes),
+                    0,
+                )
+            header = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+            if header != (MAGIC, LAYOUT_VERSION, self.max_keys, self.max_workers, self.metrics_bytes):
+                os.close(self._fd)
+                raise RuntimeError(f"Shared state layout mismatch in {self.path}: {header}")
+            self._mmap = mmap.mmap(self._fd, size)
+            self._words = memoryview(self._mmap).cast("q")
+            self.worker = self._claim_worker()
+
+        self._keys: Dict[str, int] = {}
+        self._cursors: Dict[str, int] = {}  # 항목을 등록하지 못한 모델의 워커 로컬 커서
+        self._leader_fd: Optional[int] = None
+        self._full_warned = False
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _claim_worker(self) -> int:
+        """
+        비어 있거나 죽은 워커의 자리를 차지하고, 그 자리의 카운터 열을 지웁니다.
+        """
+        base = HEADER_SIZE // 8
+        for worker in range(self.max_workers):
+            pid = self._words[base + worker]
+            if pid and pid != os.getpid() and _alive(pid):
+                continue
+            self._words[base + worker] = os.getpid()
+            self._words[WORKERS_WORD] = max(self._words[WORKERS_WORD], worker + 1)
+            self._clear_worker(worker)
+            return worker
+        raise RuntimeError(f"Shared state {self.path} has no free worker slot (max_workers={self.max_workers})")
+
+    def _clear_worker(self, worker: int):
+        for index in range(self.max_keys):
+            offset = self._counter_word(index, worker, 0)
+            self._words[offset : offset + COUNTERS] = memoryview(bytes(COUNTERS * 8)).cast("q")
+
+    def reap_workers(self) -> int:
+        """
+        종료된 워커의 자리를 비우고 카운터 열을 지웁니다 (워커 수가 줄어도 합계가 남지 않도록 주기적으로 호출).
+
+        :return: 정리한 워커 수
+        """
+        base = HEADER_SIZE // 8
+        dead = [
+            worker for worker in range(self._words[WORKERS_WORD])
+            if self._words[base + worker] and not _alive(self._words[base + worker])
+        ]
+        if not dead:
+            return 0
+        reaped = 0
+        with self._locked():
+            for worker in dead:
+                pid = self._words[base + worker]
+                if pid and not _alive(pid):  # 잠금을 기다리는 동안 새 워커가 차지하지 않았는지 다시 확인
+                    self._clear_worker(worker)
+                    self._words[base + worker] = 0
+                    reaped += 1
+        return reaped
+
+    def _entry_offset(self, index: int) -> int:
+        return self._entries_offset + index * self._entry_size
+
+    def _counter_word(self, index: int, worker: int, field: int) -> int:
+        offset = self._entry_offset(index) + KEY_BYTES + ENTRY_WORDS * 8 + self.metrics_bytes
+        return offset // 8 + worker * COUNTERS + field
+
+    def _cursor_word(self, index: int) -> int:
+        return (self._entry_offset(index) + KEY_BYTES) // 8 + 2
+
+    def key_index(self, key: str) -> Optional[int]:
+        """
+        키의 항목 번호를 반환합니다. 처음 보는 키는 빈 항목에 등록합니다.
+
+        :return: 항목 번호 (공간이 없으면 None - 호출 측은 워커 로컬 값만 사용)
+        """
+        index = self._keys.get(key)
+        if index is not None:
+            return index
+        encoded = key.encode()[:KEY_BYTES]
+        with self._locked():
+            for index in range(self.max_keys):
+                offset = self._entry_offset(index)
+                stored = self._mmap[offset : offset + KEY_BYTES].rstrip(b"\0")
+                if not stored:
+                    self._mmap[offset : offset + len(encoded)] = encoded
+                elif stored != encoded:
+                    continue
+                self._keys[key] = index
+                return index
+        if not self._full_warned:
+            self._full_warned = True
+            print(f"Shared state {self.path} is full (max_keys={self.max_keys}); new keys stay worker-local")
+        return None
+
+    def publish_metrics(self, server: str, metrics: Mapping[str, float]):
+        """
+        서버 메트릭 스냅샷을 씁니다 (seqlock: 쓰는 동안 seq 가 홀수).
+        """
+        index = self.key_index(f"s:{server}")
+        payload = json.dumps(metrics, separators=(",", ":")).encode()
+        if index is None or len(payload) > self.metrics_bytes:
+            return
+        offset = self._entry_offset(index) + KEY_BYTES
+        seq_word = offset // 8
+        self._words[seq_word] += 1
+        self._words[seq_word + 1] = len(payload)
+        self._mmap[offset + ENTRY_WORDS * 8 : offset + ENTRY_WORDS * 8 + len(payload)] = payload
+        self._words[seq_word] += 1
+
+    def read_metrics(self, server: str, last_seq: int = 0) -> Optional[Tuple[int, Dict[str, float]]]:
+        """
+        last_seq 이후 새로 발행된 스냅샷이 있으면 (seq, metrics) 를 반환합니다.
+        """
+        index = self.key_index(f"s:{server}")
+        if index is None:
+            return None
+        offset = self._entry_offset(index) + KEY_BYTES
+        seq_word = offset // 8
+        for _ in range(8):
+            seq = self._words[seq_word]
+            if seq == last_seq or seq == 0:
+                return None
+            if seq % 2:
+                continue  # 쓰는 중
+            length = self._words[seq_word + 1]
+            payload = self._mmap[offset + ENTRY_WORDS * 8 : offset + ENTRY_WORDS * 8 + length]
+            if self._words[seq_word] == seq:
+                return seq, json.loads(payload)
+        return None
+
+    def add(self, field: int, key: str, delta: int):
+        """
+        이 워커의 카운터 열에 delta 를 더합니다.
+        """
+        index = self.key_index(key)
+        if index is not None:
+            self._words[self._counter_word(index, self.worker, field)] += delta
+
+    def total(self, field: int, key: str) -> Optional[int]:
+        """
+        모든 워커의 카운터를 합산합니다.
+        """
+        index = self.key_index(key)
+        if index is None:
+            return None
+        start = self._counter_word(index, 0, field)
+        return sum(self._words[start : start + self._words[WORKERS_WORD] * COUNTERS : COUNTERS])
+
+    def next_cursor(self, model_name: str) -> int:
+        """
+        모든 워커가 공유하는 라운드 로빈 커서를 읽고 하나 증가시킵니다.
+        읽기와 증가를 파일 잠금 안에서 함께 하므로 동시에 호출한 워커들도 서로 다른 값을 받습니다.
+        """
+        index = self.key_index(f"m:{model_name}")
+        if index is None:
+            cursor = self._cursors.get(model_name, 0)
+            self._cursors[model_name] = cursor + 1
+            return cursor
+        word = self._cursor_word(index)
+        with self._locked():
+            cursor = self._words[word]
+            self._words[word] = cursor + 1
+        return cursor
+
+    def try_lead(self) -> bool:
+        """
+        메트릭 수집 담당(리더) 잠금을 시도합니다. 리더 프로세스가 끝나면 잠금이 풀려 다른 워커가 이어받습니다.
+        """
+        if self._leader_fd is not None:
+            return True
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd
+        return True
+
+    def close(self):
+        self._words.release()
+        self._mmap.close()
+        os.close(self._fd)
+        if self._leader_fd is not None:
+            os.close(self._leader_fd)
+            self._leader_fd = None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
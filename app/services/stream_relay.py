@@ -0,0 +1,152 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable, Optional
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+DEFAULT_STREAM_RELAY_CONFIG = {
+    "flush_interval": 0.0,  # 초. 0 보다 크면 이 시간 동안 도착한 작은 청크를 묶어서 전송
+    "max_coalesce_bytes": 64 * 1024,  # 한 번에 묶어 보낼 최대 바이트
+    "max_queued_chunks": 64,  # 클라이언트가 느릴 때 업스트림을 멈추게 하는 버퍼 크기 (역압)
+}
+
+# SSE 응답 헤더 (프록시 버퍼링 방지)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_END = object()
+
+
+class _RelayResponse(StreamingResponse):
+    """
+    응답을 보내는 도중 끝나거나 실패하거나 취소되어도 원본 스트림을 닫는 StreamingResponse.
+
+    본문을 보내기 전에 클라이언트가 끊으면 relay 제너레이터가 시작되지 않아 스스로 정리하지 못하므로
+    여기서 닫아 진행 중 카운터, 실행 권한, 업스트림 응답을 반납합니다.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], content: AsyncIterator[bytes]):
+        super().__init__(content, media_type="text/event-stream", headers=SSE_HEADERS)
+        self.chunks = chunks
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.chunks.aclose()
+
+
+class StreamRelay:
+    """
+    업스트림 SSE 스트림을 디코딩 없이 원본 바이트 그대로 클라이언트에 전달합니다.
+
+    - 업스트림 읽기는 별도 작업(pump)에서 수행하고, 그 사이 쌓인 청크는 한 번에 묶어 전송
+    - flush_interval 이 설정되면 첫 청크 이후 그 시간 동안 도착한 청크까지 묶음
+    - 클라이언트 연결이 끊기면 업스트림 요청을 즉시 취소해 vLLM 이 KV 캐시를 반환하도록 함
+    """
+
+    def __init__(self, **config):
+        options = {**DEFAULT_STREAM_RELAY_CONFIG, **config}
+        self.flush_interval = float(options["flush_interval"])
+        self.max_coalesce_bytes = int(options["max_coalesce_bytes"])
+        self.max_queued_chunks = int(options["max_queued_chunks"])
+        self.disconnects = 0
+
+    def response(
+        self, chunks: AsyncIterator[bytes], request: Optional[Request] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> StreamingResponse:
+        """
+        text/event-stream 응답을 만듭니다.
+
+        :param request: 지정 시 클라이언트 연결 종료를 감시해 업스트림을 취소
+        :param on_error: 스트림 도중 업스트림 오류가 나면 호출 (오류는 SSE error 이벤트로 전달)
+        """
+        return _RelayResponse(chunks, self.relay(chunks, request, on_error))
+
+    async def relay(
+        self, chunks: AsyncIterator[bytes], request: Optional[Request] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue(self.max_queued_chunks)
+        pump = asyncio.create_task(self._pump(chunks, queue))
+        watcher = asyncio.create_task(self._watch_disconnect(request, pump, queue)) if request is not None else None
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    yield self._error_event(item, on_error)
+                    return
+                pending = None
+                if not queue.empty() or self.flush_interval > 0:
+                    item, pending = await self._coalesce(item, queue)
+                yield item
+                if pending is _END:
+                    return
+                if isinstance(pending, BaseException):
+                    yield self._error_event(pending, on_error)
+                    return
+        finally:
+            pump.cancel()
+            if watcher is not None:
+                watcher.cancel()
+            await asyncio.gather(pump, *([watcher] if watcher is not None else []), return_exceptions=True)
+
+    async def _coalesce(self, first: bytes, queue: asyncio.Queue):
+        """
+        이미 도착했거나 flush_interval 안에 도착하는 청크를 max_coalesce_bytes 까지 이어 붙입니다.
+
+        :return: (묶은 바이트, 묶는 도중 만난 종료/오류 항목 또는 None)
+        """
+        parts = [first]
+        size = len(first)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while size < self.max_coalesce_bytes:
+            if not queue.empty():
+                item = queue.get_nowait()
+            else:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _END or isinstance(item, BaseException):
+                return b"".join(parts), item
+            parts.append(item)
+            size += len(item)
+        return (parts[0] if len(parts) == 1 else b"".join(parts)), None
+
+    @staticmethod
+    async def _pump(chunks: AsyncIterator[bytes], queue: asyncio.Queue):
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            # 취소(클라이언트 연결 종료) 시 업스트림 응답을 닫아 생성을 중단시킨다
+            await chunks.aclose()
+
+    async def _watch_disconnect(self, request: Request, pump: asyncio.Task, queue: asyncio.Queue):
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                break
+        if not pump.done():
+            self.disconnects += 1
+            pump.cancel()
+            if not queue.full():
+                queue.put_nowait(_END)
+
+    @staticmethod
+    def _error_event(error: BaseException, on_error: Optional[Callable[[BaseException], None]]) -> bytes:
+        if on_error is not None:
+            on_error(error)
+        payload = {"error": {"message": f"Upstream stream failed: {error}", "type": "upstream_error"}}
+        return b"data: " + json.dumps(payload).encode() + b"\n\n"
@@ -0,0 +1,183 @@
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional
+
+from app.services.inflight import OutstandingRequestsIndex
+
+DEFAULT_TOKEN_COST_CONFIG = {
+    "chars_per_token": 4.0,  # 보정 전 문자/토큰 비율
+    "min_chars_per_token": 1.0,
+    "max_chars_per_token": 8.0,
+    "completion_ratio": 1.0,  # 보정 전 (실제 생성 토큰 / max_tokens) 비율
+    "calibration_alpha": 0.05,  # 업스트림 usage 로 보정할 때의 EWMA 계수
+    "default_max_tokens": 256,  # max_tokens 가 없는 요청의 생성 토큰 수 가정
+    "prefill_weight": 1.0,  # 프롬프트 토큰 하나의 상대 비용
+    "decode_weight": 1.0,  # 생성 토큰 하나의 상대 비용
+}
+
+
+class RequestCost(NamedTuple):
+    prompt_chars: int
+    prompt_tokens: float
+    decode_tokens: float
+    work: float  # prefill_weight * prompt_tokens + decode_weight * decode_tokens
+
+
+def prompt_chars(payload: Mapping) -> int:
+    """
+    Chat(messages) / Completion(prompt) 요청의 프롬프트 문자 수. 문자열을 이어 붙이지 않고 길이만 더합니다.
+    형식이 맞지 않는 메시지/파트(null, 숫자 등)는 업스트림이 판단하도록 세지 않고 넘어갑니다.
+    """
+    messages = payload.get("messages")
+    if isinstance(messages, list):
+        total = 0
+        for message in messages:
+            if not isinstance(message, Mapping):
+                continue
+            content = message.get("content")
+            if isinstance(content, str):
+                total += len(content)
+            elif isinstance(content, list):
+                # 멀티모달 content 파트 중 텍스트만 센다
+                total += sum(
+                    len(part["text"]) for part in content
+                    if isinstance(part, Mapping) and isinstance(part.get("text"), str)
+                )
+        return total
+    prompt = payload.get("prompt") or ""
+    if isinstance(prompt, str):
+        return len(prompt)
+    return sum(len(item) for item in prompt if isinstance(item, str))
+
+
+class TokenCostEstimator:
+    """
+    요청의 프롬프트/생성 토큰 수를 토크나이저 없이 추정합니다.
+
+    모델별 문자/토큰 비율과 실제 생성 비율은 업스트림 응답의 usage 필드로 점진적으로 보정합니다.
+    """
+
+    def __init__(self, **config):
+        """
+        :param config: DEFAULT_TOKEN_COST_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_TOKEN_COST_CONFIG, **config}
+        self.default_chars_per_token = float(options["chars_per_token"])
+        self.min_chars_per_token = float(options["min_chars_per_token"])
+        self.max_chars_per_token = float(options["max_chars_per_token"])
+        self.default_completion_ratio = float(options["completion_ratio"])
+        self.alpha = float(options["calibration_alpha"])
+        self.default_max_tokens = int(options["default_max_tokens"])
+        self.prefill_weight = float(options["prefill_weight"])
+        self.decode_weight = float(options["decode_weight"])
+        self._chars_per_token: Dict[Optional[str], float] = {}
+        self._completion_ratio: Dict[Optional[str], float] = {}
+        self.average_work = 0.0  # 요청당 예상 작업량의 이동 평균
+
+    def chars_per_token(self, model_name: Optional[str]) -> float:
+        return self._chars_per_token.get(model_name, self.default_chars_per_token)
+
+    def completion_ratio(self, model_name: Optional[str]) -> float:
+        return self._completion_ratio.get(model_name, self.default_completion_ratio)
+
+    def estimate(self, model_name: Optional[str], payload: Mapping) -> RequestCost:
+        chars = prompt_chars(payload)
+        prompt_tokens = chars / self.chars_per_token(model_name)
+        max_tokens = payload.get("max_tokens") or self.default_max_tokens
+        decode_tokens = max_tokens * (payload.get("n") or 1) * self.completion_ratio(model_name)
+        work = self.prefill_weight * prompt_tokens + self.decode_weight * decode_tokens
+        if self.average_work == 0.0:
+            self.average_work = work
+        else:
+            self.average_work += 0.01 * (work - self.average_work)
+        return RequestCost(chars, prompt_tokens, decode_tokens, work)
+
+    def observe_usage(self, model_name: Optional[str], payload: Mapping, cost: RequestCost, usage: Optional[Mapping]):
+        """
+        업스트림 응답의 usage 로 문자/토큰 비율과 생성 비율을 보정합니다.
+        """
+        if not usage:
+            return
+        prompt_tokens = usage.get("prompt_tokens")
+        if prompt_tokens and cost.prompt_chars:
+            sample = min(max(cost.prompt_chars / prompt_tokens, self.min_chars_per_token), self.max_chars_per_token)
+            current = self.chars_per_token(model_name)
+            self._chars_per_token[model_name] = current + self.alpha * (sample - current)
+        completion_tokens = usage.get("completion_tokens")
+        max_tokens = (payload.get("max_tokens") or self.default_max_tokens) * (payload.get("n") or 1)
+        if completion_tokens is not None and max_tokens:
+            sample = min(completion_tokens / max_tokens, 1.0)
+            current = self.completion_ratio(model_name)
+            self._completion_ratio[model_name] = current + self.alpha * (sample - current)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        models = set(self._chars_per_token) | set(self._completion_ratio)
+        return {
+            model or "generate": {
+                "chars_per_token": self.chars_per_token(model),
+                "completion_ratio": self.completion_ratio(model),
+            }
+            for model in models
+        }
+
+
+class TokenLoadTracker:
+    """
+    서버별 진행 중 요청의 예상 prefill/decode 토큰 수.
+
+    prefill 토큰은 첫 바이트(스트림) 또는 응답 완료 시점에, decode 토큰은 요청이 끝날 때 빠집니다.
+    InflightTracker 와 같은 리스너 인터페이스를 제공해 ProjectedWorkIndex 가 사용합니다.
+    """
+
+    def __init__(self, estimator: TokenCostEstimator):
+        self.estimator = estimator
+        self.prefill: Dict[str, float] = {}
+        self.decode: Dict[str, float] = {}
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """
+        :param callback: callback(server_url)
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, server: str):
+        for callback in self._listeners:
+            callback(server)
+
+    def acquire(self, server: str, cost: RequestCost):
+        self.prefill[server] = self.prefill.get(server, 0.0) + cost.prompt_tokens
+        self.decode[server] = self.decode.get(server, 0.0) + cost.decode_tokens
+        self._notify(server)
+
+    def prefill_done(self, server: str, cost: RequestCost):
+        self.prefill[server] = max(self.prefill.get(server, 0.0) - cost.prompt_tokens, 0.0)
+        self._notify(server)
+
+    def release(self, server: str, cost: RequestCost, prefilled: bool = False):
+        """
+        :param prefilled: prefill_done 을 이미 호출했으면 True
+        """
+        if not prefilled:
+            self.prefill[server] = max(self.prefill.get(server, 0.0) - cost.prompt_tokens, 0.0)
+        self.decode[server] = max(self.decode.get(server, 0.0) - cost.decode_tokens, 0.0)
+        self._notify(server)
+
+    def get_work(self, server: str) -> float:
+        return (
+            self.estimator.prefill_weight * self.prefill.get(server, 0.0)
+            + self.estimator.decode_weight * self.decode.get(server, 0.0)
+        )
+
+
+class ProjectedWorkIndex(OutstandingRequestsIndex):
+    """
+    token_weighted 전략용 인덱스. 점수 = 라우터가 보낸 진행 중 요청의 예상 작업량
+    + queue_weight * 수집된 대기 요청 수 * 요청당 평균 작업량.
+    """
+
+    def __init__(self, tokens: TokenLoadTracker, queue_weight: float = 1.0):
+        super().__init__(tokens, queue_weight=queue_weight)
+        self.tokens = tokens
+
+    def score(self, server: str, metrics: Mapping[str, float]) -> float:
+        queued = metrics.get("num_requests_waiting", 0) * self.tokens.estimator.average_work
+        return self.tokens.get_work(server) + self.queue_weight * queued
@@ -0,0 +1,310 @@
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_TRACING_CONFIG = {
+    "enabled": False,
+    "sample_rate": 0.01,  # 무작위로 남길 요청 비율 (head sampling)
+    "slow_threshold": 2.0,  # 이 시간(초) 이상 걸린 요청과 5xx 응답은 항상 남김 (tail sampling)
+    "buffer_size": 2048,  # 최근에 남긴 트레이스를 보관하는 링 버퍼 크기
+    "exporter": "file",  # "file", "otlp" 또는 None (링 버퍼에만 보관)
+    "path": "traces.jsonl",
+    "otlp_endpoint": "http://localhost:4318/v1/traces",  # OTLP/HTTP JSON
+    "export_interval": 5.0,  # 내보내기 주기 (초)
+    "max_pending": 8192,  # 내보내기를 기다리는 트레이스 최대 수 (넘치면 오래된 것부터 버림)
+    "service_name": "llmstream",
+    "routes": ["/v1/", "/generate"],  # 추적할 경로 접두사
+}
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("llmstream_trace", default=None)
+
+
+def current_trace() -> Optional["Trace"]:
+    """
+    현재 요청의 트레이스. 추적이 꺼져 있거나 추적 대상 경로가 아니면 None.
+    """
+    return _current.get()
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Trace:
+    """
+    요청 하나의 스팬 모음. 스팬은 (이름, 시작, 끝, 속성, 스팬 ID) 튜플로만 쌓고
+    ID 생성과 직렬화는 남기기로 한 트레이스를 내보낼 때 합니다.
+    """
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_span_id", "sampled", "name", "started_at", "started_unix_ns",
+        "ended_at", "status", "attributes", "spans",
+    )
+
+    def __init__(self, name: str, traceparent: Optional[str] = None, sample_rate: float = 0.0):
+        match = TRACEPARENT.match(traceparent) if traceparent else None
+        if match:
+            # 상위 서비스의 트레이스를 이어가고 그쪽의 샘플링 결정을 따른다
+            self.trace_id, self.parent_span_id = match.group(1), match.group(2)
+            self.sampled = bool(int(match.group(3), 16) & 1)
+        else:
+            self.trace_id, self.parent_span_id = os.urandom(16).hex(), None
+            self.sampled = random.random() < sample_rate
+        self.span_id = new_span_id()
+        self.name = name
+        self.started_at = time.perf_counter()
+        self.started_unix_ns = time.time_ns()
+        self.ended_at: Optional[float] = None
+        self.status = 0
+        self.attributes: Dict[str, object] = {}
+        self.spans: List[Tuple[str, float, float, Optional[Dict], Optional[str]]] = []
+
+    def add_span(
+        self, name: str, start: float, end: float, attributes: Optional[Dict] = None, span_id: Optional[str] = None
+    ):
+        """
+        :param start: 시작 시각 (time.perf_counter)
+        :param end: 끝 시각 (time.perf_counter)
+        """
+        self.spans.append((name, start, end, attributes, span_id))
+
+    def traceparent(self, span_id: str) -> str:
+        """
+        업스트림으로 전달할 W3C traceparent 헤더 값. span_id 는 업스트림 호출 스팬의 ID.
+        """
+        return f"00-{self.trace_id}-{span_id}-{'01' if self.sampled else '00'}"
+
+    @property
+    def duration(self) -> float:
+        return (self.ended_at or time.perf_counter()) - self.started_at
+
+    def _unix_ns(self, at: float) -> int:
+        return self.started_unix_ns + int((at - self.started_at) * 1e9)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_unix_ns": self.started_unix_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round((start - self.started_at) * 1000, 3),
+                    "duration_ms": round((end - start) * 1000, 3),
+                    **({"attributes": attributes} if attributes else {}),
+                }
+                for name, start, end, attributes, _ in self.spans
+            ],
+        }
+
+    def to_otlp_spans(self) -> List[Dict]:
+        """
+        OTLP/JSON 스팬 목록 (루트 스팬 + 자식 스팬).
+        """
+        end = self.ended_at or time.perf_counter()
+        root = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2,  # SERVER
+            "startTimeUnixNano": str(self.started_unix_ns),
+            "endTimeUnixNano": str(self._unix_ns(end)),
+            "attributes": _otlp_attributes({**self.attributes, "http.status_code": self.status}),
+            "status": {"code": 2 if self.status >= 500 else 0},
+        }
+        if self.parent_span_id:
+            root["parentSpanId"] = self.parent_span_id
+        spans = [root]
+        for name, start, stop, attributes, span_id in self.spans:
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span_id or new_span_id(),
+                "parentSpanId": self.span_id,
+                "name": name,
+                "kind": 3 if span_id else 1,  # 업스트림 호출은 CLIENT, 나머지는 INTERNAL
+                "startTimeUnixNano": str(self._unix_ns(start)),
+                "endTimeUnixNano": str(self._unix_ns(stop)),
+                "attributes": _otlp_attributes(attributes or {}),
+            })
+        return spans
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            result.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            result.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            result.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            result.append({"key": key, "value": {"stringValue": str(value)}})
+    return result
+
+
+class Tracer:
+    """
+    요청 트레이스의 샘플링, 보관, 내보내기.
+
+    - 추적 대상 요청은 모두 스팬을 모으고, 끝날 때 남길지 결정 (무작위 비율 또는 느리거나 실패한 요청)
+    - 남긴 트레이스는 링 버퍼(관리자 API 의 느린 요청 조회)와 내보내기 대기열에 넣음
+    - 백그라운드 작업이 대기열을 묶어서 파일(JSONL, 스레드에서 기록) 또는 OTLP/HTTP 수집기로 내보냄
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, **config):
+        """
+        :param transport: OTLP 전송용 httpx 트랜스포트 (테스트용)
+        :param config: DEFAULT_TRACING_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_TRACING_CONFIG, **config}
+        self.sample_rate = float(options["sample_rate"])
+        self.slow_threshold = float(options["slow_threshold"])
+        self.exporter = options["exporter"]
+        self.path = options["path"]
+        self.otlp_endpoint = options["otlp_endpoint"]
+        self.export_interval = float(options["export_interval"])
+        self.service_name = options["service_name"]
+        self.routes = tuple(options["routes"])
+        self.transport = transport
+        self.recent: Deque[Trace] = deque(maxlen=int(options["buffer_size"]))
+        self._pending: Deque[Trace] = deque(maxlen=int(options["max_pending"]))
+        self.stats = {"started": 0, "kept": 0, "exported": 0, "dropped": 0, "export_errors": 0}
+
+    def traces(self, path: str) -> bool:
+        return path.startswith(self.routes)
+
+    def start(self, name: str, traceparent: Optional[str] = None) -> Trace:
+        self.stats["started"] += 1
+        return Trace(name, traceparent, self.sample_rate)
+
+    def finish(self, trace: Trace, status: int):
+        trace.ended_at = time.perf_counter()
+        trace.status = status
+        if not (trace.sampled or status >= 500 or trace.duration >= self.slow_threshold):
+            return
+        self.stats["kept"] += 1
+        self.recent.append(trace)
+        if self.exporter:
+            if len(self._pending) == self._pending.maxlen:
+                self.stats["dropped"] += 1
+            self._pending.append(trace)
+
+    def slowest(self, limit: int = 20) -> List[Dict]:
+        """
+        링 버퍼에 남아 있는 트레이스 중 가장 오래 걸린 요청들.
+        """
+        return [trace.to_dict() for trace in sorted(self.recent, key=lambda t: t.duration, reverse=True)[:limit]]
+
+    def _write_file(self, batch: List[Trace]):
+        with open(self.path, "a") as f:
+            for trace in batch:
+                f.write(json.dumps(trace.to_dict()) + "\n")
+
+    def _otlp_payload(self, batch: List[Trace]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "llmstream"},
+                    "spans": [span for trace in batch for span in trace.to_otlp_spans()],
+                }],
+            }]
+        }
+
+    async def export(self):
+        """
+        대기 중인 트레이스를 한 번에 내보냅니다. 실패한 묶음은 버립니다 (요청 경로에 영향을 주지 않도록).
+        """
+        if not self._pending:
+            return
+        batch = list(self._pending)
+        self._pending.clear()
+        try:
+            if self.exporter == "otlp":
+                async with httpx.AsyncClient(transport=self.transport, timeout=10.0) as client:
+                    response = await client.post(self.otlp_endpoint, json=self._otlp_payload(batch))
+                    response.raise_for_status()
+            else:
+                await asyncio.to_thread(self._write_file, batch)
+            self.stats["exported"] += len(batch)
+        except Exception as e:
+            self.stats["export_errors"] += 1
+            print(f"Failed to export {len(batch)} traces: {e!r}")
+
+    async def run(self):
+        """
+        export_interval 마다 내보내는 백그라운드 루프. 취소될 때 남은 트레이스를 내보냅니다.
+        """
+        if not self.exporter:
+            return
+        try:
+            while True:
+                await asyncio.sleep(self.export_interval)
+                await self.export()
+        finally:
+            await asyncio.shield(self.export())
+
+
+class TracingMiddleware:
+    """
+    추적 대상 경로의 요청마다 트레이스를 시작하고, 응답을 모두 보낸 뒤(스트림 포함) 끝냅니다.
+
+    클라이언트로 본문을 쓰는 데 걸린 시간(전송 대기 포함)을 client_write 스팬으로 기록합니다.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.traces(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        trace = self.tracer.start(f"{scope['method']} {scope['path']}", traceparent)
+        token = _current.set(trace)
+        status = 500
+        first_write = None
+        blocked = 0.0
+
+        async def traced_send(message):
+            nonlocal status, first_write, blocked
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                await send(message)
+                return
+            started = time.perf_counter()
+            if first_write is None:
+                first_write = started
+            await send(message)
+            blocked += time.perf_counter() - started
+
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            if first_write is not None:
+                trace.add_span(
+                    "client_write", first_write, time.perf_counter(), {"blocked_ms": round(blocked * 1000, 3)}
+                )
+            self.tracer.finish(trace, status)
+            _current.reset(token)
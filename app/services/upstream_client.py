@@ -0,0 +1,166 @@
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.utils.request_body import RequestBody
+from app.utils.streams import ClosingStream
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # h2 미설치 시 HTTP/1.1 로만 동작
+    HTTP2_AVAILABLE = False
+
+
+DEFAULT_UPSTREAM_CONFIG = {
+    "max_connections": 200,
+    "max_keepalive_connections": 50,
+    "keepalive_expiry": 30.0,
+    "connect_timeout": 5.0,
+    "read_timeout": 300.0,
+    "write_timeout": 30.0,
+    "pool_timeout": 30.0,
+    "http2": True,
+}
+
+# 업스트림으로 그대로 전달하면 안 되는 헤더 (hop-by-hop + 라우터 전용)
+EXCLUDED_REQUEST_HEADERS = frozenset(
+    {
+        "host",
+        "content-length",
+        "connection",
+        "keep-alive",
+        "proxy-connection",
+        "transfer-encoding",
+        "te",
+        "trailer",
+        "upgrade",
+        # 응답 바이트를 그대로 중계하므로 아래에서 identity 로 다시 설정
+        "accept-encoding",
+        # 본문은 항상 JSON 으로 다시 설정
+        "content-type",
+    }
+)
+
+
+def filter_request_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    업스트림으로 전달할 헤더만 남깁니다.
+
+    :param headers: 클라이언트 요청 헤더
+    :return: 전달용 헤더 딕셔너리
+    """
+    filtered = {
+        key: value for key, value in headers.items() if key.lower() not in EXCLUDED_REQUEST_HEADERS
+    }
+    filtered["content-type"] = "application/json"
+    # httpx 는 기본으로 gzip/deflate 를 요청하지만 aiter_raw 는 압축을 풀지 않고 content-encoding 도 전달하지 않으므로
+    # 업스트림이 압축하지 않도록 명시
+    filtered["accept-encoding"] = "identity"
+    return filtered
+
+
+def request_content(payload: Dict) -> Dict:
+    """
+    httpx 요청 본문 인자. 클라이언트가 보낸 원본 바이트가 있으면 다시 인코딩하지 않고 그대로 보냅니다.
+    """
+    if isinstance(payload, RequestBody):
+        return {"content": payload.raw}
+    return {"json": payload}
+
+
+class UpstreamClient:
+    """
+    업스트림(vLLM) 서버별로 장기 유지되는 httpx.AsyncClient 를 관리합니다.
+
+    서버마다 독립된 커넥션 풀을 사용하므로 한 노드의 포화가 다른 노드로 번지지 않습니다.
+    """
+
+    def __init__(
+        self, config: Optional[Dict] = None, transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        :param config: 업스트림 설정 (DEFAULT_UPSTREAM_CONFIG 키, "servers" 에 서버별 덮어쓰기)
+        :param transport: 테스트/벤치마크용 httpx 트랜스포트 (지정 시 모든 서버에 사용)
+        """
+        self.config = {**DEFAULT_UPSTREAM_CONFIG, **(config or {})}
+        self.transport = transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _options_for(self, server: str) -> Dict:
+        overrides = self.config.get("servers", {}).get(server, {})
+        return {**self.config, **overrides}
+
+    def _build_client(self, server: str) -> httpx.AsyncClient:
+        options = self._options_for(server)
+        limits = httpx.Limits(
+            max_connections=options["max_connections"],
+            max_keepalive_connections=options["max_keepalive_connections"],
+            keepalive_expiry=options["keepalive_expiry"],
+        )
+        timeout = httpx.Timeout(
+            connect=options["connect_timeout"],
+            read=options["read_timeout"],
+            write=options["write_timeout"],
+            pool=options["pool_timeout"],
+        )
+        # HTTP/2 는 TLS ALPN 으로 협상되므로 지원하지 않는 노드는 자동으로 HTTP/1.1 을 사용
+        return httpx.AsyncClient(
+            base_url=server,
+            limits=limits,
+            timeout=timeout,
+            http2=bool(options["http2"]) and HTTP2_AVAILABLE,
+            transport=self.transport,
+        )
+
+    def pool_size(self, server: str) -> int:
+        """
+        서버 커넥션 풀의 최대 연결 수 (풀 사용률 계산용).
+        """
+        return self._options_for(server)["max_connections"]
+
+    def get_client(self, server: str) -> httpx.AsyncClient:
+        client = self._clients.get(server)
+        if client is None:
+            client = self._build_client(server)
+            self._clients[server] = client
+        return client
+
+    async def post_json(self, server: str, path: str, payload: Dict, headers: Dict) -> Dict:
+        """
+        일반(비스트리밍) 요청을 전달하고 JSON 응답을 반환합니다.
+
+        :raises httpx.HTTPError: 연결 실패 또는 4xx/5xx 응답
+        """
+        client = self.get_client(server)
+        response = await client.post(path, headers=filter_request_headers(headers), **request_content(payload))
+        response.raise_for_status()
+        return response.json()
+
+    async def open_stream(
+        self, server: str, path: str, payload: Dict, headers: Dict
+    ) -> AsyncIterator[bytes]:
+        """
+        스트리밍 요청을 전달합니다. 응답 헤더까지 수신한 뒤 원본 바이트 청크 이터레이터를 반환합니다.
+
+        연결 오류와 HTTP 오류는 첫 청크 이전에 발생하므로 호출자가 일반 요청과 동일하게 처리할 수 있습니다.
+
+        :raises httpx.HTTPError: 연결 실패 또는 4xx/5xx 응답
+        """
+        client = self.get_client(server)
+        request = client.build_request(
+            "POST", path, headers=filter_request_headers(headers), **request_content(payload)
+        )
+        response = await client.send(request, stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            response.raise_for_status()
+        # 반복을 시작하기 전에 닫혀도 응답(커넥션)을 반납
+        return ClosingStream(response.aiter_raw(), response)
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
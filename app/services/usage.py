@@ -0,0 +1,251 @@
+import asyncio
+import json
+import re
+import sqlite3
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from app.services.scheduler import TenantResolver
+
+DEFAULT_USAGE_CONFIG = {
+    "enabled": False,
+    "sink": "jsonl",  # "jsonl" 또는 "sqlite"
+    "path": "usage.jsonl",
+    "flush_interval": 10.0,  # 집계를 싱크에 기록하는 주기 (초)
+    "rate_limit_window": 60.0,  # 토큰 속도 제한 창 (초)
+    "default_tokens_per_window": 0,  # 테넌트별 창당 최대 토큰 (prompt + completion), 0 이면 제한 없음
+    "tenant_limits": {},  # 테넌트 -> 창당 최대 토큰 (0 이면 제한 없음)
+}
+
+# 집계 값 열
+REQUESTS = 0
+PROMPT_TOKENS = 1
+COMPLETION_TOKENS = 2
+ESTIMATED = 3  # usage 가 없어 추정한 요청 수
+
+USAGE_PATTERN = re.compile(rb'"usage"\s*:\s*\{')
+
+
+class RateLimited(Exception):
+    """
+    테넌트가 토큰 속도 제한을 넘었을 때 발생합니다.
+    """
+
+    def __init__(self, tenant: str, retry_after: float):
+        super().__init__(f"Token rate limit exceeded for tenant {tenant}.")
+        self.detail = str(self)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class StreamUsage:
+    """
+    중계 중인 SSE 바이트에서 usage 를 찾습니다.
+
+    마지막 청크의 usage(stream_options.include_usage)가 있으면 그 값을 쓰고,
+    없으면 data 이벤트 수를 생성 토큰 수로 셉니다 (vLLM 은 이벤트마다 토큰 하나).
+    usage 후보가 있는 이벤트만 JSON 으로 파싱합니다.
+    """
+
+    __slots__ = ("events", "usage", "_tail")
+
+    def __init__(self):
+        self.events = 0
+        self.usage: Optional[Mapping] = None
+        self._tail = b""  # 아직 끝나지 않은 이벤트
+
+    def feed(self, chunk: bytes):
+        data = self._tail + chunk if self._tail else chunk
+        end = data.rfind(b"\n\n")
+        if end < 0:
+            self._tail = data
+            return
+        complete, self._tail = data[:end], data[end + 2 :]
+        self.events += complete.count(b"data:") - complete.count(b"[DONE]")
+        if b'"usage"' in complete:
+            for event in complete.split(b"\n\n"):
+                if USAGE_PATTERN.search(event):
+                    try:
+                        usage = json.loads(event[event.index(b"data:") + 5 :]).get("usage")
+                    except ValueError:
+                        continue
+                    if usage:
+                        self.usage = usage
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, flushed_at: float, rows: List[Tuple]):
+        with open(self.path, "a") as f:
+            for (tenant, model, server), values in rows:
+                f.write(json.dumps({
+                    "time": flushed_at, "tenant": tenant, "model": model, "server": server,
+                    "requests": values[REQUESTS], "prompt_tokens": values[PROMPT_TOKENS],
+                    "completion_tokens": values[COMPLETION_TOKENS], "estimated_requests": values[ESTIMATED],
+                }) + "\n")
+
+
+class SqliteSink:
+    def __init__(self, path: str):
+        self.path = path
+        with sqlite3.connect(path) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS usage (time REAL, tenant TEXT, model TEXT, server TEXT, "
+                "requests INTEGER, prompt_tokens INTEGER, completion_tokens INTEGER, estimated_requests INTEGER)"
+            )
+
+    def write(self, flushed_at: float, rows: List[Tuple]):
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                db.executemany(
+                    "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(flushed_at, *key, *values) for key, values in rows],
+                )
+        finally:
+            db.close()
+
+
+SINKS = {"jsonl": JsonlSink, "sqlite": SqliteSink}
+
+
+class UsageMeter:
+    """
+    업스트림 응답의 토큰 사용량을 (테넌트, 모델, 서버)별로 메모리에 집계하고 주기적으로 싱크에 기록합니다.
+
+    - 요청 경로는 딕셔너리 갱신만 하며, 싱크 기록은 백그라운드 작업이 별도 스레드에서 묶어서 수행
+    - 기록에 실패한 집계는 다음 주기에 다시 기록
+    - 같은 집계로 테넌트별 토큰 속도 제한 (고정 창 두 개를 겹쳐 근사한 슬라이딩 윈도)
+    """
+
+    def __init__(self, tenants: Optional[TenantResolver] = None, **config):
+        """
+        :param tenants: 테넌트를 정하는 방법 (없으면 tenants 기본 설정)
+        :param config: DEFAULT_USAGE_CONFIG 를 덮어쓸 설정
+        """
+        options = {**DEFAULT_USAGE_CONFIG, **config}
+        self.tenants = tenants or TenantResolver()
+        self.flush_interval = float(options["flush_interval"])
+        self.window = float(options["rate_limit_window"])
+        self.default_limit = int(options["default_tokens_per_window"])
+        self.tenant_limits: Dict[str, int] = dict(options["tenant_limits"])
+        self.sink = SINKS[options["sink"]](options["path"])
+        self._pending: Dict[Tuple[str, str, str], List[int]] = {}
+        # 테넌트 -> [현재 창 시작 시각, 현재 창 토큰, 이전 창 토큰]
+        self._windows: Dict[str, List[float]] = {}
+        self.flushed_rows = 0
+        self.flush_errors = 0
+
+    def tenant(self, headers: Mapping[str, str]) -> str:
+        return self.tenants(headers)
+
+    def record(
+        self, tenant: str, model_name: Optional[str], server: str, prompt_tokens: int, completion_tokens: int,
+        estimated: bool = False,
+    ):
+        key = (tenant, model_name or "", server)
+        values = self._pending.get(key)
+        if values is None:
+            values = self._pending[key] = [0, 0, 0, 0]
+        values[REQUESTS] += 1
+        values[PROMPT_TOKENS] += prompt_tokens
+        values[COMPLETION_TOKENS] += completion_tokens
+        values[ESTIMATED] += estimated
+        self._window(tenant, time.monotonic())[1] += prompt_tokens + completion_tokens
+
+    def record_response(self, tenant: str, model_name: Optional[str], server: str, usage: Optional[Mapping]):
+        """
+        비스트리밍 응답의 usage 를 기록합니다. usage 가 없으면 기록하지 않습니다.
+        """
+        if usage:
+            self.record(
+                tenant, model_name, server, usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0
+            )
+
+    def record_stream(
+        self, tenant: str, model_name: Optional[str], server: str, stream: StreamUsage, prompt_estimate: float
+    ):
+        """
+        스트림이 끝났을 때(또는 중간에 끊겼을 때) 기록합니다.
+
+        :param prompt_estimate: usage 가 없을 때 사용할 예상 프롬프트 토큰 수
+        """
+        if stream.usage:
+            self.record_response(tenant, model_name, server, stream.usage)
+        elif stream.events > 0:
+            self.record(tenant, model_name, server, round(prompt_estimate), stream.events, estimated=True)
+
+    def _window(self, tenant: str, now: float) -> List[float]:
+        window = self._windows.get(tenant)
+        if window is None:
+            window = self._windows[tenant] = [now, 0, 0]
+        elapsed = now - window[0]
+        if elapsed >= self.window:
+            # 바로 다음 창이면 현재 값을 이전 창으로, 더 지났으면 둘 다 비움
+            window[2] = window[1] if elapsed < 2 * self.window else 0
+            window[1] = 0
+            window[0] += (elapsed // self.window) * self.window
+        return window
+
+    def limit(self, tenant: str) -> int:
+        return self.tenant_limits.get(tenant, self.default_limit)
+
+    def used(self, tenant: str) -> float:
+        """
+        최근 rate_limit_window 동안 사용한 토큰 수 (이전 창은 겹치는 비율만큼 반영).
+        """
+        now = time.monotonic()
+        start, current, previous = self._window(tenant, now)
+        return current + previous * (1 - (now - start) / self.window)
+
+    def check(self, tenant: str):
+        """
+        :raises RateLimited: 최근 창의 사용량이 테넌트 한도 이상일 때
+        """
+        limit = self.limit(tenant)
+        if not limit or tenant not in self._windows:
+            return
+        if self.used(tenant) >= limit:
+            start = self._windows[tenant][0]
+            raise RateLimited(tenant, start + self.window - time.monotonic())
+
+    async def flush(self):
+        """
+        쌓인 집계를 싱크에 기록합니다. 기록은 스레드에서 실행되어 이벤트 루프를 막지 않습니다.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = list(pending.items())
+        try:
+            await asyncio.to_thread(self.sink.write, time.time(), rows)
+            self.flushed_rows += len(rows)
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"Failed to write usage to {self.sink.path}: {e}")
+            # 실패한 집계는 그 사이 쌓인 값과 합쳐 다음 주기에 다시 기록
+            for key, values in rows:
+                merged = self._pending.setdefault(key, [0, 0, 0, 0])
+                for column, value in enumerate(values):
+                    merged[column] += value
+
+    async def run(self):
+        """
+        flush_interval 마다 집계를 기록하는 백그라운드 루프. 취소될 때 남은 집계를 기록합니다.
+        """
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            await asyncio.shield(self.flush())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        테넌트별 최근 창 토큰 사용량과 한도.
+        """
+        return {
+            tenant: {"tokens": self.used(tenant), "limit": self.limit(tenant)}
+            for tenant in list(self._windows)
+        }
@@ -29,5 +29,68 @@ class ConfigLoader:
     def get_metrics_update_interval(self):
         return self.config.get("metrics_update_interval", 10)
 
+    def get_metrics_config(self):
+        return self.config.get("metrics", {})
+
+    def get_prefix_affinity_config(self):
+        return self.config.get("prefix_affinity", {})
+
+    def get_outstanding_queue_weight(self):
+        return self.config.get("outstanding_queue_weight", 1.0)
+
+    def get_response_cache_config(self):
+        return self.config.get("response_cache", {})
+
+    def get_admission_config(self):
+        return self.config.get("admission", {})
+
+    def get_health_config(self):
+        return self.config.get("health", {})
+
+    def get_retry_config(self):
+        return self.config.get("retry", {})
+
+    def get_stream_relay_config(self):
+        return self.config.get("stream_relay", {})
+
+    def get_routing_config(self):
+        return self.config.get("routing", {})
+
+    def get_shared_state_config(self):
+        return self.config.get("shared_state", {})
+
+    def get_peak_ewma_config(self):
+        return self.config.get("peak_ewma", {})
+
+    def get_token_cost_config(self):
+        return self.config.get("token_cost", {})
+
+    def get_usage_config(self):
+        return self.config.get("usage", {})
+
+    def get_tenant_config(self):
+        return self.config.get("tenants", {})
+
+    def get_tracing_config(self):
+        return self.config.get("tracing", {})
+
+    def get_batch_config(self):
+        return self.config.get("batch", {})
+
+    def get_fanout_config(self):
+        return self.config.get("fanout", {})
+
+    def get_access_log_config(self):
+        return self.config.get("access_log", {})
+
+    def get_admin_config(self):
+        return self.config.get("admin", {})
+
+    def get_request_validation_config(self):
+        return self.config.get("request_validation", {})
+
     def get_default_generate_server(self):
         return self.config.get("default_generate_server")
+
+    def get_upstream_config(self):
+        return self.config.get("upstream", {})
@@ -1,11 +1,93 @@
+import hmac
+import time
+from typing import Optional, Type
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+from app.services.batch import BatchManager
 from app.services.load_balancer import LoadBalancer
+from app.services.response_cache import ResponseCache
+from app.services.routing_table import RoutingTableManager
+from app.services.scheduler import AdmissionController
+from app.services.stream_relay import StreamRelay
+from app.services.tracing import Tracer, current_trace
+from app.utils.request_body import RequestBody, parse_body
 
 # 전역적으로 초기화된 load_balancer를 가져오기 위한 의존성 함수
+# (동기 함수 의존성은 요청마다 스레드 풀에서 실행되므로 모두 async 로 정의)
 load_balancer = None
+response_cache = None
+admission_controller = None
+stream_relay = StreamRelay()
+routing_table = None
+validate_requests = False
+tracer = None
+batch_manager = None
 
-def init_dependencies(lb: LoadBalancer):
-    global load_balancer
+def init_dependencies(
+    lb: LoadBalancer, cache: ResponseCache = None, admission: AdmissionController = None,
+    relay: StreamRelay = None, routing: RoutingTableManager = None, validate: bool = False,
+    request_tracer: Tracer = None, batches: BatchManager = None,
+):
+    global load_balancer, response_cache, admission_controller, stream_relay, routing_table, validate_requests
+    global tracer, batch_manager
     load_balancer = lb
+    response_cache = cache
+    admission_controller = admission
+    stream_relay = relay or StreamRelay()
+    routing_table = routing or lb.routing
+    validate_requests = validate
+    tracer = request_tracer
+    batch_manager = batches
 
-def get_load_balancer():
+async def get_load_balancer():
     return load_balancer
+
+async def get_response_cache():
+    return response_cache
+
+async def get_admission_controller():
+    return admission_controller
+
+async def get_stream_relay():
+    return stream_relay
+
+async def get_routing_table():
+    return routing_table
+
+async def get_tracer():
+    return tracer
+
+async def get_batch_manager():
+    return batch_manager
+
+async def require_admin_token(request: Request):
+    """
+    운영 작업(모델 추가/수정/삭제, 드레인, 테넌트 사용량 조회)용 관리자 인증. config 의 admin.token 을 Bearer 토큰으로 요구합니다.
+    토큰이 설정되지 않았으면 해당 엔드포인트는 꺼져 있습니다. 설정을 다시 읽으면 새 토큰이 바로 적용됩니다.
+
+    :raises HTTPException: 토큰 미설정 (403), 토큰 불일치 (401)
+    """
+    token = routing_table.config_loader.get_admin_config().get("token")
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin endpoint is disabled. Set admin.token in the config.")
+    authorization = request.headers.get("authorization", "")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token.", headers={"WWW-Authenticate": "Bearer"})
+
+def request_body(model: Optional[Type[BaseModel]] = None):
+    """
+    요청 본문 의존성을 만듭니다. 본문은 한 번만 파싱하며, request_validation 이 켜져 있을 때만 model 로 전체 검증합니다.
+    """
+    async def dependency(request: Request) -> RequestBody:
+        raw = await request.body()
+        trace = current_trace()
+        if trace is None:
+            return parse_body(raw, model if validate_requests else None)
+        started_at = time.perf_counter()
+        body = parse_body(raw, model if validate_requests else None)
+        trace.add_span("parse", started_at, time.perf_counter(), {"bytes": len(raw)})
+        return body
+
+    return dependency
@@ -0,0 +1,247 @@
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# 수집할 vLLM 시계열 {출력 키: {"names": [후보 메트릭 이름...], "aggregate": "sum" | "max"}}
+# vLLM 버전마다 이름이 달라 후보 여러 개를 두며, 먼저 발견된 것과 관계없이 모두 합산된다.
+DEFAULT_VLLM_SERIES = {
+    "num_requests_running": {"names": ["vllm:num_requests_running"]},
+    "num_requests_waiting": {"names": ["vllm:num_requests_waiting"]},
+    "num_requests_swapped": {"names": ["vllm:num_requests_swapped"]},
+    "gpu_cache_usage": {
+        "names": ["vllm:gpu_cache_usage_perc", "vllm:kv_cache_usage_perc"],
+        "aggregate": "max",
+    },
+    "prompt_tokens": {"names": ["vllm:prompt_tokens_total"]},
+    "generation_tokens": {"names": ["vllm:generation_tokens_total"]},
+    "ttft": {"names": ["vllm:time_to_first_token_seconds"]},
+    "inter_token_latency": {
+        "names": ["vllm:time_per_output_token_seconds", "vllm:inter_token_latency_seconds"]
+    },
+}
+
+HISTOGRAM_QUANTILES = (0.5, 0.95)
+
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+
+
+class Histogram:
+    """
+    라벨 집합을 합산한 히스토그램(또는 summary) 상태.
+    """
+
+    __slots__ = ("sum", "count", "buckets", "quantiles")
+
+    def __init__(self):
+        self.sum = 0.0
+        self.count = 0.0
+        self.buckets: Dict[float, float] = {}  # le -> 누적 개수
+        self.quantiles: Dict[float, float] = {}  # summary 전용 quantile -> 값
+
+    def quantile(self, q: float, previous: Optional["Histogram"] = None) -> Optional[float]:
+        """
+        버킷에서 분위수를 선형 보간으로 추정합니다 (Prometheus histogram_quantile 과 동일).
+
+        :param previous: 지정 시 이전 수집 이후 증가분만으로 계산
+        """
+        if not self.buckets:
+            return None
+        bounds = sorted(self.buckets)
+        counts = [self.buckets[le] - (previous.buckets.get(le, 0.0) if previous else 0.0) for le in bounds]
+        total = counts[-1]
+        if total <= 0:
+            return None
+        rank = q * total
+        lower_bound, lower_count = 0.0, 0.0
+        for le, count in zip(bounds, counts):
+            if count >= rank:
+                if math.isinf(le):
+                    return lower_bound
+                if count == lower_count:
+                    return le
+                return lower_bound + (le - lower_bound) * (rank - lower_count) / (count - lower_count)
+            lower_bound, lower_count = le, count
+        return bounds[-1]
+
+
+class MetricSample:
+    """
+    한 번의 수집 결과. 시계열 키별 스칼라 값과 히스토그램을 보관합니다.
+    """
+
+    __slots__ = ("values", "histograms", "counters")
+
+    def __init__(self):
+        self.values: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: set = set()
+
+    def to_metrics(self, previous: Optional["MetricSample"] = None, elapsed: float = 0.0) -> Dict[str, float]:
+        """
+        라우팅에서 사용하는 평탄한 메트릭 딕셔너리로 변환합니다.
+
+        이전 수집 결과가 주어지면 카운터는 초당 증가율(``<key>_rate``)을,
+        히스토그램은 구간 평균/분위수를 계산합니다. 카운터 리셋 시에는 누적값을 사용합니다.
+
+        :param previous: 같은 서버의 이전 수집 결과
+        :param elapsed: 이전 수집 이후 경과 시간 (초)
+        """
+        metrics = dict(self.values)
+        for key in self.counters:
+            metrics[f"{key}_total"] = metrics.pop(key)
+            if previous is not None and elapsed > 0 and key in previous.values:
+                delta = self.values[key] - previous.values[key]
+                if delta >= 0:
+                    metrics[f"{key}_rate"] = delta / elapsed
+
+        for key, histogram in self.histograms.items():
+            metrics[f"{key}_sum"] = histogram.sum
+            metrics[f"{key}_count"] = histogram.count
+            window = previous.histograms.get(key) if previous is not None else None
+            if window is not None and histogram.count < window.count:
+                window = None  # 카운터 리셋
+            count = histogram.count - (window.count if window else 0.0)
+            if count > 0:
+                metrics[f"{key}_avg"] = (histogram.sum - (window.sum if window else 0.0)) / count
+            for q in HISTOGRAM_QUANTILES:
+                value = histogram.quantiles.get(q)
+                if value is None:
+                    value = histogram.quantile(q, window)
+                if value is not None and not math.isnan(value):
+                    metrics[f"{key}_p{int(q * 100)}"] = value
+        return metrics
+
+
+SeriesConfig = Dict[str, Union[Dict, List[str]]]
+
+
+class PrometheusParser:
+    """
+    Prometheus 텍스트 노출 형식의 스트리밍 파서.
+
+    관심 있는 시계열 이름은 초기화 시 조회 테이블로 미리 만들어 두고, 각 줄은 이름만 잘라 조회합니다.
+    대상이 아닌 줄(대부분)은 라벨/값을 파싱하지 않고 건너뜁니다.
+    """
+
+    def __init__(self, series: Optional[SeriesConfig] = None):
+        """
+        :param series: 수집할 시계열 설정. 값은 이름 목록 또는 {"names": [...], "aggregate": "sum"|"max"}
+        """
+        self._lookup: Dict[str, Tuple[str, str]] = {}
+        self._families: Dict[str, str] = {}
+        self._total_keys = set()
+        self._aggregate_max = set()
+        # 버킷 라벨 문자열 -> le 경계. 같은 라벨 집합은 수집마다 반복되므로 한 번만 파싱한다.
+        self._le_cache: Dict[str, float] = {}
+        for key, spec in (series or DEFAULT_VLLM_SERIES).items():
+            if not isinstance(spec, dict):
+                spec = {"names": list(spec)}
+            if spec.get("aggregate", "sum") == "max":
+                self._aggregate_max.add(key)
+            for name in spec["names"]:
+                self._lookup[name] = (key, "value")
+                self._lookup[f"{name}_bucket"] = (key, "bucket")
+                self._lookup[f"{name}_sum"] = (key, "sum")
+                self._lookup[f"{name}_count"] = (key, "count")
+                self._families[name] = key
+                if name.endswith("_total"):
+                    # OpenMetrics 는 TYPE 행에 _total 접미사를 뺀 이름을 쓴다
+                    self._families[name[: -len("_total")]] = key
+                    self._total_keys.add(key)
+
+    def parse(self, text: Union[str, Iterable[str]]) -> MetricSample:
+        """
+        노출 형식 텍스트(또는 줄 이터러블)를 파싱합니다.
+
+        :param text: /metrics 응답 본문
+        :return: MetricSample
+        """
+        lines = text.splitlines() if isinstance(text, str) else text
+        lookup = self._lookup
+        families = self._families
+        sample = MetricSample()
+        values = sample.values
+        histograms = sample.histograms
+        types: Dict[str, str] = {}
+        le_cache = self._le_cache
+        if len(le_cache) > 8192:
+            le_cache.clear()
+
+        for line in lines:
+            if not line:
+                continue
+            if line[0] == "#":
+                # "# TYPE <name> <type>" 만 사용하고 HELP/기타 주석은 무시
+                if line.startswith("# TYPE "):
+                    parts = line.split()
+                    if len(parts) >= 4 and parts[2] in families:
+                        types[families[parts[2]]] = parts[3]
+                continue
+
+            brace = line.find("{")
+            space = line.find(" ")
+            if brace != -1 and (space == -1 or brace < space):
+                entry = lookup.get(line[:brace])
+                if entry is None:
+                    continue
+                # 값/타임스탬프에는 '}' 가 없으므로 마지막 '}' 가 라벨 블록의 끝
+                close = line.rfind("}")
+                labels = line[brace + 1 : close]
+                rest = line[close + 1 :].split()
+            else:
+                entry = lookup.get(line[:space] if space != -1 else line)
+                if entry is None:
+                    continue
+                labels = None
+                rest = line[space:].split() if space != -1 else ()
+            if not rest:
+                continue
+            try:
+                value = float(rest[0])
+            except ValueError:
+                continue
+            key, role = entry
+
+            if role == "value":
+                if labels and "quantile=" in labels:
+                    quantile = _label(labels, "quantile")
+                    if quantile is not None:
+                        histogram = histograms.get(key) or histograms.setdefault(key, Histogram())
+                        q = float(quantile)
+                        histogram.quantiles[q] = max(histogram.quantiles.get(q, value), value)
+                        continue
+                if math.isnan(value):
+                    continue
+                if key in values and key in self._aggregate_max:
+                    values[key] = max(values[key], value)
+                else:
+                    values[key] = values.get(key, 0.0) + value
+                continue
+
+            histogram = histograms.get(key) or histograms.setdefault(key, Histogram())
+            if role == "bucket":
+                bound = le_cache.get(labels)
+                if bound is None:
+                    le = _label(labels, "le") if labels else None
+                    if le is None:
+                        continue
+                    bound = float(le)
+                    le_cache[labels] = bound
+                histogram.buckets[bound] = histogram.buckets.get(bound, 0.0) + value
+            elif role == "sum":
+                histogram.sum += value
+            elif role == "count":
+                histogram.count += value
+
+        for key in values:
+            # TYPE 행이 없으면 _total 접미사로 카운터를 판별
+            if types.get(key, "counter" if key in self._total_keys else "gauge") == "counter":
+                sample.counters.add(key)
+        return sample
+
+
+def _label(labels: str, name: str) -> Optional[str]:
+    for match in _LABEL_RE.finditer(labels):
+        if match.group(1) == name:
+            return match.group(2)
+    return None
@@ -0,0 +1,82 @@
+import json
+from typing import Any, Dict, Mapping, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    _loads = json.loads
+
+# 라우팅/캐시/비용 추정에 쓰는 필드와 허용 타입 (None 은 항상 허용)
+ROUTING_FIELDS = {
+    "model": str,
+    "stream": bool,
+    "messages": list,
+    "prompt": (str, list),
+    "max_tokens": int,
+    "n": int,
+    "temperature": (int, float),
+}
+
+
+class RequestBody(dict):
+    """
+    파싱된 요청 본문과 클라이언트가 보낸 원본 바이트.
+
+    딕셔너리 내용은 라우팅/캐시/비용 추정에서 읽기만 하고, 업스트림에는 raw 를 그대로 전달합니다.
+    따라서 요청 모델에 없는 필드(tools, response_format, logprobs, seed 등)도 빠지지 않습니다.
+    본문을 바꿔 보내야 하면 dict(body) 로 복사한 일반 딕셔너리를 사용합니다 (JSON 으로 다시 인코딩되어 전달).
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, data: Mapping[str, Any], raw: bytes):
+        super().__init__(data)
+        self.raw = raw
+
+
+def parse_body(raw: bytes, model: Optional[Type[BaseModel]] = None) -> RequestBody:
+    """
+    요청 본문을 한 번만 파싱하고 라우팅에 쓰는 필드의 타입만 확인합니다.
+
+    :param raw: 요청 본문 바이트
+    :param model: 지정 시 pydantic 모델로 전체 검증 (결과는 버리고 원본을 그대로 사용)
+    :raises HTTPException: JSON 객체가 아니거나 라우팅 필드의 타입이 잘못된 경우 (400)
+    :raises RequestValidationError: 전체 검증 실패 (422, FastAPI 기본 검증 오류와 같은 형식)
+    """
+    try:
+        data = _loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON.")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object.")
+    for field, types in ROUTING_FIELDS.items():
+        value = data.get(field)
+        if value is not None and not isinstance(value, types):
+            raise HTTPException(status_code=400, detail=f"Field '{field}' has an invalid type.")
+    messages = data.get("messages")
+    if messages is not None and not all(isinstance(message, dict) for message in messages):
+        raise HTTPException(status_code=400, detail="Field 'messages' must be a list of objects.")
+    if model is not None:
+        try:
+            model.model_validate(data)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+    return RequestBody(data, raw)
+
+
+def request_schema(model: Type[BaseModel]) -> Dict:
+    """
+    본문을 직접 읽는 라우트의 OpenAPI 문서에 요청 모델 스키마를 표시하기 위한 openapi_extra.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
@@ -0,0 +1,47 @@
+from typing import AsyncIterator, Callable, Optional
+
+
+class ClosingStream:
+    """
+    청크 이터레이터를 감싸 aclose() 가 반복을 시작했는지와 관계없이 정리를 수행하게 합니다.
+
+    비동기 제너레이터는 첫 청크를 요청하기 전에 닫히면 finally 가 실행되지 않으므로,
+    클라이언트가 응답 본문을 읽기 전에 연결을 끊으면 카운터와 업스트림 응답이 반납되지 않습니다.
+    이 래퍼는 스트림이 끝나거나 실패하거나 aclose() 가 호출될 때 한 번만
+    chunks 와 sources 를 차례로 닫고 on_close 를 호출합니다.
+    """
+
+    __slots__ = ("_chunks", "_sources", "_on_close", "_closed")
+
+    def __init__(self, chunks: AsyncIterator[bytes], *sources, on_close: Optional[Callable[[], None]] = None):
+        """
+        :param chunks: 내보낼 청크 이터레이터
+        :param sources: chunks 가 읽는 하위 스트림 등 함께 닫을 객체 (aclose() 코루틴 필요)
+        :param on_close: 닫힐 때 한 번 호출할 정리 함수
+        """
+        self._chunks = chunks
+        self._sources = sources
+        self._on_close = on_close
+        self._closed = False
+
+    def __aiter__(self) -> "ClosingStream":
+        return self
+
+    async def __anext__(self) -> bytes:
+        try:
+            return await self._chunks.__anext__()
+        except BaseException:
+            # 끝났거나 실패한 스트림은 바로 정리 (StopAsyncIteration 포함)
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            for chunks in (self._chunks, *self._sources):
+                await chunks.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
@@ -0,0 +1,74 @@
+"""
+라우터 계측 오버헤드 마이크로벤치마크.
+
+요청 하나가 기록하는 메트릭(선택 결정, 업스트림 시도, 요청 지연)과 스트림 청크당 기록 비용을 측정합니다.
+
+    python -m benchmarks.bench_instrumentation --requests 200000 --output instrumentation.json
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.services.instrumentation import RouterMetrics
+
+SERVERS = [f"http://node{i}:8000" for i in range(8)]
+
+
+def bench_request_path(metrics: RouterMetrics, requests: int) -> float:
+    start = time.perf_counter()
+    for index in range(requests):
+        server = SERVERS[index % len(SERVERS)]
+        metrics.observe_selection("bench-model", "round_robin", server)
+        metrics.observe_upstream(server, 0.12)
+        metrics.observe_request("/v1/chat/completions", "bench-model", "ok", 0.15)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def _consume(stream) -> int:
+    count = 0
+    async for _ in stream:
+        count += 1
+    return count
+
+
+async def _chunks(count: int):
+    for _ in range(count):
+        yield b"data: {}\n\n"
+
+
+async def bench_stream_chunks(metrics: RouterMetrics, streams: int, chunks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(streams):
+        await _consume(_chunks(chunks))
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(streams):
+        await _consume(metrics.track_stream("/v1/chat/completions", "bench-model", time.perf_counter(), _chunks(chunks)))
+    instrumented = time.perf_counter() - start
+    return (instrumented - baseline) / (streams * chunks) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--chunks", type=int, default=100, help="스트림당 청크 수")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    metrics = RouterMetrics()
+    results = {
+        "request_us": bench_request_path(metrics, args.requests),
+        "stream_chunk_us": asyncio.run(bench_stream_chunks(metrics, args.streams, args.chunks)),
+    }
+    print(f"per request (selection + upstream + request): {results['request_us']:.2f} us")
+    print(f"per stream chunk: {results['stream_chunk_us']:.2f} us")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "instrumentation", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
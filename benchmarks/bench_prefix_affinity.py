@@ -0,0 +1,161 @@
+"""
+prefix_affinity 전략 오프라인 재생(replay) 벤치마크.
+
+공유 시스템 프롬프트를 가진 다중 턴 채팅 트래픽을 생성해 LoadBalancer 전략별로 재생하고,
+각 서버의 프리픽스 캐시(LRU 블록 캐시)를 모사해 프리픽스 캐시 적중률과 부하 불균형을 보고합니다.
+
+    python -m benchmarks.bench_prefix_affinity --servers 8 --sessions 400 --output affinity.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from collections import OrderedDict, deque
+from types import MappingProxyType
+
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.prefix_affinity import prompt_text
+from app.utils.config_loader import ConfigLoader
+
+STRATEGIES = ["round_robin", "random", "least_connection", "prefix_affinity"]
+MODEL = "replay-model"
+BLOCK_SIZE = 64  # 모사 KV 캐시 블록 크기 (문자 수, 약 16 토큰)
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(f"w{rng.randint(0, 5000)}" for _ in range(count))
+
+
+def build_trace(sessions: int, turns: int, system_prompts: int, seed: int):
+    """
+    (세션 번호, chat payload) 목록을 반환합니다. 세션들의 턴은 무작위로 섞여 도착합니다.
+    """
+    rng = random.Random(seed)
+    prompts = [_words(rng, 300) for _ in range(system_prompts)]
+    histories = {}
+    arrivals = [session for session in range(sessions) for _ in range(turns)]
+    rng.shuffle(arrivals)
+    trace = []
+    for session in arrivals:
+        history = histories.setdefault(
+            session, [{"role": "system", "content": prompts[session % system_prompts]}]
+        )
+        history.append({"role": "user", "content": _words(rng, rng.randint(10, 60))})
+        trace.append((session, {"model": MODEL, "messages": list(history)}))
+        history.append({"role": "assistant", "content": _words(rng, rng.randint(20, 120))})
+    return trace
+
+
+class SimulatedServer:
+    """
+    블록 단위 LRU 프리픽스 캐시를 가진 vLLM 노드 모사.
+    """
+
+    def __init__(self, capacity_blocks: int):
+        self.capacity_blocks = capacity_blocks
+        self.cache = OrderedDict()
+
+    def serve(self, text: str):
+        hasher = hashlib.blake2b(digest_size=16)
+        blocks = len(text) // BLOCK_SIZE
+        hit = 0
+        missed = False
+        for index in range(blocks):
+            hasher.update(text[index * BLOCK_SIZE : (index + 1) * BLOCK_SIZE].encode())
+            key = hasher.digest()
+            if not missed and key in self.cache:
+                hit += 1
+                self.cache.move_to_end(key)
+            else:
+                missed = True
+                self.cache[key] = True
+        while len(self.cache) > self.capacity_blocks:
+            self.cache.popitem(last=False)
+        return hit, blocks
+
+
+def _make_load_balancer(servers, strategy: str) -> LoadBalancer:
+    config = {"models": {MODEL: {"servers": servers, "strategy": strategy}}}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+    try:
+        config_loader = ConfigLoader(f.name)
+    finally:
+        os.unlink(f.name)
+    return LoadBalancer(MetricsCollector({MODEL: servers}), config_loader)
+
+
+async def replay(trace, num_servers: int, strategy: str, capacity_blocks: int, concurrency: int):
+    servers = [f"http://node{i}:8000" for i in range(num_servers)]
+    load_balancer = _make_load_balancer(servers, strategy)
+    simulated = {server: SimulatedServer(capacity_blocks) for server in servers}
+    assigned = {server: 0 for server in servers}
+    in_flight = deque()  # 최근 concurrency 개 요청을 "실행 중"으로 간주
+    running = {server: 0 for server in servers}
+    hit_blocks = total_blocks = 0
+    selection_time = 0.0
+
+    for _, payload in trace:
+        load_balancer.metrics_collector.metrics = {
+            MODEL: MappingProxyType(
+                {server: MappingProxyType({"num_requests_running": running[server]}) for server in servers}
+            )
+        }
+        start = time.perf_counter()
+        server = await load_balancer.select_server(MODEL, payload=payload)
+        selection_time += time.perf_counter() - start
+
+        hit, blocks = simulated[server].serve(prompt_text(payload))
+        hit_blocks += hit
+        total_blocks += blocks
+        assigned[server] += 1
+        running[server] += 1
+        in_flight.append(server)
+        if len(in_flight) > concurrency:
+            running[in_flight.popleft()] -= 1
+
+    await load_balancer.aclose()
+    mean = len(trace) / num_servers
+    return {
+        "strategy": strategy,
+        "requests": len(trace),
+        "prefix_hit_rate": hit_blocks / total_blocks if total_blocks else 0.0,
+        "load_imbalance": max(assigned.values()) / mean,
+        "select_us": selection_time / len(trace) * 1e6,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--system-prompts", type=int, default=12)
+    parser.add_argument("--capacity-blocks", type=int, default=4000, help="서버당 모사 KV 캐시 블록 수")
+    parser.add_argument("--concurrency", type=int, default=64, help="동시에 실행 중으로 간주할 요청 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    trace = build_trace(args.sessions, args.turns, args.system_prompts, args.seed)
+    results = []
+    for strategy in STRATEGIES:
+        results.append(await replay(trace, args.servers, strategy, args.capacity_blocks, args.concurrency))
+
+    for row in results:
+        print(
+            f"{row['strategy']:>17}: prefix hit rate {row['prefix_hit_rate'] * 100:5.1f}%  "
+            f"imbalance (max/mean) {row['load_imbalance']:.2f}  select {row['select_us']:.1f} us"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "prefix_affinity", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Prometheus 파서 벤치마크.
+
+vLLM /metrics 응답 크기별로 1회 파싱 비용을 측정하고, 수집 주기 대비 비율을 보고합니다.
+
+    python -m benchmarks.bench_prometheus_parser --interval 5 --output parser.json
+"""
+import argparse
+import json
+import statistics
+import time
+
+from app.services.metrics_collector import MetricsCollector
+from benchmarks.vllm_metrics_payload import build_payload
+
+PAYLOAD_SIZES = {"single_model": 0, "8_engines": 7, "50_engines": 50}
+
+
+def _time_per_call(func, repeat: int) -> float:
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        samples.append((time.perf_counter() - start) / repeat)
+    return statistics.median(samples)
+
+
+def _legacy_parse(metrics_text: str):
+    # 기존 구현 (num_requests_waiting 만 추출, 라벨이 붙으면 실패)
+    metrics = {}
+    for line in metrics_text.splitlines():
+        if line.startswith("vllm:num_requests_waiting"):
+            _, value = line.rsplit(" ", 1)
+            metrics["num_requests_waiting"] = float(value)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=5.0, help="비교할 수집 주기 (초)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    collector = MetricsCollector({"model": ["http://node:8000"]})
+    results = []
+    for name, extra in PAYLOAD_SIZES.items():
+        payload = build_payload(extra_label_sets=extra)
+        parse_cost = _time_per_call(lambda: collector.parse_metrics(payload, "http://node:8000"), args.repeat)
+        legacy_cost = _time_per_call(lambda: _legacy_parse(payload), args.repeat)
+        results.append(
+            {
+                "payload": name,
+                "bytes": len(payload),
+                "parse_us": round(parse_cost * 1e6, 1),
+                "legacy_scan_us": round(legacy_cost * 1e6, 1),
+                "mb_per_s": round(len(payload) / parse_cost / 1e6, 1),
+                "fraction_of_interval": parse_cost / args.interval,
+            }
+        )
+
+    for row in results:
+        print(
+            f"{row['payload']:>14}: {row['bytes'] / 1024:8.1f} KiB  parse {row['parse_us']:9.1f} us "
+            f"(legacy scan {row['legacy_scan_us']:8.1f} us)  {row['mb_per_s']:6.1f} MB/s  "
+            f"{row['fraction_of_interval'] * 100:.4f}% of {args.interval:g}s interval"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "prometheus_parser", "interval": args.interval, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
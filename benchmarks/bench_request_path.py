@@ -0,0 +1,166 @@
+"""
+요청 본문 처리 경로의 라우터 CPU 비용 벤치마크.
+
+메시지 배열 길이별로 다음 두 경로의 요청당 CPU 시간(time.process_time, 모든 스레드 합)을 비교합니다.
+
+- legacy: FastAPI 가 본문을 ChatCompletionRequest 로 검증하고 payload.dict() 로 다시 딕셔너리로 만든 뒤
+  httpx 가 JSON 으로 다시 인코딩해 전달 (동기 의존성 함수는 요청마다 스레드 풀에서 실행)
+- raw: 본문을 한 번만 파싱해 라우팅 필드만 확인하고 원본 바이트를 그대로 전달 (request_validation 꺼짐)
+
+"parse" 는 본문 처리 단계만, "router" 는 ASGI 앱 전체(서버 선택, 전달, 응답 직렬화 포함)를 잰 값입니다.
+업스트림은 같은 프로세스의 httpx.MockTransport 로 고정 응답을 돌려줍니다.
+
+    python -m benchmarks.bench_request_path --messages 1 100 1000 10000 --output request_path.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from types import MappingProxyType
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+
+from app.models.request import ChatCompletionRequest
+from app.routers import chat
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.proxy import forward_completion
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+from app.utils.request_body import parse_body
+
+MODEL = "bench-model"
+SERVER = "http://node1:8000"
+UPSTREAM_RESPONSE = {"id": "bench", "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}}]}
+
+
+def build_body(messages: int) -> bytes:
+    return json.dumps({
+        "model": MODEL,
+        "messages": [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " + "lorem ipsum " * 16}
+            for i in range(messages)
+        ],
+        "max_tokens": 64,
+        "temperature": 0.7,
+    }).encode()
+
+
+def legacy_parse(raw: bytes) -> bytes:
+    payload = ChatCompletionRequest.model_validate(json.loads(raw)).model_dump()
+    # httpx 의 json= 인코딩
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode()
+
+
+def raw_parse(raw: bytes) -> bytes:
+    return parse_body(raw).raw
+
+
+def build_load_balancer(config_path: str) -> LoadBalancer:
+    load_balancer = LoadBalancer(MetricsCollector({MODEL: [SERVER]}), ConfigLoader(config_path))
+    load_balancer.upstream_client = UpstreamClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=UPSTREAM_RESPONSE))
+    )
+    load_balancer.metrics_collector.metrics = {MODEL: MappingProxyType({SERVER: MappingProxyType({})})}
+    return load_balancer
+
+
+def legacy_app(load_balancer: LoadBalancer) -> FastAPI:
+    """
+    이전 /v1/chat/completions 핸들러 (비교용).
+    """
+    app = FastAPI()
+
+    def get_load_balancer():
+        return load_balancer
+
+    def get_none():
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(
+        request: Request,
+        payload: ChatCompletionRequest,
+        lb: LoadBalancer = Depends(get_load_balancer),
+        response_cache=Depends(get_none),
+        admission=Depends(get_none),
+        stream_relay=Depends(get_none),
+    ):
+        return await forward_completion(request, payload.model_dump(), "/v1/chat/completions", lb)
+
+    return app
+
+
+def raw_app(load_balancer: LoadBalancer) -> FastAPI:
+    init_dependencies(load_balancer)
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/v1")
+    return app
+
+
+def _cpu_us(fn, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+async def _router_cpu_us(app: FastAPI, raw: bytes, iterations: int) -> float:
+    headers = {"content-type": "application/json"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+        for _ in range(3):  # 워밍업
+            (await client.post("/v1/chat/completions", content=raw, headers=headers)).raise_for_status()
+        start = time.process_time()
+        for _ in range(iterations):
+            (await client.post("/v1/chat/completions", content=raw, headers=headers)).raise_for_status()
+        return (time.process_time() - start) / iterations * 1e6
+
+
+async def measure(messages: int, iterations: int, config_path: str) -> dict:
+    raw = build_body(messages)
+    iterations = max(iterations // max(messages // 10, 1), 10)
+    results = {"body_bytes": len(raw), "iterations": iterations}
+    for name, parse, build_app in (("legacy", legacy_parse, legacy_app), ("raw", raw_parse, raw_app)):
+        load_balancer = build_load_balancer(config_path)
+        results[f"{name}_parse_us"] = _cpu_us(lambda: parse(raw), iterations)
+        results[f"{name}_router_us"] = await _router_cpu_us(build_app(load_balancer), raw, iterations)
+        await load_balancer.aclose()
+    return results
+
+
+async def run(args) -> dict:
+    with tempfile.NamedTemporaryFile("w", suffix=".json") as config:
+        json.dump({"models": {MODEL: {"servers": [SERVER]}}}, config)
+        config.flush()
+        results = {}
+        for messages in args.messages:
+            results[messages] = result = await measure(messages, args.iterations, config.name)
+            print(
+                f"{messages:6d} messages ({result['body_bytes'] / 1024:8.1f} KiB)  "
+                f"parse legacy {result['legacy_parse_us']:10.1f} us  raw {result['raw_parse_us']:10.1f} us  "
+                f"router legacy {result['legacy_router_us']:10.1f} us  raw {result['raw_router_us']:10.1f} us"
+            )
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+    # 요청마다 찍히는 httpx 로그가 측정을 왜곡하지 않도록
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "request_path", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
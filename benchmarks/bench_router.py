@@ -0,0 +1,432 @@
+"""
+라우터 부하 벤치마크.
+
+가짜 vLLM 서버(benchmarks.mock_vllm)와 라우터를 각각 별도 프로세스로 띄운 뒤
+전략별로 수천 개의 동시 요청/스트림을 보내 다음을 측정합니다.
+
+- 라우터가 더한 지연 (클라이언트 지연 - 업스트림 처리 시간) p50/p99
+- 처리량, 스트림 TTFT 와 TTFT 오버헤드
+- 노드 간 부하 불균형 (max/mean)
+- 열린 스트림 하나당 라우터 메모리 (RSS 증가량)
+
+    python -m benchmarks.bench_router --requests 5000 --concurrency 500 --output router.json
+    python -m benchmarks.bench_router --compare router.json   # 이전 결과 대비 회귀 확인
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.mock_vllm import add_mock_arguments, mock_options, run_mock_servers
+
+STRATEGIES = [
+    "round_robin", "weighted_round_robin", "random", "least_connection", "real_time_metrics",
+    "prefix_affinity", "least_outstanding_requests", "power_of_two_choices", "token_weighted", "peak_ewma",
+]
+MODEL = "bench-model"
+HOST = "127.0.0.1"
+
+
+def run_router(config: Dict, port: int):
+    """
+    라우터 프로세스 진입점. app.main 의 FastAPI 앱을 벤치마크 설정으로 만든 의존성과 함께 실행합니다.
+    여러 프로세스가 SO_REUSEPORT 로 같은 포트를 나눠 받으며, shared_state 설정이 있으면 상태를 공유합니다.
+    """
+    import socket
+
+    import uvicorn
+
+    from app.main import app
+    from app.services.instrumentation import router_metrics
+    from app.services.load_balancer import LoadBalancer
+    from app.services.metrics_collector import MetricsCollector
+    from app.services.scheduler import AdmissionController
+    from app.services.shared_state import SharedState
+    from app.utils.config_loader import ConfigLoader
+    from app.utils.dependencies import init_dependencies
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(config, f)
+    config_loader = ConfigLoader(f.name)
+    os.unlink(f.name)
+
+    servers = {name: model["servers"] for name, model in config["models"].items()}
+    shared_state_config = config_loader.get_shared_state_config()
+    collector = MetricsCollector(
+        servers=servers,
+        update_interval=config_loader.get_metrics_update_interval(),
+        shared=SharedState(**shared_state_config) if shared_state_config.get("enabled") else None,
+        **config_loader.get_metrics_config(),
+    )
+    load_balancer = LoadBalancer(collector, config_loader)
+    admission = AdmissionController(collector, load_balancer.tenants, **config_loader.get_admission_config())
+    init_dependencies(load_balancer, None, admission)
+    router_metrics.bind_state(load_balancer, admission)
+
+    async def serve():
+        tasks = [
+            asyncio.create_task(collector.update_metrics()),
+            asyncio.create_task(load_balancer.health.run()),
+            asyncio.create_task(load_balancer.inflight.run_sync()),
+        ]
+        server = uvicorn.Server(
+            uvicorn.Config(
+                app, host=HOST, port=port, log_level="warning", access_log=False, lifespan="off", backlog=4096
+            )
+        )
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((HOST, port))
+        try:
+            await server.serve(sockets=[sock])
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    asyncio.run(serve())
+
+
+def _start(target, *args) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args, daemon=True)
+    process.start()
+    return process
+
+
+async def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not start within {timeout}s")
+                await asyncio.sleep(0.2)
+
+
+def _rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _payload(rng: random.Random, prompts: List[str], stream: bool, max_tokens: int) -> Dict:
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": rng.choice(prompts)},
+            {"role": "user", "content": " ".join(f"w{rng.randint(0, 5000)}" for _ in range(20))},
+        ],
+        "max_tokens": max_tokens,
+        "stream": stream,
+    }
+
+
+async def _send(client: httpx.AsyncClient, payload: Dict) -> Dict:
+    started_at = time.perf_counter()
+    if not payload["stream"]:
+        response = await client.post("/v1/chat/completions", json=payload)
+        latency = time.perf_counter() - started_at
+        if response.status_code != 200:
+            return {"ok": False, "status": response.status_code}
+        mock = response.json().get("mock", {})
+        return {
+            "ok": True, "latency": latency, "server": mock.get("server"),
+            "overhead": latency - mock.get("service_time", latency),
+        }
+
+    async with client.stream("POST", "/v1/chat/completions", json=payload) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return {"ok": False, "status": response.status_code}
+        buffer = b""
+        ttft = None
+        mock = {}
+        async for chunk in response.aiter_raw():
+            if ttft is None:
+                buffer += chunk
+                if b"\n\n" not in buffer:
+                    continue
+                ttft = time.perf_counter() - started_at
+                first = buffer.split(b"\n\n", 1)[0]
+                if first.startswith(b"data: "):
+                    mock = json.loads(first[len(b"data: "):]).get("mock", {})
+    latency = time.perf_counter() - started_at
+    ttft = latency if ttft is None else ttft
+    return {
+        "ok": True, "latency": latency, "ttft": ttft, "server": mock.get("server"),
+        "ttft_overhead": ttft - mock.get("first_chunk_time", ttft),
+    }
+
+
+async def drive(url: str, requests: int, concurrency: int, stream_ratio: float, max_tokens: int, seed: int):
+    """
+    concurrency 개의 작업자로 requests 개의 요청을 보내고 요청별 결과를 반환합니다.
+    """
+    rng = random.Random(seed)
+    prompts = [" ".join(f"s{p}-{i}" for i in range(200)) for p in range(8)]
+    payloads = [_payload(rng, prompts, rng.random() < stream_ratio, max_tokens) for _ in range(requests)]
+    results = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=300) as client:
+        queue = iter(payloads)
+
+        async def worker():
+            for payload in queue:
+                try:
+                    results.append(await _send(client, payload))
+                except httpx.HTTPError as e:
+                    results.append({"ok": False, "status": type(e).__name__})
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+    return results, elapsed
+
+
+def summarize(strategy: str, results: List[Dict], elapsed: float, servers: List[str]) -> Dict:
+    ok = [r for r in results if r["ok"]]
+    overhead = [r["overhead"] for r in ok if "overhead" in r]
+    ttft = [r["ttft"] for r in ok if "ttft" in r]
+    ttft_overhead = [r["ttft_overhead"] for r in ok if "ttft_overhead" in r]
+    per_server = {server: 0 for server in servers}
+    for r in ok:
+        if r.get("server") in per_server:
+            per_server[r["server"]] += 1
+    mean = sum(per_server.values()) / max(len(per_server), 1)
+
+    def ms(value):
+        return None if value is None else value * 1000
+
+    return {
+        "strategy": strategy,
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "throughput_rps": len(ok) / elapsed,
+        "latency_p50_ms": ms(_percentile([r["latency"] for r in ok], 0.5)),
+        "latency_p99_ms": ms(_percentile([r["latency"] for r in ok], 0.99)),
+        "router_added_p50_ms": ms(_percentile(overhead, 0.5)),
+        "router_added_p99_ms": ms(_percentile(overhead, 0.99)),
+        "ttft_p50_ms": ms(_percentile(ttft, 0.5)),
+        "ttft_p99_ms": ms(_percentile(ttft, 0.99)),
+        "ttft_overhead_p50_ms": ms(_percentile(ttft_overhead, 0.5)),
+        "ttft_overhead_p99_ms": ms(_percentile(ttft_overhead, 0.99)),
+        "load_imbalance": max(per_server.values()) / mean if mean else None,
+        "per_server": per_server,
+    }
+
+
+def _config(servers: List[str], strategy: str, args: argparse.Namespace, shared_path: Optional[str] = None) -> Dict:
+    config = {
+        "models": {MODEL: {"servers": servers, "strategy": strategy}},
+        "default_generate_server": servers[0],
+        "metrics_update_interval": args.metrics_interval,
+        "upstream": {
+            "max_connections": max(args.concurrency, args.streams) + 100,
+            "max_keepalive_connections": args.concurrency,
+        },
+        "admission": {"enabled": args.admission},
+    }
+    if shared_path is not None:
+        config["shared_state"] = {"enabled": True, "path": shared_path, "poll_interval": 0.05}
+    return config
+
+
+def _start_routers(config: Dict, port: int, workers: int) -> List[multiprocessing.Process]:
+    return [_start(run_router, config, port) for _ in range(workers)]
+
+
+def _stop(processes: List[multiprocessing.Process]):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+async def run_strategy(strategy: str, servers: List[str], port: int, args: argparse.Namespace) -> Dict:
+    shared_dir = tempfile.mkdtemp() if args.router_workers > 1 else None
+    shared_path = os.path.join(shared_dir, "llmstream.state") if shared_dir else None
+    routers = _start_routers(_config(servers, strategy, args, shared_path), port, args.router_workers)
+    try:
+        url = f"http://{HOST}:{port}"
+        await _wait_ready(f"{url}/metrics")
+        await drive(url, min(args.requests, 200), min(args.concurrency, 50), args.stream_ratio, args.max_tokens, -1)
+        results, elapsed = await drive(
+            url, args.requests, args.concurrency, args.stream_ratio, args.max_tokens, args.seed
+        )
+        return summarize(strategy, results, elapsed, servers)
+    finally:
+        _stop(routers)
+        if shared_dir:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+async def measure_stream_memory(servers: List[str], port: int, args: argparse.Namespace) -> Dict:
+    """
+    느리게 흐르는 스트림을 args.streams 개 열어 둔 상태에서 라우터 RSS 증가량을 측정합니다.
+    """
+    router = _start(run_router, _config(servers, "round_robin", args), port)
+    try:
+        url = f"http://{HOST}:{port}"
+        await _wait_ready(f"{url}/metrics")
+        await drive(url, 50, 10, 1.0, 2, -1)  # 연결/캐시 예열
+        baseline = _rss_bytes(router.pid)
+        opened = asyncio.Event()
+        release = asyncio.Event()
+        count = 0
+        limits = httpx.Limits(max_connections=args.streams, max_keepalive_connections=args.streams)
+
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=300) as client:
+            async def hold():
+                nonlocal count
+                payload = {"model": MODEL, "messages": [{"role": "user", "content": "hi"}], "max_tokens": 2, "stream": True}
+                async with client.stream("POST", "/v1/chat/completions", json=payload) as response:
+                    async for _ in response.aiter_raw():
+                        count += 1
+                        if count == args.streams:
+                            opened.set()
+                        await release.wait()
+                        break
+
+            tasks = [asyncio.create_task(hold()) for _ in range(args.streams)]
+            try:
+                await asyncio.wait_for(opened.wait(), timeout=120)
+                await asyncio.sleep(0.5)
+                peak = _rss_bytes(router.pid)
+            finally:
+                release.set()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return {
+            "streams": args.streams,
+            "rss_baseline_bytes": baseline,
+            "rss_peak_bytes": peak,
+            "bytes_per_stream": (peak - baseline) / args.streams,
+        }
+    finally:
+        router.terminate()
+        router.join()
+
+
+# 회귀 비교 대상 (값이 클수록 나쁜 지표 / 작을수록 나쁜 지표)
+HIGHER_IS_WORSE = ("router_added_p50_ms", "router_added_p99_ms", "ttft_overhead_p99_ms", "load_imbalance")
+LOWER_IS_WORSE = ("throughput_rps",)
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """
+    전략별 지표가 tolerance 비율 이상 나빠진 항목을 반환합니다.
+    """
+    previous = {row["strategy"]: row for row in baseline.get("results", [])}
+    regressions = []
+    for row in current["results"]:
+        old = previous.get(row["strategy"])
+        if old is None:
+            continue
+        for key in HIGHER_IS_WORSE + LOWER_IS_WORSE:
+            before, after = old.get(key), row.get(key)
+            if not before or after is None:
+                continue
+            change = (after - before) / abs(before)
+            if (key in HIGHER_IS_WORSE and change > tolerance) or (key in LOWER_IS_WORSE and -change > tolerance):
+                regressions.append(f"{row['strategy']}.{key}: {before:.3f} -> {after:.3f} ({change * 100:+.0f}%)")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=4, help="가짜 vLLM 서버 수")
+    parser.add_argument("--dead-servers", type=int, default=0, help="설정에는 있지만 실행하지 않는 서버 수 (연결 거부)")
+    parser.add_argument("--base-port", type=int, default=19000)
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--stream-ratio", type=float, default=0.5)
+    parser.add_argument("--max-tokens", type=int, default=16)
+    parser.add_argument("--streams", type=int, default=5000, help="메모리 측정 시 동시에 열어 둘 스트림 수 (0 이면 생략)")
+    parser.add_argument("--metrics-interval", type=float, default=1.0)
+    parser.add_argument("--admission", action="store_true", help="대기열/동시성 제어를 켠 상태로 측정")
+    parser.add_argument(
+        "--router-workers", type=int, default=1, help="라우터 워커 프로세스 수 (2 이상이면 shared_state 로 상태 공유)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 판단할 악화 비율")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    ports = [args.base_port + 1 + index for index in range(args.servers + args.dead_servers)]
+    servers = [f"http://{HOST}:{port}" for port in ports]
+    router_port = args.base_port
+
+    mocks = _start(run_mock_servers, ports[: args.servers], mock_options(args))
+    try:
+        for server in servers[: args.servers]:
+            await _wait_ready(f"{server}/health")
+        results = []
+        for strategy in args.strategies.split(","):
+            row = await run_strategy(strategy, servers, router_port, args)
+            results.append(row)
+            print(
+                f"{strategy:>27}: {row['throughput_rps']:7.1f} req/s  errors {row['errors']:4d}  "
+                f"router +{row['router_added_p50_ms'] or 0:.2f}/{row['router_added_p99_ms'] or 0:.2f} ms (p50/p99)  "
+                f"TTFT +{row['ttft_overhead_p50_ms'] or 0:.2f}/{row['ttft_overhead_p99_ms'] or 0:.2f} ms  "
+                f"imbalance {row['load_imbalance'] or 0:.2f}"
+            )
+    finally:
+        mocks.terminate()
+        mocks.join()
+
+    memory = None
+    if args.streams:
+        slow = {**mock_options(args), "tokens_per_second": 0.05}  # 측정 동안 스트림이 끝나지 않도록
+        mocks = _start(run_mock_servers, ports[: args.servers], slow)
+        try:
+            for server in servers[: args.servers]:
+                await _wait_ready(f"{server}/health")
+            memory = await measure_stream_memory(servers[: args.servers], router_port, args)
+            print(f"{memory['streams']} open streams: {memory['bytes_per_stream'] / 1024:.1f} KiB per stream")
+        finally:
+            mocks.terminate()
+            mocks.join()
+
+    report = {"benchmark": "router", "args": vars(args), "results": results, "stream_memory": memory}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if baseline is not None:
+        regressions = compare(baseline, report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+서버 선택 비용 마이크로벤치마크.
+
+백엔드 수별로, 스냅샷이 바뀌지 않는 동안의 선택 1회 비용(컴파일된 선택기)과 스냅샷이 바뀔 때의 컴파일 비용을
+이전 방식(요청마다 전략 문자열 비교, 서버 목록 재생성, 가중치 재계산 후 random.choices)과 비교합니다.
+
+    python -m benchmarks.bench_selection --backends 8 100 1000 5000 --output selection.json
+"""
+import argparse
+import json
+import random
+import time
+from types import MappingProxyType
+
+from app.services.selectors import COMPILED_STRATEGIES, SelectorCache
+
+MODEL = "bench-model"
+
+
+def build_snapshot(backends: int, seed: int = 0):
+    rng = random.Random(seed)
+    return MappingProxyType({
+        f"http://node{i}:8000": MappingProxyType({
+            "gpu_cache_usage": rng.random(),
+            "num_requests_waiting": rng.randint(0, 8),
+            "num_requests_running": rng.randint(0, 32),
+        })
+        for i in range(backends)
+    })
+
+
+class LegacySelection:
+    """
+    이전 LoadBalancer 의 선택 경로 (비교용).
+    """
+
+    def __init__(self):
+        self.server_weights = {}
+        self.round_robin_counters = {}
+
+    def select(self, strategy, model_name, servers_metrics):
+        if strategy == "real_time_metrics":
+            return self._real_time_metrics(servers_metrics, model_name)
+        elif strategy == "round_robin":
+            return self._round_robin(list(servers_metrics.keys()), model_name)
+        elif strategy == "least_connection":
+            return sorted(
+                servers_metrics.items(), key=lambda item: item[1].get("num_requests_running", float("inf"))
+            )[0][0]
+        elif strategy == "random":
+            return random.choice(list(servers_metrics.keys()))
+        raise ValueError(strategy)
+
+    def _real_time_metrics(self, servers_metrics, model_name):
+        weights = {}
+        for server, metrics in servers_metrics.items():
+            gpu_cache = metrics.get("gpu_cache_usage", 1.0)
+            num_waiting = metrics.get("num_requests_waiting", 0)
+            weights[server] = 1 / ((0.7 * gpu_cache) + (0.3 * num_waiting) + 1e-6)
+        total_weight = sum(weights.values())
+        for server in weights:
+            weights[server] /= total_weight
+        self.server_weights = weights
+        if model_name not in self.round_robin_counters:
+            self.round_robin_counters[model_name] = {server: 0 for server in self.server_weights}
+        servers = list(self.server_weights.keys())
+        selected = servers[random.choices(range(len(servers)), weights=list(self.server_weights.values()), k=1)[0]]
+        self.round_robin_counters[model_name][selected] += 1
+        return selected
+
+    def _round_robin(self, servers, model_name):
+        if model_name not in self.round_robin_counters:
+            self.round_robin_counters[model_name] = 0
+        server = servers[self.round_robin_counters[model_name] % len(servers)]
+        self.round_robin_counters[model_name] += 1
+        return server
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def measure(backends: int, iterations: int) -> dict:
+    snapshot = build_snapshot(backends)
+    # 이전 방식은 백엔드 수에 비례하므로 전체 측정 시간이 비슷하도록 반복 횟수를 줄인다
+    legacy_iterations = max(iterations * 8 // backends, 20)
+    compile_iterations = max(iterations // backends, 5)
+    results = {}
+    for strategy in COMPILED_STRATEGIES:
+        selectors = SelectorCache()
+        selectors.get(MODEL, strategy, snapshot)
+        compiled = _per_call_us(lambda: selectors.get(MODEL, strategy, snapshot).select(), iterations)
+        compile_cost = _per_call_us(
+            lambda: SelectorCache().get(MODEL, strategy, snapshot).select(), compile_iterations
+        )
+        result = {"compiled_us": compiled, "compile_us": compile_cost}
+        if strategy != "weighted_round_robin":
+            legacy = LegacySelection()
+            result["legacy_us"] = _per_call_us(lambda: legacy.select(strategy, MODEL, snapshot), legacy_iterations)
+        results[strategy] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", type=int, nargs="+", default=[8, 100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    results = {}
+    for backends in args.backends:
+        results[backends] = measure(backends, args.iterations)
+        for strategy, result in results[backends].items():
+            legacy = f"{result['legacy_us']:10.2f}" if "legacy_us" in result else f"{'-':>10}"
+            print(
+                f"{backends:6d} backends  {strategy:22s} compiled {result['compiled_us']:7.3f} us  "
+                f"legacy {legacy} us  compile {result['compile_us']:10.2f} us"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "selection", "args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+StreamRelay 벤치마크.
+
+1. 동시에 열린 스트림 수천 개를 유지할 때 스트림 하나당 메모리 (tracemalloc 기준)
+2. 청크 하나를 중계하는 CPU 비용: 원본 바이트 중계 vs 줄 단위 디코딩 후 재인코딩
+
+    python -m benchmarks.bench_stream_relay --streams 5000 --output relay.json
+
+라우터 프로세스 전체 기준(RSS)의 스트림당 메모리는 ``python -m benchmarks.bench_router --streams 5000`` 으로 측정합니다.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from app.services.stream_relay import StreamRelay
+
+CHUNK = b'data: {"id":"cmpl-1","object":"chat.completion.chunk","choices":[{"index":0,"delta":{"content":"tok"}}]}\n\n'
+
+
+class _Request:
+    """
+    연결 종료를 감시하는 ASGI receive 만 흉내 냅니다.
+    """
+
+    def __init__(self, closed: asyncio.Event):
+        self.closed = closed
+
+    async def receive(self):
+        await self.closed.wait()
+        return {"type": "http.disconnect"}
+
+
+async def _upstream(release: asyncio.Event):
+    yield CHUNK
+    await release.wait()
+    yield b"data: [DONE]\n\n"
+
+
+async def measure_memory(streams: int) -> dict:
+    relay = StreamRelay()
+    release = asyncio.Event()
+    closed = asyncio.Event()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    relays = [relay.relay(_upstream(release), _Request(closed)) for _ in range(streams)]
+    for stream in relays:
+        await stream.__anext__()
+    during = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    release.set()
+    for stream in relays:
+        async for _ in stream:
+            pass
+    return {"streams": streams, "bytes_per_stream": (during - before) / streams}
+
+
+async def _chunks(count: int):
+    for _ in range(count):
+        yield CHUNK
+
+
+async def _decode_lines(chunks):
+    # 이전 방식: 줄 단위로 나누고 디코딩한 뒤 다시 인코딩
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk.decode("utf-8")
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line:
+                yield (line + "\n").encode("utf-8")
+
+
+async def measure_cpu(chunks: int, flush_interval: float) -> dict:
+    """
+    업스트림이 클라이언트보다 빠른 경우(청크가 쌓이는 경우)의 청크당 비용과 클라이언트 전송(send) 횟수.
+    """
+    decoded_sends = 0
+    start = time.perf_counter()
+    async for _ in _decode_lines(_chunks(chunks)):
+        decoded_sends += 1
+    decoded = time.perf_counter() - start
+
+    relay = StreamRelay(flush_interval=flush_interval)
+    relayed_sends = 0
+    start = time.perf_counter()
+    async for _ in relay.relay(_chunks(chunks)):
+        relayed_sends += 1
+    relayed = time.perf_counter() - start
+    return {
+        "chunks": chunks,
+        "decode_lines_us_per_chunk": decoded / chunks * 1e6,
+        "decode_lines_sends": decoded_sends,
+        "relay_us_per_chunk": relayed / chunks * 1e6,
+        "relay_sends": relayed_sends,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=5000)
+    parser.add_argument("--chunks", type=int, default=200000)
+    parser.add_argument("--flush-interval", type=float, default=0.0)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    memory = await measure_memory(args.streams)
+    cpu = await measure_cpu(args.chunks, args.flush_interval)
+    print(f"{memory['streams']} open streams: {memory['bytes_per_stream'] / 1024:.1f} KiB per stream (relay state)")
+    print(
+        f"per chunk: relay {cpu['relay_us_per_chunk']:.2f} us ({cpu['relay_sends']} sends), "
+        f"line decoding {cpu['decode_lines_us_per_chunk']:.2f} us ({cpu['decode_lines_sends']} sends)"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "stream_relay", "args": vars(args), "memory": memory, "cpu": cpu}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,228 @@
+"""
+벤치마크용 가짜 vLLM 서버.
+
+OpenAI 호환 /v1/chat/completions, /v1/completions, /generate 와 /metrics, /health 를 흉내 내며
+지연 분포(로그 정규), 토큰 스트리밍 속도, 오류/지연 주입을 설정할 수 있습니다.
+응답에는 서버 이름과 서버 내부 처리 시간("mock" 필드)이 포함되어 라우터가 더한 지연을 계산할 수 있습니다.
+
+    python -m benchmarks.mock_vllm --port 9001 --count 4 --ttft-ms 50 --tokens-per-second 200
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks.vllm_metrics_payload import build_payload
+
+DEFAULT_MOCK_OPTIONS = {
+    "ttft_ms": 50.0,  # 첫 토큰까지 지연 중앙값
+    "ttft_sigma": 0.5,  # 로그 정규 분포의 sigma
+    "tokens_per_second": 200.0,  # 요청 하나의 토큰 생성 속도
+    "max_output_tokens": 32,  # 요청의 max_tokens 와 비교해 작은 값만큼 생성
+    "max_running": 64,  # 이보다 많으면 vLLM 처럼 대기(waiting)로 보고
+    "error_rate": 0.0,  # 503 으로 응답할 비율
+    "slow_rate": 0.0,  # 지연을 slow_factor 배로 늘릴 비율 (straggler)
+    "slow_factor": 10.0,
+}
+
+
+class MockVLLMServer:
+    """
+    가짜 vLLM 노드 하나. 진행 중 요청 수를 /metrics 의 running/waiting/KV 캐시 사용률로 보고합니다.
+    """
+
+    def __init__(self, name: str, seed: int = 0, **options):
+        self.name = name
+        self.options = {**DEFAULT_MOCK_OPTIONS, **options}
+        self.rng = random.Random(seed)
+        self.running = 0
+        self.served = 0
+        self.errors = 0
+        self.app = Starlette(
+            routes=[
+                Route("/v1/chat/completions", self.chat_completions, methods=["POST"]),
+                Route("/v1/completions", self.completions, methods=["POST"]),
+                Route("/generate", self.generate, methods=["POST"]),
+                Route("/metrics", self.metrics, methods=["GET"]),
+                Route("/health", self.health, methods=["GET"]),
+                Route("/stats", self.stats, methods=["GET"]),
+            ]
+        )
+
+    def _ttft(self) -> float:
+        options = self.options
+        ttft = options["ttft_ms"] / 1000 * math.exp(options["ttft_sigma"] * self.rng.gauss(0, 1))
+        if options["slow_rate"] and self.rng.random() < options["slow_rate"]:
+            ttft *= options["slow_factor"]
+        return ttft
+
+    def _tokens(self, body: Dict) -> int:
+        return max(1, min(int(body.get("max_tokens") or 16), self.options["max_output_tokens"]))
+
+    def _inject_error(self) -> Optional[Response]:
+        if self.options["error_rate"] and self.rng.random() < self.options["error_rate"]:
+            self.errors += 1
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        return None
+
+    async def chat_completions(self, request: Request) -> Response:
+        return await self._complete(request, chat=True)
+
+    async def completions(self, request: Request) -> Response:
+        return await self._complete(request, chat=False)
+
+    async def _complete(self, request: Request, chat: bool) -> Response:
+        received_at = time.perf_counter()
+        body = await request.json()
+        error = self._inject_error()
+        if error is not None:
+            return error
+        tokens = self._tokens(body)
+        ttft = self._ttft()
+        if body.get("stream"):
+            return StreamingResponse(
+                self._stream(body, chat, tokens, ttft, received_at), media_type="text/event-stream"
+            )
+
+        self.running += 1
+        try:
+            await asyncio.sleep(ttft + tokens / self.options["tokens_per_second"])
+        finally:
+            self.running -= 1
+        self.served += 1
+        text = " ".join("tok" for _ in range(tokens))
+        choice = (
+            {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "length"}
+            if chat else {"index": 0, "text": text, "logprobs": None, "finish_reason": "length"}
+        )
+        return JSONResponse(
+            {
+                "id": f"cmpl-{self.served}",
+                "object": "chat.completion" if chat else "text_completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [choice],
+                "usage": {"prompt_tokens": 16, "completion_tokens": tokens, "total_tokens": 16 + tokens},
+                "mock": {"server": self.name, "service_time": time.perf_counter() - received_at},
+            }
+        )
+
+    async def _stream(self, body: Dict, chat: bool, tokens: int, ttft: float, received_at: float):
+        self.running += 1
+        try:
+            await asyncio.sleep(ttft)
+            interval = 1.0 / self.options["tokens_per_second"]
+            base = {
+                "id": f"cmpl-{self.served}",
+                "object": "chat.completion.chunk" if chat else "text_completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+            }
+            for index in range(tokens):
+                choice = {"index": 0, "delta": {"content": "tok "}} if chat else {"index": 0, "text": "tok "}
+                choice["finish_reason"] = "length" if index == tokens - 1 else None
+                chunk = {**base, "choices": [choice]}
+                if index == 0:
+                    chunk["mock"] = {"server": self.name, "first_chunk_time": time.perf_counter() - received_at}
+                yield b"data: " + json.dumps(chunk, separators=(",", ":")).encode() + b"\n\n"
+                if index < tokens - 1:
+                    await asyncio.sleep(interval)
+            yield b"data: [DONE]\n\n"
+            self.served += 1
+        finally:
+            self.running -= 1
+
+    async def generate(self, request: Request) -> Response:
+        received_at = time.perf_counter()
+        body = await request.json()
+        error = self._inject_error()
+        if error is not None:
+            return error
+        tokens = self._tokens(body)
+        await asyncio.sleep(self._ttft() + tokens / self.options["tokens_per_second"])
+        self.served += 1
+        return JSONResponse(
+            {
+                "text": [" ".join("tok" for _ in range(tokens))],
+                "mock": {"server": self.name, "service_time": time.perf_counter() - received_at},
+            }
+        )
+
+    async def metrics(self, request: Request) -> Response:
+        max_running = self.options["max_running"]
+        running = min(self.running, max_running)
+        return PlainTextResponse(
+            build_payload(
+                running=running,
+                waiting=max(self.running - max_running, 0),
+                cache_usage=min(self.running / max_running, 1.0),
+                seed=self.served,
+            )
+        )
+
+    async def health(self, request: Request) -> Response:
+        return Response(status_code=200)
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse({"server": self.name, "served": self.served, "errors": self.errors, "running": self.running})
+
+
+async def serve_mock_servers(ports: List[int], host: str = "127.0.0.1", **options):
+    """
+    여러 가짜 서버를 한 이벤트 루프에서 실행합니다.
+    """
+    servers = []
+    for index, port in enumerate(ports):
+        mock = MockVLLMServer(f"http://{host}:{port}", seed=index, **options)
+        config = uvicorn.Config(
+            mock.app, host=host, port=port, log_level="warning", access_log=False, lifespan="off", backlog=4096
+        )
+        servers.append(uvicorn.Server(config))
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def run_mock_servers(ports: List[int], options: Dict):
+    """
+    multiprocessing 진입점.
+    """
+    asyncio.run(serve_mock_servers(ports, **options))
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--ttft-ms", type=float, default=DEFAULT_MOCK_OPTIONS["ttft_ms"])
+    parser.add_argument("--ttft-sigma", type=float, default=DEFAULT_MOCK_OPTIONS["ttft_sigma"])
+    parser.add_argument("--tokens-per-second", type=float, default=DEFAULT_MOCK_OPTIONS["tokens_per_second"])
+    parser.add_argument("--max-output-tokens", type=int, default=DEFAULT_MOCK_OPTIONS["max_output_tokens"])
+    parser.add_argument("--max-running", type=int, default=DEFAULT_MOCK_OPTIONS["max_running"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_MOCK_OPTIONS["error_rate"])
+    parser.add_argument("--slow-rate", type=float, default=DEFAULT_MOCK_OPTIONS["slow_rate"])
+    parser.add_argument("--slow-factor", type=float, default=DEFAULT_MOCK_OPTIONS["slow_factor"])
+
+
+def mock_options(args: argparse.Namespace) -> Dict:
+    return {key: getattr(args, key) for key in DEFAULT_MOCK_OPTIONS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001, help="첫 서버 포트")
+    parser.add_argument("--count", type=int, default=4, help="서버 수 (연속된 포트 사용)")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    ports = [args.port + index for index in range(args.count)]
+    print(f"Serving {args.count} mock vLLM servers on {args.host}:{ports[0]}-{ports[-1]}")
+    asyncio.run(serve_mock_servers(ports, host=args.host, **mock_options(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+실제 vLLM /metrics 응답과 같은 구조의 Prometheus 텍스트를 생성합니다.
+
+vLLM 0.6.x 가 노출하는 메트릭 이름, 라벨, 버킷 경계를 따르며,
+``model_names`` 와 ``extra_label_sets`` 로 응답 크기를 키울 수 있습니다.
+"""
+import random
+from typing import List, Optional
+
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.02, 0.04, 0.06, 0.08, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0]
+REQUEST_LATENCY_BUCKETS = [0.3, 0.5, 0.8, 1.0, 1.5, 2.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+TOKEN_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+PROCESS_PREAMBLE = """# HELP python_gc_objects_collected_total Objects collected during gc
+# TYPE python_gc_objects_collected_total counter
+python_gc_objects_collected_total{generation="0"} 18934.0
+python_gc_objects_collected_total{generation="1"} 5401.0
+python_gc_objects_collected_total{generation="2"} 1123.0
+# HELP python_gc_collections_total Number of times this generation was collected
+# TYPE python_gc_collections_total counter
+python_gc_collections_total{generation="0"} 1530.0
+python_gc_collections_total{generation="1"} 139.0
+python_gc_collections_total{generation="2"} 9.0
+# HELP python_info Python platform information
+# TYPE python_info gauge
+python_info{implementation="CPython",major="3",minor="10",patchlevel="12",version="3.10.12"} 1.0
+# HELP process_virtual_memory_bytes Virtual memory size in bytes.
+# TYPE process_virtual_memory_bytes gauge
+process_virtual_memory_bytes 5.4125371392e+010
+# HELP process_resident_memory_bytes Resident memory size in bytes.
+# TYPE process_resident_memory_bytes gauge
+process_resident_memory_bytes 4.513865728e+09
+# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total 18231.54
+"""
+
+
+def _histogram(lines: List[str], name: str, help_text: str, buckets, label_sets, rng, scale: float):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels in label_sets:
+        count = 0
+        total = 0.0
+        for le in buckets:
+            count += rng.randint(0, 50)
+            total += count * le * scale
+            lines.append(f'{name}_bucket{{{labels},le="{float(le)}"}} {float(count)}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {float(count)}')
+        lines.append(f"{name}_count{{{labels}}} {float(count)}")
+        lines.append(f"{name}_sum{{{labels}}} {total}")
+
+
+def build_payload(
+    model_names: Optional[List[str]] = None,
+    extra_label_sets: int = 0,
+    seed: int = 0,
+    running: int = 3,
+    waiting: int = 1,
+    cache_usage: float = 0.42,
+) -> str:
+    """
+    vLLM /metrics 응답 본문을 생성합니다.
+
+    :param model_names: model_name 라벨 값 목록 (라벨 집합 수만큼 응답이 커짐)
+    :param extra_label_sets: 라벨 집합을 추가로 복제할 개수 (대용량 응답 재현용)
+    """
+    rng = random.Random(seed)
+    model_names = model_names or ["meta-llama/Llama-3.1-8B-Instruct"]
+    label_sets = [f'model_name="{name}"' for name in model_names]
+    label_sets += [f'model_name="{model_names[0]}",engine="{i}"' for i in range(extra_label_sets)]
+
+    lines = [PROCESS_PREAMBLE.rstrip("\n")]
+    gauges = [
+        ("vllm:num_requests_running", "Number of requests currently running on GPU.", running),
+        ("vllm:num_requests_swapped", "Number of requests swapped to CPU.", 0),
+        ("vllm:num_requests_waiting", "Number of requests waiting to be processed.", waiting),
+        ("vllm:gpu_cache_usage_perc", "GPU KV-cache usage. 1 means 100 percent usage.", cache_usage),
+        ("vllm:cpu_cache_usage_perc", "CPU KV-cache usage. 1 means 100 percent usage.", 0.0),
+        ("vllm:avg_prompt_throughput_toks_per_s", "Average prefill throughput in tokens/s.", 812.3),
+        ("vllm:avg_generation_throughput_toks_per_s", "Average generation throughput in tokens/s.", 96.1),
+    ]
+    for name, help_text, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels in label_sets:
+            lines.append(f"{name}{{{labels}}} {float(value)}")
+
+    counters = [
+        ("vllm:num_preemptions_total", "Cumulative number of preemption from the engine.", 12),
+        ("vllm:prompt_tokens_total", "Number of prefill tokens processed.", 1283411),
+        ("vllm:generation_tokens_total", "Number of generation tokens processed.", 384112),
+    ]
+    for name, help_text, value in counters:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels in label_sets:
+            lines.append(f"{name}{{{labels}}} {float(value)}")
+
+    _histogram(lines, "vllm:time_to_first_token_seconds", "Histogram of time to first token in seconds.",
+               LATENCY_BUCKETS, label_sets, rng, 0.5)
+    _histogram(lines, "vllm:time_per_output_token_seconds", "Histogram of time per output token in seconds.",
+               LATENCY_BUCKETS[:12], label_sets, rng, 0.5)
+    for name in ("e2e_request_latency", "request_queue_time", "request_inference_time",
+                 "request_prefill_time", "request_decode_time"):
+        _histogram(lines, f"vllm:{name}_seconds", f"Histogram of {name.replace('_', ' ')} in seconds.",
+                   REQUEST_LATENCY_BUCKETS, label_sets, rng, 0.5)
+    for name in ("request_prompt_tokens", "request_generation_tokens", "request_max_num_generation_tokens"):
+        _histogram(lines, f"vllm:{name}", f"Number of {name.replace('_', ' ')}.", TOKEN_BUCKETS, label_sets, rng, 0.5)
+    for name in ("request_params_n", "request_params_best_of"):
+        _histogram(lines, f"vllm:{name}", f"Histogram of the {name[15:]} request parameter.", [1, 2, 5, 10, 20],
+                   label_sets, rng, 0.5)
+
+    lines.append("# HELP vllm:request_success_total Count of successfully processed requests.")
+    lines.append("# TYPE vllm:request_success_total counter")
+    for labels in label_sets:
+        for reason in ("stop", "length", "abort"):
+            lines.append(f'vllm:request_success_total{{finished_reason="{reason}",{labels}}} {float(rng.randint(0, 9999))}')
+    return "\n".join(lines) + "\n"
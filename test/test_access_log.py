@@ -0,0 +1,83 @@
+import asyncio
+import hashlib
+import json
+from types import MappingProxyType
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import chat
+from app.services.access_log import AccessLog, AccessLogMiddleware, AccessRecord
+from app.services.load_balancer import LoadBalancer
+from app.services.logger import Logger
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+
+SERVER = "http://node1:8000"
+
+
+def test_records_are_sampled_and_dropped_when_the_queue_is_full():
+    async def run():
+        access_log = AccessLog(sample_rate=0.0, queue_size=1)
+        access_log.finish(AccessRecord("POST", "/v1/completions"), 200)
+        access_log.finish(AccessRecord("POST", "/v1/completions"), 502)  # 오류는 항상 기록
+        access_log.finish(AccessRecord("POST", "/v1/completions"), 503)
+        assert access_log.stats == {"logged": 0, "sampled_out": 1, "dropped": 1, "write_errors": 0}
+        assert access_log.queue.get_nowait().status == 502
+
+    asyncio.run(run())
+
+
+def test_requests_are_logged_off_the_event_loop_with_fixed_fields(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if json.loads(request.content).get("stream"):
+            async def events():
+                yield b'data: {"choices": [{"delta": {"content": "a"}}]}\n\n'
+                yield b'data: {"choices": [{"delta": {"content": "b"}}]}\n\ndata: [DONE]\n\n'
+
+            return httpx.Response(200, content=events())
+        return httpx.Response(200, json={"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 3}})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"models": {"m": {"servers": [SERVER]}}}))
+        load_balancer = LoadBalancer(MetricsCollector({"m": [SERVER]}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        load_balancer.metrics_collector.metrics = {"m": MappingProxyType({SERVER: MappingProxyType({})})}
+        init_dependencies(load_balancer)
+        access_log = AccessLog(path=str(tmp_path / "access.jsonl"), prompt="hash")
+        writer = asyncio.create_task(access_log.run())
+        app = FastAPI()
+        app.add_middleware(AccessLogMiddleware, access_log=access_log)
+        app.include_router(chat.router, prefix="/v1")
+
+        messages = [{"role": "user", "content": "secret prompt"}]
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            response = await client.post("/v1/chat/completions", json={"model": "m", "messages": messages})
+            assert response.status_code == 200
+            response = await client.post(
+                "/v1/chat/completions", json={"model": "m", "messages": messages, "stream": True}
+            )
+            assert response.status_code == 200
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        await load_balancer.aclose()
+
+        with open(tmp_path / "access.jsonl") as f:
+            plain, streamed = map(json.loads, f)
+        assert plain["model"] == "m" and plain["server"] == SERVER and plain["status"] == 200
+        assert (plain["prompt_tokens"], plain["completion_tokens"]) == (7, 3)
+        assert plain["bytes"] > 0 and plain["latency_ms"] > 0
+        assert plain["prompt_sha256"] == hashlib.sha256(b"secret prompt").hexdigest()
+        assert "secret prompt" not in json.dumps(plain)
+        assert streamed["stream"] and streamed["completion_tokens"] == 2  # usage 청크가 없으면 이벤트 수
+        assert access_log.stats["logged"] == 2
+
+    asyncio.run(run())
+
+
+def test_error_log_describes_plain_dict_bodies_without_the_prompt():
+    description = Logger._describe({"model": "m", "prompt": "secret prompt"})
+    assert description == "model=m stream=False"
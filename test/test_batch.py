@@ -0,0 +1,227 @@
+import asyncio
+import json
+from types import MappingProxyType
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import batches
+from app.services.batch import AdaptiveConcurrency, BatchJob, BatchManager, BatchRunner
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+
+SERVERS = ["http://node1:8000", "http://node2:8000"]
+
+
+def _load_balancer(tmp_path, handler) -> LoadBalancer:
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"models": {"m": {"servers": SERVERS}}}))
+    load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+    load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+    load_balancer.metrics_collector.metrics = {
+        "m": MappingProxyType({server: MappingProxyType({"num_requests_waiting": 0}) for server in SERVERS})
+    }
+    return load_balancer
+
+
+def _job(tmp_path, lines) -> BatchJob:
+    (tmp_path / "input.jsonl").write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return BatchJob(
+        "batch_test", str(tmp_path / "input.jsonl"), str(tmp_path / "output.jsonl"), str(tmp_path / "state.json")
+    )
+
+
+def _results(tmp_path):
+    with open(tmp_path / "output.jsonl") as f:
+        return {record["custom_id"]: record for record in map(json.loads, f)}
+
+
+def test_concurrency_grows_on_idle_servers_and_halves_under_queueing():
+    concurrency = AdaptiveConcurrency(initial=4, minimum=1, maximum=16, target_waiting=1)
+    for _ in range(4):
+        assert concurrency.acquire(["a"]) == "a"
+    assert concurrency.acquire(["a"]) is None
+
+    concurrency.adjust({"a": {"num_requests_waiting": 0}})
+    assert concurrency.limit("a") == 8  # 한도를 다 쓰는 유휴 서버는 두 배
+    concurrency.adjust({"a": {"num_requests_waiting": 5}})
+    assert concurrency.limit("a") == 4
+    concurrency.adjust({"a": {"num_requests_waiting": 0}}, pressure=True)  # 대화형 요청이 대기 중
+    assert concurrency.limit("a") == 2
+    concurrency.back_off("a")
+    concurrency.back_off("a")
+    assert concurrency.limit("a") == 1
+
+
+def test_lines_are_spread_across_the_fleet_with_retries_and_per_line_errors(tmp_path):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        seen.append((request.url.host, body["messages"][0]["content"]))
+        if body["messages"][0]["content"] == "bad":
+            return httpx.Response(400, json={"error": "bad request"})
+        if body["messages"][0]["content"] == "flaky" and request.url.host == "node1":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"choices": [{"message": {"content": body["messages"][0]["content"]}}]})
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler)
+        lines = [
+            {"custom_id": f"req-{i}", "method": "POST", "url": "/v1/chat/completions",
+             "body": {"model": "m", "messages": [{"role": "user", "content": f"q{i}"}]}}
+            for i in range(20)
+        ]
+        lines.append({"custom_id": "bad", "body": {"model": "m", "messages": [{"role": "user", "content": "bad"}]}})
+        lines.append({"custom_id": "unknown", "body": {"model": "other", "messages": []}})
+        lines.append({"model": "m", "messages": [{"role": "user", "content": "flaky"}]})  # 요청 본문만 있는 줄
+        job = _job(tmp_path, lines)
+        await BatchRunner(load_balancer, retry_backoff=0.0).run(job)
+        await load_balancer.aclose()
+
+        results = _results(tmp_path)
+        assert job.status == "completed" and job.counts == {"completed": 21, "failed": 2}
+        assert results["req-7"]["response"]["body"]["choices"][0]["message"]["content"] == "q7"
+        assert results["bad"]["response"]["status_code"] == 400 and results["bad"]["error"]
+        assert results["unknown"]["error"]["code"] == "model_not_found"
+        assert results["22"]["response"]["status_code"] == 200  # custom_id 가 없으면 줄 번호
+        assert {host for host, _ in seen} == {"node1", "node2"}
+
+    asyncio.run(run())
+
+
+def test_an_interrupted_job_resumes_without_duplicating_results(tmp_path):
+    stuck = []
+
+    async def hang(request: httpx.Request) -> httpx.Response:
+        if json.loads(request.content)["messages"][0]["content"] == "q3":
+            stuck.append(request)
+            await asyncio.Event().wait()
+        return httpx.Response(200, json={"choices": []})
+
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content)["messages"][0]["content"])
+        return httpx.Response(200, json={"choices": []})
+
+    lines = [{"custom_id": f"req-{i}", "body": {"model": "m", "messages": [{"content": f"q{i}"}]}} for i in range(8)]
+
+    async def interrupt():
+        load_balancer = _load_balancer(tmp_path, hang)
+        job = _job(tmp_path, lines)
+        task = asyncio.create_task(BatchRunner(load_balancer, checkpoint_interval=60).run(job))
+        while job.in_progress != 1 or len(job._results) != 7:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await load_balancer.aclose()
+        assert job.status == "in_progress" and job.line == 3
+        with open(job.output_path, "a") as f:
+            f.write('{"custom_id": "partial"')  # 체크포인트 이후에 쓰다 만 결과
+
+    async def resume():
+        load_balancer = _load_balancer(tmp_path, handler)
+        job = BatchJob.load(str(tmp_path / "state.json"))
+        await BatchRunner(load_balancer).run(job)
+        await load_balancer.aclose()
+        assert job.status == "completed" and job.counts["completed"] == 8
+
+    asyncio.run(interrupt())
+    asyncio.run(resume())
+    assert sent == ["q3"]
+    assert sorted(_results(tmp_path)) == sorted(f"req-{i}" for i in range(8))
+
+
+def test_batches_endpoint_streams_the_upload_and_serves_results(tmp_path):
+    authorizations = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        authorizations.append(request.headers.get("authorization"))
+        return httpx.Response(200, json={"choices": [{"text": "ok"}]})
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler)
+        manager = BatchManager(BatchRunner(load_balancer), str(tmp_path / "batches"))
+        init_dependencies(load_balancer, batches=manager)
+        app = FastAPI()
+        app.include_router(batches.router, prefix="/v1")
+
+        upload = b"".join(json.dumps({"model": "m", "prompt": f"p{i}"}).encode() + b"\n" for i in range(5))
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            response = await client.post(
+                "/v1/batches", params={"endpoint": "/v1/completions"}, content=upload,
+                headers={"Authorization": "Bearer key-1"},
+            )
+            batch = response.json()
+            assert response.status_code == 200 and batch["endpoint"] == "/v1/completions"
+            job = manager.get(batch["id"])
+            with open(job.state_path) as f:
+                assert "key-1" not in f.read()  # 인증 정보는 상태 파일에 남기지 않음
+            await manager._tasks[batch["id"]]
+            assert authorizations == ["Bearer key-1"] * 5
+            assert not (tmp_path / "batches" / f"{batch['id']}.credentials").exists()
+
+            owner = {"Authorization": "Bearer key-1"}
+            batch = (await client.get(f"/v1/batches/{batch['id']}", headers=owner)).json()
+            assert batch["status"] == "completed" and batch["request_counts"]["completed"] == 5
+            output = (await client.get(f"/v1/batches/{batch['id']}/output", headers=owner)).text
+            assert sorted(json.loads(line)["custom_id"] for line in output.splitlines()) == list("01234")
+            assert (await client.get("/v1/batches/missing")).status_code == 404
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_jobs_are_only_visible_to_the_tenant_that_created_them(tmp_path):
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200, json={"choices": []})
+
+        load_balancer = _load_balancer(tmp_path, handler)
+        manager = BatchManager(BatchRunner(load_balancer), str(tmp_path / "batches"))
+        init_dependencies(load_balancer, batches=manager)
+        app = FastAPI()
+        app.include_router(batches.router, prefix="/v1")
+        owner, other = {"Authorization": "Bearer key-1"}, {"Authorization": "Bearer key-2"}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            upload = json.dumps({"model": "m", "prompt": "p"}).encode() + b"\n"
+            batch_id = (await client.post("/v1/batches", content=upload, headers=owner)).json()["id"]
+            await manager.get(batch_id).checkpoint()  # 출력 파일 생성
+
+            assert (await client.get("/v1/batches", headers=other)).json()["data"] == []
+            for method, path in (
+                ("GET", f"/v1/batches/{batch_id}"), ("GET", f"/v1/batches/{batch_id}/output"),
+                ("POST", f"/v1/batches/{batch_id}/cancel"),
+            ):
+                assert (await client.request(method, path, headers=other)).status_code == 404
+                assert (await client.request(method, path)).status_code == 404
+            assert manager.get(batch_id).status == "in_progress"
+
+            assert [job["id"] for job in (await client.get("/v1/batches", headers=owner)).json()["data"]] == [batch_id]
+            response = await client.post(f"/v1/batches/{batch_id}/cancel", headers=owner)
+            assert response.status_code == 200 and response.json()["status"] == "cancelled"
+        release.set()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_lines_fail_instead_of_waiting_forever_without_servers(tmp_path):
+    async def run():
+        load_balancer = _load_balancer(tmp_path, lambda request: httpx.Response(200, json={}))
+        load_balancer.metrics_collector.metrics = {"m": MappingProxyType({})}  # 아직 수집된 서버가 없음
+        job = _job(tmp_path, [{"model": "m", "messages": []} for _ in range(3)])
+        await asyncio.wait_for(BatchRunner(load_balancer, no_server_timeout=0.05, adjust_interval=0.01).run(job), 5)
+        await load_balancer.aclose()
+        assert job.status == "completed" and job.counts == {"completed": 0, "failed": 3}
+        assert {record["error"]["code"] for record in _results(tmp_path).values()} == {"no_servers"}
+
+    asyncio.run(run())
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from types import MappingProxyType
+
+import httpx
+
+from app.services.fanout import FanOut
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+
+SERVERS = ["http://node1:8000", "http://node2:8000", "http://node3:8000"]
+
+
+def _load_balancer(tmp_path, handler) -> LoadBalancer:
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"models": {"m": {"servers": SERVERS}}, "fanout": {"enabled": True}}))
+    load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+    load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+    load_balancer.metrics_collector.metrics = {
+        "m": MappingProxyType({server: MappingProxyType({}) for server in SERVERS})
+    }
+    return load_balancer
+
+
+def test_requests_are_split_evenly_with_distinct_seeds():
+    fanout = FanOut(enabled=True, max_splits=4)
+    assert fanout.splits({"n": 16}) == 4
+    assert fanout.splits({"n": 1}) == 1
+    assert fanout.splits({"n": 4, "best_of": 8}) == 1
+    assert FanOut().splits({"n": 16}) == 1  # 기본값은 꺼짐
+
+    bodies = fanout.sub_requests({"model": "m", "n": 7, "seed": 100}, 3)
+    assert [(body["n"], body["seed"]) for body in bodies] == [(3, 100), (2, 103), (2, 105)]
+
+    merged = fanout.merge_responses([
+        {"id": "a", "choices": [{"index": 1, "text": "y"}, {"index": 0, "text": "x"}],
+         "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}},
+        {"id": "b", "choices": [{"index": 0, "text": "z"}],
+         "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}},
+    ])
+    assert merged["id"] == "a"
+    assert [(c["index"], c["text"]) for c in merged["choices"]] == [(0, "x"), (1, "y"), (2, "z")]
+    assert merged["usage"] == {"prompt_tokens": 10, "completion_tokens": 3, "total_tokens": 13}
+
+
+def test_non_streaming_requests_fan_out_across_servers(tmp_path):
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        received[request.url.host] = body["n"]
+        choices = [{"index": i, "text": f"{request.url.host}-{i}"} for i in range(body["n"])]
+        usage = {"prompt_tokens": 4, "completion_tokens": body["n"], "total_tokens": 4 + body["n"]}
+        return httpx.Response(200, json={"id": request.url.host, "choices": choices, "usage": usage})
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler)
+        payload = {"model": "m", "prompt": "hi", "n": 8}
+        response = await load_balancer.forward_fanout("m", "/v1/completions", payload, {}, parts=8)
+        await load_balancer.aclose()
+
+        assert sorted(received.values()) == [2, 3, 3]
+        assert [choice["index"] for choice in response["choices"]] == list(range(8))
+        assert response["usage"] == {"prompt_tokens": 12, "completion_tokens": 8, "total_tokens": 20}
+        assert load_balancer.fanout.stats == {"requests": 1, "sub_requests": 3}
+
+    asyncio.run(run())
+
+
+def test_sub_streams_are_interleaved_into_one_sse_stream(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        host = request.url.host
+
+        async def events():
+            for token in range(3):
+                for index in range(body["n"]):
+                    chunk = {"id": host, "choices": [{"index": index, "text": f"{token}", "finish_reason": None}]}
+                    yield b"data: " + json.dumps(chunk).encode() + b"\n\n"
+                    await asyncio.sleep(0)
+            usage = {"prompt_tokens": 4, "completion_tokens": 3 * body["n"]}
+            yield b"data: " + json.dumps({"id": host, "choices": [], "usage": usage}).encode() + b"\n\ndata: [DONE]\n\n"
+
+        return httpx.Response(200, content=events())
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler)
+        payload = {"model": "m", "prompt": "hi", "n": 4, "stream": True}
+        stream = await load_balancer.forward_fanout("m", "/v1/completions", payload, {}, stream=True, parts=4)
+        raw = b"".join([chunk async for chunk in stream])
+        await load_balancer.aclose()
+
+        events = [event[len(b"data: "):] for event in raw.split(b"\n\n") if event]
+        assert events[-1] == b"[DONE]" and events.count(b"[DONE]") == 1
+        chunks = [json.loads(event) for event in events[:-1]]
+        assert len({chunk["id"] for chunk in chunks}) == 1
+        indexes = [choice["index"] for chunk in chunks for choice in chunk["choices"]]
+        assert sorted(set(indexes)) == [0, 1, 2, 3] and len(indexes) == 12
+        assert chunks[-1]["usage"] == {"prompt_tokens": 12, "completion_tokens": 12}
+        assert all(load_balancer.inflight.get_streams(server) == 0 for server in SERVERS)
+
+    asyncio.run(run())
@@ -0,0 +1,102 @@
+import asyncio
+from types import MappingProxyType
+
+import httpx
+
+from app.services.health import CLOSED, HALF_OPEN, OPEN, PROBING, HealthChecker
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+
+SERVERS = ["http://node1:8000", "http://node2:8000", "http://node3:8000"]
+
+
+def _snapshot():
+    return MappingProxyType({server: MappingProxyType({"num_requests_running": 0}) for server in SERVERS})
+
+
+def test_breaker_ejects_after_consecutive_failures_and_recovers_through_half_open():
+    health = HealthChecker(lambda: SERVERS, consecutive_failures=3, base_ejection_time=0, slow_start=60)
+    snapshot = _snapshot()
+    for _ in range(2):
+        health.record_failure(SERVERS[0])
+    health.record_success(SERVERS[0])
+    health.record_failure(SERVERS[0])
+    assert health.state(SERVERS[0]) == CLOSED  # 성공이 연속 실패를 초기화
+
+    for _ in range(2):
+        health.record_failure(SERVERS[0])
+    assert health.state(SERVERS[0]) == OPEN
+    assert list(health.filter("m", snapshot)) == SERVERS[1:]
+
+    health.tick()
+    assert health.state(SERVERS[0]) == HALF_OPEN
+    assert SERVERS[0] in health.filter("m", snapshot)
+    health.on_selected(SERVERS[0])  # 시험 요청은 하나만
+    assert health.state(SERVERS[0]) == PROBING and SERVERS[0] not in health.filter("m", snapshot)
+
+    health.record_failure(SERVERS[0])
+    assert health.state(SERVERS[0]) == OPEN
+    health.tick()
+    health.on_selected(SERVERS[0])
+    health.record_success(SERVERS[0])
+    assert health.state(SERVERS[0]) == CLOSED
+    assert health.weight(SERVERS[0]) < 0.2  # slow-start 시작
+
+
+def test_all_servers_ejected_routes_to_everyone():
+    health = HealthChecker(lambda: SERVERS, consecutive_failures=1)
+    snapshot = _snapshot()
+    for server in SERVERS:
+        health.record_failure(server)
+    assert health.filter("m", snapshot) is snapshot
+
+
+def test_dead_node_is_removed_from_round_robin_and_probed_back(tmp_path):
+    down = {SERVERS[1]}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        server = f"http://{request.url.host}:{request.url.port}"
+        if server in down:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(
+            '{"models": {"m": {"servers": %s, "strategy": "round_robin"}},'
+            ' "health": {"consecutive_failures": 2, "base_ejection_time": 0, "slow_start": 0}}'
+            % str(SERVERS).replace("'", '"')
+        )
+        load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+        transport = httpx.MockTransport(handler)
+        load_balancer.upstream_client = UpstreamClient(transport=transport)
+        load_balancer.health.transport = transport
+        load_balancer.metrics_collector.metrics = {"m": _snapshot()}
+
+        failures = 0
+        for _ in range(12):
+            server = await load_balancer.select_server("m")
+            try:
+                await load_balancer.forward_request(server, "/v1/completions", {}, {})
+            except RuntimeError:
+                failures += 1
+        assert failures == 2
+        assert load_balancer.health.state(SERVERS[1]) == OPEN
+
+        # 차단 시간이 지나도 능동 헬스 체크가 실패하면 다시 차단
+        load_balancer.health.tick()
+        await load_balancer.health.probe(SERVERS[1])
+        assert load_balancer.health.state(SERVERS[1]) == OPEN
+
+        down.clear()
+        load_balancer.health.tick()
+        await load_balancer.health.probe(SERVERS[1])
+        assert load_balancer.health.state(SERVERS[1]) == CLOSED
+        picked = {await load_balancer.select_server("m") for _ in range(6)}
+        assert picked == set(SERVERS)
+        await load_balancer.health._client.aclose()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,121 @@
+import asyncio
+from types import MappingProxyType
+
+import httpx
+
+from app.services.inflight import InflightTracker, OutstandingRequestsIndex
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+
+SERVERS = ["http://node1:8000", "http://node2:8000", "http://node3:8000"]
+
+
+def _snapshot(waiting=None):
+    waiting = waiting or {}
+    return MappingProxyType(
+        {server: MappingProxyType({"num_requests_waiting": waiting.get(server, 0)}) for server in SERVERS}
+    )
+
+
+def test_least_outstanding_spreads_a_burst_before_the_next_scrape():
+    index = OutstandingRequestsIndex(InflightTracker())
+    snapshot = _snapshot()
+    picked = []
+    for _ in range(6):
+        server = index.least_outstanding("m", snapshot)
+        index.inflight.acquire(server)
+        picked.append(server)
+    assert sorted(picked) == sorted(SERVERS * 2)
+
+    index.inflight.release(SERVERS[1])
+    assert index.least_outstanding("m", snapshot) == SERVERS[1]
+
+
+def test_scraped_queue_depth_is_blended_into_the_score():
+    index = OutstandingRequestsIndex(InflightTracker(), queue_weight=1.0)
+    snapshot = _snapshot({SERVERS[0]: 5, SERVERS[1]: 5})
+    assert index.least_outstanding("m", snapshot) == SERVERS[2]
+    for _ in range(6):
+        index.inflight.acquire(SERVERS[2])
+    assert index.least_outstanding("m", snapshot) in SERVERS[:2]
+
+
+def test_power_of_two_choices_never_picks_the_busiest_of_three():
+    index = OutstandingRequestsIndex(InflightTracker())
+    snapshot = _snapshot({SERVERS[0]: 50})
+    assert all(index.power_of_two_choices("m", snapshot) != SERVERS[0] for _ in range(200))
+    assert index.power_of_two_choices("m", snapshot, exclude=SERVERS[1:]) == SERVERS[0]
+    assert {index.power_of_two_choices("m", snapshot, exclude=[SERVERS[2]]) for _ in range(50)} == {SERVERS[1]}
+
+
+def test_retries_with_exclude_skip_servers_without_rebuilding_the_index(tmp_path):
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text('{"models": {"m": {"servers": [], "strategy": "least_outstanding_requests"}}}')
+        load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+        load_balancer.metrics_collector.metrics = {"m": _snapshot({SERVERS[1]: 1, SERVERS[2]: 2})}
+        index = load_balancer.outstanding
+        rebuilds = []
+        rebuild = index._rebuild
+        index._rebuild = lambda *args: rebuilds.append(args[0]) or rebuild(*args)
+
+        assert await load_balancer.select_server("m") == SERVERS[0]
+        assert await load_balancer.select_server("m", exclude=[SERVERS[0]]) == SERVERS[1]
+        assert await load_balancer.select_server("m", exclude=SERVERS[:2]) == SERVERS[2]
+        assert await load_balancer.select_server("m", exclude=SERVERS) is None
+        assert rebuilds == ["m"]
+        # 제외한 서버도 인덱스에 남아 카운터 변경을 계속 반영
+        assert all(index._models_by_server[server] == ["m"] for server in SERVERS)
+        load_balancer.inflight.acquire(SERVERS[0])
+        load_balancer.inflight.acquire(SERVERS[0])
+        assert await load_balancer.select_server("m") == SERVERS[1]
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_forward_request_releases_counters_on_completion_error_and_cancel(tmp_path):
+    async def body():
+        yield b"data: 1\n\n"
+        yield b"data: 2\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "node2":
+            return httpx.Response(500)
+        if request.url.path == "/stream":
+            return httpx.Response(200, content=body())
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text('{"models": {"m": {"servers": ["http://node1:8000"]}}}')
+        load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        inflight = load_balancer.inflight
+
+        assert await load_balancer.forward_request(SERVERS[0], "/v1", {}, {}) == {"ok": True}
+        assert inflight.get_requests(SERVERS[0]) == 0
+
+        try:
+            await load_balancer.forward_request(SERVERS[1], "/stream", {}, {}, stream=True)
+        except RuntimeError:
+            pass
+        assert inflight.get_requests(SERVERS[1]) == 0 and inflight.get_streams(SERVERS[1]) == 0
+
+        stream = await load_balancer.forward_request(SERVERS[0], "/stream", {}, {}, stream=True)
+        assert inflight.get_streams(SERVERS[0]) == 1
+        await stream.__anext__()
+        await stream.aclose()  # 클라이언트 연결 종료
+        assert inflight.get_requests(SERVERS[0]) == 0 and inflight.get_streams(SERVERS[0]) == 0
+
+        # 본문을 읽기 전에 연결이 끊겨도 카운터와 업스트림 응답을 반납
+        stream = await load_balancer.forward_request(SERVERS[0], "/stream", {}, {}, stream=True)
+        assert inflight.get_streams(SERVERS[0]) == 1
+        await stream.aclose()
+        assert inflight.get_streams(SERVERS[0]) == 0
+        assert load_balancer.token_load.get_work(SERVERS[0]) == 0
+        await load_balancer.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from app.services.instrumentation import RouterMetrics
+
+
+def test_request_and_selection_series_reuse_cached_children():
+    metrics = RouterMetrics(max_series=2)
+    for _ in range(3):
+        metrics.observe_request("/v1/completions", "m", "ok", 0.2)
+    metrics.observe_selection("m", "round_robin", "http://node1:8000")
+    metrics.observe_selection("m", "round_robin", "http://node2:8000")
+    metrics.observe_selection("m", "round_robin", "http://node3:8000")  # 한도 초과 -> other
+
+    registry = metrics.registry
+    labels = {"route": "/v1/completions", "model": "m", "outcome": "ok"}
+    assert registry.get_sample_value("llmstream_requests_total", labels) == 3
+    assert registry.get_sample_value(
+        "llmstream_request_duration_seconds_bucket", {"route": "/v1/completions", "model": "m", "le": "0.25"}
+    ) == 3
+    assert len(metrics.selections.children) == 2
+    assert registry.get_sample_value(
+        "llmstream_selections_total", {"model": "other", "strategy": "other", "server": "other"}
+    ) == 1
+
+
+def test_track_stream_records_ttfb_gaps_and_outcome():
+    metrics = RouterMetrics()
+
+    async def chunks():
+        for index in range(3):
+            await asyncio.sleep(0.01)
+            yield b"data: %d\n\n" % index
+
+    async def run():
+        stream = metrics.track_stream("/v1/completions", "m", time.perf_counter(), chunks())
+        assert len([chunk async for chunk in stream]) == 3
+
+        stream = metrics.track_stream("/v1/completions", "m", time.perf_counter(), chunks())
+        await stream.__anext__()
+        await stream.aclose()  # 클라이언트 연결 종료
+
+    asyncio.run(run())
+    registry = metrics.registry
+    assert registry.get_sample_value("llmstream_stream_time_to_first_byte_seconds_count", {"model": "m"}) == 2
+    assert registry.get_sample_value("llmstream_stream_chunk_gap_seconds_count", {"model": "m"}) == 2
+    for outcome in ("ok", "cancelled"):
+        labels = {"route": "/v1/completions", "model": "m", "outcome": outcome}
+        assert registry.get_sample_value("llmstream_requests_total", labels) == 1
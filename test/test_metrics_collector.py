@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from app.services.metrics_collector import MetricsCollector
+
+
+def _make_transport(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        if request.url.host == "dead":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, text="vllm:num_requests_waiting 3\n")
+
+    return httpx.MockTransport(handler)
+
+
+def test_shared_node_is_scraped_once_and_published_to_every_model():
+    async def run():
+        calls = []
+        collector = MetricsCollector(
+            {"a": ["http://shared:8000", "http://dead:8000"], "b": ["http://shared:8000"]},
+            transport=_make_transport(calls),
+        )
+        published = []
+        collector.add_listener(lambda model, snapshot: published.append(model))
+
+        await asyncio.gather(*(collector.scrape_server(s) for s in collector.unique_servers()))
+        await collector.aclose()
+
+        assert sorted(calls) == ["dead", "shared"]
+        assert sorted(published) == ["a", "b"]
+        assert dict(collector.get_metrics("a")) == {"http://shared:8000": {"num_requests_waiting": 3.0}}
+        assert collector.get_metrics("a")["http://shared:8000"] is collector.get_metrics("b")["http://shared:8000"]
+
+    asyncio.run(run())
+
+
+def test_snapshot_is_immutable_and_replaced_on_publish():
+    async def run():
+        collector = MetricsCollector({"a": ["http://shared:8000"]}, transport=_make_transport([]))
+        before = collector.get_metrics("a")
+        await collector.scrape_server("http://shared:8000")
+        await collector.aclose()
+        after = collector.get_metrics("a")
+
+        assert len(before) == 0 and len(after) == 1
+        try:
+            after["http://other:8000"] = {}
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("snapshot must be read-only")
+
+    asyncio.run(run())
+
+
+def test_busy_nodes_are_scraped_faster_than_idle_nodes():
+    collector = MetricsCollector({"a": ["http://n:8000"]}, update_interval=10, jitter=0)
+    assert collector._next_interval("busy", {"num_requests_waiting": 2}) == 5
+    assert collector._next_interval("idle", {"num_requests_waiting": 0}) == 15
+    assert collector._next_interval("idle", {"num_requests_waiting": 0}) == 22.5
+    assert collector._next_interval("idle", {"num_requests_waiting": 0}) == 30
+    assert collector._next_interval("idle", {}) == 10
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from types import MappingProxyType
+
+import httpx
+
+from app.services.inflight import InflightTracker
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.peak_ewma import PeakEwmaIndex, _Ewma
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+
+SERVERS = ["http://node1:8000", "http://node2:8000", "http://node3:8000"]
+SNAPSHOT = MappingProxyType({server: MappingProxyType({}) for server in SERVERS})
+
+
+def test_ewma_jumps_to_peaks_and_decays_with_time():
+    ewma = _Ewma(0.1, 0.0)
+    ewma.observe(2.0, 0.1, decay_time=10.0)
+    assert ewma.value == 2.0  # 느려지면 즉시 반영
+    ewma.observe(0.1, 0.2, decay_time=10.0)
+    assert ewma.value > 1.9  # 빨라진 표본 하나로는 거의 내려가지 않음
+    ewma.observe(0.1, 30.0, decay_time=10.0)
+    assert ewma.value < 0.2
+    assert ewma.get(60.0, decay_time=10.0) < ewma.value  # 관측이 없으면 감쇠
+    assert abs(ewma.get(600.0, decay_time=10.0, target=3.0) - 3.0) < 1e-6  # 오래 쉬면 모델 기준값으로 수렴
+
+
+def test_a_slow_node_is_avoided_until_its_latency_decays():
+    index = PeakEwmaIndex(InflightTracker(), decay_time=10.0)
+    for server in SERVERS:
+        index.observe_total(server, 0.05)
+    index.observe_ttft(SERVERS[0], 1.0)
+    assert all(index.select("m", SNAPSHOT) != SERVERS[0] for _ in range(200))
+
+    # 지연 시간이 같으면 진행 중 요청이 적은 서버
+    for _ in range(3):
+        index.inflight.acquire(SERVERS[1])
+    assert index.score(SERVERS[1]) > index.score(SERVERS[2])
+
+
+def test_a_new_server_joining_a_busy_pool_gets_its_share_instead_of_a_burst():
+    index = PeakEwmaIndex(InflightTracker(), decay_time=10.0)
+    for server in SERVERS:
+        index.observe_ttft(server, 3.0)
+        index.observe_total(server, 3.0)
+        for _ in range(4):
+            index.inflight.acquire(server)
+    new_server = "http://node4:8000"
+    snapshot = MappingProxyType({server: MappingProxyType({}) for server in [*SERVERS, new_server]})
+    assert index.baseline("m", snapshot) == 3.0  # 관측 전에는 모델의 현재 지연 시간으로 시작
+
+    for _ in range(40):
+        index.inflight.acquire(index.select("m", snapshot))
+        busiest = max(index.inflight.get_requests(server) for server in SERVERS)
+        assert index.inflight.get_requests(new_server) <= busiest + 1
+
+
+def test_peak_ewma_strategy_reacts_to_observed_latency(tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "node1":
+            await asyncio.sleep(0.05)  # 느려진 노드
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"models": {"m": {"servers": SERVERS, "strategy": "peak_ewma"}}}))
+        load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        load_balancer.metrics_collector.metrics = {"m": SNAPSHOT}
+
+        for server in SERVERS:
+            await load_balancer.forward_request(server, "/v1/completions", {"model": "m"}, {})
+        picked = [await load_balancer.select_server("m") for _ in range(50)]
+        assert SERVERS[0] not in picked
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_failing_node_is_penalized_instead_of_looking_fast(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "node1":
+            return httpx.Response(503)  # 즉시 실패
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"models": {"m": {"servers": SERVERS, "strategy": "peak_ewma"}}}))
+        load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        load_balancer.metrics_collector.metrics = {"m": SNAPSHOT}
+
+        for server in SERVERS:
+            try:
+                await load_balancer.forward_request(server, "/v1/completions", {"model": "m"}, {})
+            except RuntimeError:
+                pass
+        peak_ewma = load_balancer.peak_ewma
+        assert peak_ewma.latency(SERVERS[0]) >= peak_ewma.default_latency * peak_ewma.failure_penalty * 0.9
+        assert peak_ewma.latency(SERVERS[0]) > 10 * peak_ewma.latency(SERVERS[1])
+        picked = [peak_ewma.select("m", SNAPSHOT) for _ in range(50)]
+        assert SERVERS[0] not in picked
+        await load_balancer.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+from app.services.prefix_affinity import PrefixAffinityRouter
+
+SERVERS = ["http://node1:8000", "http://node2:8000", "http://node3:8000"]
+SYSTEM = {"role": "system", "content": "You are a helpful assistant. " * 40}
+
+
+def _idle(**overrides):
+    metrics = {server: {"num_requests_running": 0, "num_requests_waiting": 0} for server in SERVERS}
+    for server, values in overrides.items():
+        metrics[server] = values
+    return metrics
+
+
+def test_multi_turn_conversation_sticks_to_the_same_server():
+    router = PrefixAffinityRouter(block_size=64)
+    history = [SYSTEM, {"role": "user", "content": "first question"}]
+    first = router.select("m", _idle(), {"messages": history})
+
+    history += [{"role": "assistant", "content": "answer " * 30}, {"role": "user", "content": "follow up"}]
+    assert router.select("m", _idle(), {"messages": history}) == first
+
+
+def test_same_prompt_maps_consistently_without_history():
+    prompt = {"prompt": "shared document " * 100}
+    assert PrefixAffinityRouter().select("m", _idle(), prompt) == PrefixAffinityRouter().select("m", _idle(), prompt)
+
+
+def test_saturated_preferred_server_falls_back_to_least_loaded():
+    router = PrefixAffinityRouter(block_size=64)
+    payload = {"messages": [SYSTEM, {"role": "user", "content": "hi"}]}
+    preferred = router.select("m", _idle(), payload)
+    others = [server for server in SERVERS if server != preferred]
+
+    metrics = _idle(
+        **{
+            preferred: {"num_requests_running": 1, "num_requests_waiting": 0, "gpu_cache_usage": 0.99},
+            others[0]: {"num_requests_running": 2, "num_requests_waiting": 0},
+        }
+    )
+    assert router.select("m", metrics, payload) == others[1]
+
+
+def test_bounded_load_skips_overloaded_ring_owner():
+    router = PrefixAffinityRouter(block_size=64, load_factor=1.0)
+    payload = {"prompt": "x" * 500}
+    preferred = router.select("m", _idle(), payload)
+    metrics = _idle(**{preferred: {"num_requests_running": 6, "num_requests_waiting": 0}})
+    assert PrefixAffinityRouter(block_size=64, load_factor=1.0).select("m", metrics, payload) != preferred
@@ -0,0 +1,75 @@
+from app.utils.prometheus_parser import PrometheusParser
+from benchmarks.vllm_metrics_payload import build_payload
+
+SAMPLE = """# HELP vllm:num_requests_running Number of requests currently running on GPU.
+# TYPE vllm:num_requests_running gauge
+vllm:num_requests_running{model_name="a"} 2.0
+vllm:num_requests_running{model_name="b"} 3.0
+vllm:num_requests_waiting{model_name="a",note="has } brace and \\"quote\\""} 4 1700000000000
+vllm:gpu_cache_usage_perc{model_name="a"} 0.25
+vllm:gpu_cache_usage_perc{model_name="b"} 0.75
+# TYPE vllm:prompt_tokens counter
+vllm:prompt_tokens_total{model_name="a"} 1000
+# TYPE vllm:time_to_first_token_seconds histogram
+vllm:time_to_first_token_seconds_bucket{model_name="a",le="0.1"} 5
+vllm:time_to_first_token_seconds_bucket{model_name="a",le="1.0"} 10
+vllm:time_to_first_token_seconds_bucket{model_name="a",le="+Inf"} 10
+vllm:time_to_first_token_seconds_sum{model_name="a"} 3.0
+vllm:time_to_first_token_seconds_count{model_name="a"} 10
+# TYPE vllm:inter_token_latency_seconds summary
+vllm:inter_token_latency_seconds{model_name="a",quantile="0.5"} 0.02
+vllm:inter_token_latency_seconds{model_name="a",quantile="0.95"} 0.05
+vllm:inter_token_latency_seconds_sum{model_name="a"} 2.0
+vllm:inter_token_latency_seconds_count{model_name="a"} 100
+unrelated_metric{x="y"} 1
+"""
+
+
+def test_parses_labels_histograms_and_summaries():
+    metrics = PrometheusParser().parse(SAMPLE).to_metrics()
+
+    assert metrics["num_requests_running"] == 5.0
+    assert metrics["num_requests_waiting"] == 4.0
+    assert metrics["gpu_cache_usage"] == 0.75
+    assert metrics["prompt_tokens_total"] == 1000.0
+    assert metrics["ttft_count"] == 10.0
+    assert metrics["ttft_avg"] == 0.3
+    assert metrics["ttft_p50"] == 0.1
+    assert 0.1 < metrics["ttft_p95"] < 1.0
+    assert metrics["inter_token_latency_p50"] == 0.02
+    assert metrics["inter_token_latency_p95"] == 0.05
+    assert "unrelated_metric" not in metrics
+
+
+def test_derives_rates_and_window_statistics_between_scrapes():
+    parser = PrometheusParser()
+    previous = parser.parse(SAMPLE)
+    current = parser.parse(
+        SAMPLE.replace("vllm:prompt_tokens_total{model_name=\"a\"} 1000", "vllm:prompt_tokens_total{model_name=\"a\"} 1500")
+        .replace('le="1.0"} 10', 'le="1.0"} 20')
+        .replace('le="+Inf"} 10', 'le="+Inf"} 20')
+        .replace("_sum{model_name=\"a\"} 3.0", "_sum{model_name=\"a\"} 13.0")
+        .replace("_count{model_name=\"a\"} 10", "_count{model_name=\"a\"} 20")
+    )
+    metrics = current.to_metrics(previous, elapsed=5.0)
+
+    assert metrics["prompt_tokens_rate"] == 100.0
+    assert metrics["ttft_avg"] == 1.0  # 이번 구간의 10건만 반영
+    assert 0.1 < metrics["ttft_p50"] <= 1.0
+
+
+def test_counter_reset_does_not_produce_negative_rate():
+    parser = PrometheusParser()
+    previous = parser.parse("vllm:prompt_tokens_total 1000\n")
+    metrics = parser.parse("vllm:prompt_tokens_total 10\n").to_metrics(previous, elapsed=5.0)
+    assert metrics == {"prompt_tokens_total": 10.0}
+
+
+def test_custom_series_and_generated_vllm_payload():
+    parser = PrometheusParser({"preemptions": ["vllm:num_preemptions_total"]})
+    assert parser.parse(build_payload(extra_label_sets=3)).to_metrics() == {"preemptions_total": 48.0}
+
+    metrics = PrometheusParser().parse(build_payload(running=7, waiting=2)).to_metrics()
+    assert metrics["num_requests_running"] == 7.0
+    assert metrics["num_requests_waiting"] == 2.0
+    assert metrics["gpu_cache_usage"] == 0.42
@@ -0,0 +1,77 @@
+import asyncio
+import json
+from types import MappingProxyType
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from app.models.request import ChatCompletionRequest
+from app.routers import chat
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+from app.utils.request_body import parse_body
+
+SERVER = "http://node1:8000"
+
+
+def _raises(exception_type, raw, model=None):
+    try:
+        parse_body(raw, model)
+    except exception_type as e:
+        return e
+    raise AssertionError(f"expected {exception_type.__name__}")
+
+
+def test_parse_body_checks_only_routing_fields_unless_validation_is_on():
+    raw = b'{"model": "m", "messages": [{"role": "user", "content": "hi"}], "seed": 7}'
+    body = parse_body(raw)
+    assert body["seed"] == 7 and body.raw is raw
+
+    assert _raises(HTTPException, b"[1, 2]").status_code == 400
+    assert _raises(HTTPException, b"{not json").status_code == 400
+    assert _raises(HTTPException, b'{"model": "m", "stream": "yes"}').status_code == 400
+    assert _raises(HTTPException, b'{"model": "m", "messages": ["hi"]}').status_code == 400
+
+    # 검증을 켜면 요청 모델 기준으로 전체 검증 (모르는 필드는 허용)
+    assert parse_body(raw, ChatCompletionRequest)["seed"] == 7
+    _raises(RequestValidationError, b'{"messages": []}', ChatCompletionRequest)
+    assert parse_body(b'{"messages": []}')["messages"] == []
+
+
+def test_chat_completions_forwards_the_original_bytes(tmp_path):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.content)
+        return httpx.Response(200, json={"choices": []})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"models": {"m": {"servers": [SERVER]}}}))
+        load_balancer = LoadBalancer(MetricsCollector({"m": [SERVER]}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        load_balancer.metrics_collector.metrics = {"m": MappingProxyType({SERVER: MappingProxyType({})})}
+        init_dependencies(load_balancer)
+        app = FastAPI()
+        app.include_router(chat.router, prefix="/v1")
+
+        raw = (
+            b'{"model":"m","messages":[{"role":"user","content":"hi"}],'
+            b'"tools":[{"type":"function","function":{"name":"f"}}],"response_format":{"type":"json_object"}}'
+        )
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            response = await client.post(
+                "/v1/chat/completions", content=raw, headers={"content-type": "application/json"}
+            )
+            assert response.status_code == 200
+            assert received == [raw]  # 다시 인코딩하지 않고 그대로 전달 (기본값 주입/필드 누락 없음)
+
+            response = await client.post("/v1/chat/completions", content=b'{"messages": []}')
+            assert response.status_code == 400
+        await load_balancer.aclose()
+
+    asyncio.run(run())
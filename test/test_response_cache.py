@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+
+from app.services.response_cache import ResponseCache, replay_as_sse
+from app.services.scheduler import TenantResolver
+
+CHAT_RESPONSE = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 1,
+    "model": "m",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "hi"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+}
+
+
+def test_key_ignores_stream_flag_and_field_order():
+    a = ResponseCache.make_key("/v1/completions", {"model": "m", "prompt": "x", "temperature": 0, "stream": True})
+    b = ResponseCache.make_key("/v1/completions", {"temperature": 0, "prompt": "x", "model": "m"})
+    assert a == b
+    assert a != ResponseCache.make_key("/v1/chat/completions", {"temperature": 0, "prompt": "x", "model": "m"})
+    cache = ResponseCache(TenantResolver(trusted_header="x-tenant-id"))
+    tenant_a = cache.scope({"authorization": "Bearer a"})
+    tenant_b = cache.scope({"authorization": "Bearer b", "x-tenant-id": "t"})
+    assert tenant_a != tenant_b != cache.scope({"authorization": "Bearer a", "x-tenant-id": "t"})
+    assert ResponseCache.make_key("/v1/completions", {"prompt": "x"}, tenant_a) != ResponseCache.make_key(
+        "/v1/completions", {"prompt": "x"}, tenant_b
+    )
+    assert ResponseCache.is_cacheable({"temperature": 0})
+    assert ResponseCache.is_cacheable({"temperature": 0.7, "seed": 1})
+    assert not ResponseCache.is_cacheable({"temperature": 0.7})
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    async def run():
+        cache = ResponseCache()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return CHAT_RESPONSE
+
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(10)))
+        assert calls == 1
+        assert all(result == CHAT_RESPONSE for result in results)
+        assert await cache.get_or_fetch("k", fetch) == CHAT_RESPONSE
+        assert calls == 1
+        stats = cache.stats()
+        assert stats["coalesced"] == 9 and stats["hits"] == 1 and stats["misses"] == 1
+
+    asyncio.run(run())
+
+
+def test_coalesced_requests_survive_the_leader_disconnecting():
+    async def run():
+        cache = ResponseCache()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return CHAT_RESPONSE
+
+        leader = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == CHAT_RESPONSE
+        assert leader.cancelled()
+        assert cache._get_memory("k") is not None and not cache._pending
+
+    asyncio.run(run())
+
+
+def test_lru_eviction_ttl_and_disk_tier(tmp_path):
+    async def run():
+        entry_size = len(json.dumps({"v": 0}, separators=(",", ":")))
+        cache = ResponseCache(max_bytes=entry_size * 2, ttl=60, disk_path=str(tmp_path))
+        for i in range(3):
+            await cache.put(f"k{i}", {"v": i})
+        assert cache.stats()["evictions"] == 1
+        assert cache._get_memory("k0") is None
+        assert await cache.get("k0") == {"v": 0}  # 디스크 계층에서 복구
+        assert cache.stats()["disk_hits"] == 1
+
+        expired = ResponseCache(ttl=0.01)
+        await expired.put("k", {"v": 1})
+        time.sleep(0.02)
+        assert await expired.get("k") is None
+        assert expired.stats()["expirations"] == 1
+
+    asyncio.run(run())
+
+
+def test_cached_chat_completion_replays_as_sse():
+    async def run():
+        return [chunk async for chunk in replay_as_sse(CHAT_RESPONSE)]
+
+    chunks = asyncio.run(run())
+    assert chunks[-1] == b"data: [DONE]\n\n"
+    events = [json.loads(chunk[len(b"data: "):]) for chunk in chunks[:-1]]
+    assert events[0]["object"] == "chat.completion.chunk"
+    assert events[0]["choices"][0]["delta"] == {"role": "assistant", "content": "hi"}
+    assert events[1]["choices"][0]["finish_reason"] == "stop"
+    assert events[2]["usage"]["total_tokens"] == 4
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+from types import MappingProxyType
+
+import httpx
+
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.retry import RetryBudget
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+
+SERVERS = ["http://node1:8000", "http://node2:8000", "http://node3:8000"]
+
+
+def _load_balancer(tmp_path, handler, retry=None) -> LoadBalancer:
+    config = tmp_path / "config.json"
+    config.write_text(
+        json.dumps({"models": {"m": {"servers": SERVERS, "strategy": "round_robin"}}, "retry": retry or {}})
+    )
+    load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+    load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+    load_balancer.metrics_collector.metrics = {
+        "m": MappingProxyType({server: MappingProxyType({}) for server in SERVERS})
+    }
+    return load_balancer
+
+
+def test_retries_503_and_connection_errors_on_other_servers_but_not_4xx(tmp_path):
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url.host)
+        if request.url.path == "/bad":
+            return httpx.Response(400)
+        if request.url.host == "node1":
+            return httpx.Response(503)
+        if request.url.host == "node2":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"server": request.url.host})
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler)
+        response = await load_balancer.forward_with_retries(SERVERS[0], "m", "/v1/completions", {}, {})
+        assert response == {"server": "node3"}
+        assert sorted(attempts) == ["node1", "node2", "node3"]
+
+        attempts.clear()
+        try:
+            await load_balancer.forward_with_retries(SERVERS[2], "m", "/bad", {}, {})
+            raise AssertionError("4xx must not be retried")
+        except RuntimeError:
+            pass
+        assert attempts == ["node3"]
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_retry_budget_limits_amplification():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=1.0)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_withdraw()
+    assert budget.exhausted == 1
+
+
+def test_hedged_request_returns_the_faster_server_and_cancels_the_other(tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "node1":
+            await asyncio.sleep(2)
+        return httpx.Response(200, json={"server": request.url.host})
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler, {"hedge": True, "hedge_min_samples": 5})
+        for _ in range(5):
+            load_balancer.latencies.record("m", 0.05)
+        started_at = time.monotonic()
+        response = await load_balancer.forward_with_retries(SERVERS[0], "m", "/v1/completions", {}, {})
+        assert response["server"] != "node1"
+        assert time.monotonic() - started_at < 1
+        assert load_balancer.retry_stats["hedge_wins"] == 1
+        assert load_balancer.inflight.get_requests(SERVERS[0]) == 0
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_hedges_do_not_use_up_the_retry_limit(tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "node1":
+            await asyncio.sleep(0.2)
+        if request.url.host == "node3":
+            return httpx.Response(200, json={"server": "node3"})
+        return httpx.Response(503)
+
+    async def run():
+        load_balancer = _load_balancer(
+            tmp_path, handler, {"hedge": True, "hedge_min_samples": 5, "max_retries": 1}
+        )
+        for _ in range(5):
+            load_balancer.latencies.record("m", 0.05)
+        response = await load_balancer.forward_with_retries(SERVERS[0], "m", "/v1/completions", {}, {})
+        assert response == {"server": "node3"}  # node1 과 헤지(node2)가 모두 실패한 뒤 재시도
+        assert load_balancer.retry_stats["hedges"] == 1 and load_balancer.retry_stats["retries"] == 1
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_stream_fails_over_before_the_first_byte(tmp_path):
+    async def broken():
+        raise httpx.ReadError("connection reset")
+        yield b""
+
+    async def body():
+        yield b"data: ok\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "node1":
+            return httpx.Response(200, content=broken())
+        return httpx.Response(200, content=body())
+
+    async def run():
+        load_balancer = _load_balancer(tmp_path, handler)
+        stream = await load_balancer.forward_with_retries(
+            SERVERS[0], "m", "/v1/completions", {}, {}, stream=True
+        )
+        assert [chunk async for chunk in stream] == [b"data: ok\n\n"]
+        assert load_balancer.retry_stats["stream_failovers"] == 1
+        assert load_balancer.inflight.get_streams(SERVERS[0]) == 0
+        await load_balancer.aclose()
+
+    asyncio.run(run())
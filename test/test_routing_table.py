@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import admin
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.routing_table import RoutingTableManager
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+
+CONFIG = {
+    "models": {"m": {"servers": ["http://node1:8000", "http://node2:8000"], "strategy": "round_robin"}},
+    "metrics_update_interval": 10,
+}
+
+
+def _write(path, config):
+    with open(path, "w") as f:
+        json.dump(config, f)
+
+
+def _setup(tmp_path):
+    path = str(tmp_path / "config.json")
+    _write(path, CONFIG)
+    config_loader = ConfigLoader(path)
+    routing = RoutingTableManager(config_loader)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="vllm:num_requests_running 0\n"))
+    collector = MetricsCollector(routing.table.servers_by_model(), transport=transport, jitter=0)
+    routing.add_listener(collector.apply_routing_table)
+    return path, routing, collector, LoadBalancer(collector, config_loader, routing)
+
+
+def test_reload_swaps_table_and_collector_servers(tmp_path):
+    async def run():
+        path, routing, collector, load_balancer = _setup(tmp_path)
+        for server in collector.unique_servers():
+            await collector.scrape_server(server)
+        before = routing.table
+
+        _write(path, {"models": {"m": {"servers": ["http://node2:8000", "http://node3:8000"], "strategy": "random"}}})
+        assert routing.reload()
+        assert before.strategy("m") == "round_robin"  # 이전 테이블은 바뀌지 않는다
+        assert routing.table.strategy("m") == "random" and routing.table.version == before.version + 1
+        assert collector.unique_servers() == ["http://node2:8000", "http://node3:8000"]
+        assert list(collector.get_metrics("m")) == ["http://node2:8000"]  # node3 은 아직 수집 전
+
+        with open(path, "w") as f:
+            f.write("{broken")
+        assert not routing.reload()
+        assert routing.table.strategy("m") == "random"
+        await collector.aclose()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_draining_node_gets_no_new_requests_but_keeps_inflight(tmp_path):
+    async def run():
+        path, routing, collector, load_balancer = _setup(tmp_path)
+        for server in collector.unique_servers():
+            await collector.scrape_server(server)
+        load_balancer.inflight.acquire("http://node1:8000", stream=True)
+
+        routing.drain("http://node1:8000")
+        selected = {await load_balancer.select_server("m") for _ in range(10)}
+        assert selected == {"http://node2:8000"}
+        assert load_balancer.inflight.get_streams("http://node1:8000") == 1
+        assert "http://node1:8000" in collector.unique_servers()  # 수집은 계속
+
+        routing.reload()  # 파일을 다시 읽어도 드레이닝 유지
+        assert "http://node1:8000" in routing.table.draining
+        # 같은 설정 파일을 감시하는 다른 워커도 드레이닝 상태를 따른다
+        other = RoutingTableManager(ConfigLoader(path))
+        assert other.table.draining == {"http://node1:8000"}
+        routing.undrain("http://node1:8000")
+        assert other.reload() and not other.table.draining
+        selected = {await load_balancer.select_server("m") for _ in range(10)}
+        assert selected == {"http://node1:8000", "http://node2:8000"}
+        await collector.aclose()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_admin_changes_are_persisted_and_scrape_loops_follow_the_table(tmp_path):
+    async def run():
+        path, routing, collector, load_balancer = _setup(tmp_path)
+        task = asyncio.create_task(collector.update_metrics())
+        await asyncio.sleep(0)
+        assert set(collector._tasks) == {"http://node1:8000", "http://node2:8000"}
+
+        routing.set_model("n", ["http://node3:8000"], "least_connection")
+        routing.delete_model("m")
+        assert set(collector._tasks) == {"http://node3:8000"}
+        assert set(collector.metrics) == {"n"}
+
+        with open(path) as f:
+            saved = json.load(f)
+        assert saved["models"] == {"n": {"servers": ["http://node3:8000"], "strategy": "least_connection"}}
+        assert saved["metrics_update_interval"] == 10
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+        # 자신이 쓴 파일은 감시자가 다시 읽지 않는다
+        routing.watch_interval = 0.01
+        watcher = asyncio.create_task(routing.watch())
+        await asyncio.sleep(0.05)
+        assert routing.reloads == 0
+        _write(path, CONFIG)
+        os.utime(path, ns=(0, 0))
+        await asyncio.sleep(0.05)
+        assert routing.reloads == 1 and routing.table.strategy("m") == "round_robin"
+
+        for t in (watcher, task):
+            t.cancel()
+        await asyncio.gather(watcher, task, return_exceptions=True)
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_drain_endpoints_require_the_admin_token(tmp_path):
+    async def run():
+        path, routing, collector, load_balancer = _setup(tmp_path)
+        init_dependencies(load_balancer, routing=routing)
+        app = FastAPI()
+        app.include_router(admin.router, prefix="/admin")
+        drain = {"server": "http://node1:8000"}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            assert (await client.post("/admin/servers/drain", json=drain)).status_code == 403  # 토큰 미설정
+
+            _write(path, {**CONFIG, "admin": {"token": "secret"}})
+            assert routing.reload()
+            response = await client.post("/admin/servers/drain", json=drain, headers={"Authorization": "Bearer x"})
+            assert response.status_code == 401
+            assert not routing.table.draining
+
+            response = await client.post(
+                "/admin/servers/drain", json=drain, headers={"Authorization": "Bearer secret"}
+            )
+            assert response.status_code == 200 and routing.table.draining == {"http://node1:8000"}
+        await collector.aclose()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_model_changes_require_the_admin_token(tmp_path):
+    async def run():
+        path, routing, collector, load_balancer = _setup(tmp_path)
+        init_dependencies(load_balancer, routing=routing)
+        app = FastAPI()
+        app.include_router(admin.router, prefix="/admin")
+        attacker = {"servers": ["http://attacker:8000"]}
+        created = {"model_name": "n", "servers": ["http://node3:8000"], "strategy": "round_robin"}
+
+        async def changes(headers):
+            return [
+                (await client.post("/admin/models", json=created, headers=headers)).status_code,
+                (await client.put("/admin/models/m", json=attacker, headers=headers)).status_code,
+                (await client.delete("/admin/models/m", headers=headers)).status_code,
+            ]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            assert await changes({}) == [403, 403, 403]  # 토큰 미설정
+
+            _write(path, {**CONFIG, "admin": {"token": "secret"}})
+            assert routing.reload()
+            assert await changes({}) == [401, 401, 401]
+            assert await changes({"Authorization": "Bearer x"}) == [401, 401, 401]
+            assert set(routing.table.models) == {"m"}
+            assert routing.table.models["m"].servers == ("http://node1:8000", "http://node2:8000")
+            with open(path) as f:
+                assert json.load(f)["models"] == CONFIG["models"]
+
+            assert await changes({"Authorization": "Bearer secret"}) == [200, 200, 200]
+            assert set(routing.table.models) == {"n"}
+        await collector.aclose()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import completions
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.scheduler import AdmissionController, AdmissionRejected, tenant_id
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+
+
+def _controller(**config):
+    collector = MetricsCollector({"m": ["http://node1:8000"]})
+    return AdmissionController(collector, per_server_concurrency=1, **config)
+
+
+def test_priority_classes_and_tenant_fair_share():
+    async def run():
+        admission = _controller()
+        running = await admission.acquire("m", tenant="a")
+        order = []
+
+        async def request(priority, tenant):
+            ticket = await admission.acquire("m", priority, tenant)
+            order.append((priority, tenant))
+            admission.release(ticket)
+
+        tasks = [
+            asyncio.create_task(request(2, "a")),
+            asyncio.create_task(request(2, "a")),
+            asyncio.create_task(request(2, "b")),
+            asyncio.create_task(request(0, "c")),
+        ]
+        await asyncio.sleep(0)
+        assert admission.stats()["m"]["queued"] == 4
+        admission.release(running)
+        await asyncio.gather(*tasks)
+        # 높은 우선순위가 먼저, 같은 우선순위에서는 테넌트 a 가 연속으로 독점하지 않음
+        assert order[0] == (0, "c")
+        assert [tenant for _, tenant in order[1:]].index("b") < 2
+
+    asyncio.run(run())
+
+
+def test_full_queue_and_deadline_rejections_carry_retry_after():
+    async def run():
+        admission = _controller(max_queue_size=1)
+        running = await admission.acquire("m")
+        waiter = asyncio.create_task(admission.acquire("m", timeout=0.05))
+        await asyncio.sleep(0)
+
+        try:
+            await admission.acquire("m")
+        except AdmissionRejected as e:
+            assert e.status_code == 429 and e.retry_after >= 1
+        else:
+            raise AssertionError("expected queue-full rejection")
+
+        try:
+            await waiter
+        except AdmissionRejected as e:
+            assert e.status_code == 503
+        else:
+            raise AssertionError("expected deadline rejection")
+        stats = admission.stats()["m"]
+        assert stats["queued"] == 0 and stats["rejected_full"] == 1 and stats["rejected_deadline"] == 1
+        admission.release(running)
+
+    asyncio.run(run())
+
+
+def test_stream_holds_its_slot_until_closed():
+    async def run():
+        admission = _controller()
+
+        async def chunks():
+            yield b"a"
+            yield b"b"
+
+        stream = admission.hold_stream(await admission.acquire("m"), chunks())
+        assert await stream.__anext__() == b"a"
+        assert admission.stats()["m"]["active"] == 1
+        await stream.aclose()
+        assert admission.stats()["m"]["active"] == 0
+
+        # 본문을 읽기 전에 닫혀도 권한을 반납
+        stream = admission.hold_stream(await admission.acquire("m"), chunks())
+        assert admission.stats()["m"]["active"] == 1
+        await stream.aclose()
+        assert admission.stats()["m"]["active"] == 0
+
+    asyncio.run(run())
+
+
+def test_tenant_id_comes_from_the_credentials_unless_the_header_is_trusted():
+    headers = {"x-tenant-id": "team-a", "authorization": "Bearer k"}
+    assert tenant_id(headers) == tenant_id({"authorization": "Bearer k"}) not in ("team-a", "Bearer k")
+    assert tenant_id(headers, trusted_header="x-tenant-id") == "team-a"
+    assert tenant_id({"authorization": "Bearer k"}, api_keys={"k": "team-b"}) == "team-b"
+    assert tenant_id({}) == tenant_id({"x-tenant-id": "team-a"}) == "anonymous"
+
+
+def test_unknown_models_are_rejected_before_a_queue_is_created(tmp_path):
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"models": {"m": {"servers": ["http://node1:8000"]}}}))
+        collector = MetricsCollector({"m": ["http://node1:8000"]})
+        admission = AdmissionController(collector, enabled=True)
+        init_dependencies(LoadBalancer(collector, ConfigLoader(str(config))), admission=admission)
+        app = FastAPI()
+        app.include_router(completions.router, prefix="/v1")
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            for model in ("a", "b"):
+                response = await client.post("/v1/completions", json={"model": model, "prompt": "hi"})
+                assert response.status_code == 404
+        assert admission.queues == {}
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import random
+from collections import Counter
+from types import MappingProxyType
+
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.selectors import AliasTable, RoundRobinSelector, SmoothWeightedRoundRobinSelector, metric_weight
+from app.utils.config_loader import ConfigLoader
+
+
+def _snapshot(usages):
+    return MappingProxyType({server: MappingProxyType({"gpu_cache_usage": usage}) for server, usage in usages.items()})
+
+
+def test_alias_table_samples_in_proportion_to_weights():
+    random.seed(7)
+    table = AliasTable(["a", "b", "c", "d"], [1, 2, 3, 4])
+    counts = Counter(table.sample() for _ in range(40000))
+    for server, weight in zip("abcd", [1, 2, 3, 4]):
+        assert abs(counts[server] / 40000 - weight / 10) < 0.01
+
+
+def test_smooth_weighted_round_robin_interleaves_and_survives_recompile():
+    snapshot = _snapshot({"a": 0.1, "b": 0.3})  # 가중치 약 3:1
+    assert round(metric_weight(snapshot["a"]) / metric_weight(snapshot["b"])) == 3
+    selector = SmoothWeightedRoundRobinSelector(snapshot)
+    picks = [selector.select() for _ in range(8)]
+    assert all(window.count("b") == 1 for window in (picks[:4], picks[4:]))
+
+    # 새 스냅샷으로 다시 만들어도 순서를 이어간다
+    selector = SmoothWeightedRoundRobinSelector(_snapshot({"a": 0.1, "b": 0.3}), selector)
+    picks = [selector.select() for _ in range(8)]
+    assert Counter(picks) == {"a": 6, "b": 2}
+
+    rr = RoundRobinSelector(snapshot)
+    rr.select()
+    assert RoundRobinSelector(_snapshot({"a": 0.5, "b": 0.5}), rr).select() == "b"
+
+
+def test_selectors_are_isolated_per_model(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"models": {
+        "m1": {"servers": ["http://a:8000", "http://b:8000"], "strategy": "real_time_metrics"},
+        "m2": {"servers": ["http://c:8000", "http://d:8000"], "strategy": "real_time_metrics"},
+    }}))
+    collector = MetricsCollector({"m1": ["http://a:8000", "http://b:8000"], "m2": ["http://c:8000", "http://d:8000"]})
+    collector.metrics = {
+        "m1": _snapshot({"http://a:8000": 0.1, "http://b:8000": 0.9}),
+        "m2": _snapshot({"http://c:8000": 0.9, "http://d:8000": 0.1}),
+    }
+    load_balancer = LoadBalancer(collector, ConfigLoader(str(path)))
+
+    async def run():
+        picks = {"m1": set(), "m2": set()}
+        for _ in range(50):
+            for model in ("m1", "m2"):
+                picks[model].add(await load_balancer.select_server(model))
+        return picks
+
+    picks = asyncio.run(run())
+    assert picks["m1"] <= {"http://a:8000", "http://b:8000"}
+    assert picks["m2"] <= {"http://c:8000", "http://d:8000"}
+    first = load_balancer.selectors.get_compiled("m1")
+    asyncio.run(load_balancer.select_server("m1"))
+    assert load_balancer.selectors.get_compiled("m1") is first  # 스냅샷이 그대로면 다시 컴파일하지 않는다
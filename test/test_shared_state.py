@@ -0,0 +1,129 @@
+import asyncio
+import multiprocessing
+
+import httpx
+
+from app.services.inflight import InflightTracker
+from app.services.metrics_collector import MetricsCollector
+from app.services.selectors import SelectorCache
+from app.services.shared_state import SharedState, default_path
+
+SERVER = "http://node1:8000"
+
+
+def _run_in_worker(target, *args):
+    process = multiprocessing.get_context("fork").Process(target=target, args=args)
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+
+def _crashed_worker(path):
+    # 요청 5 개를 보낸 채 release 없이 종료 (워커 비정상 종료)
+    inflight = InflightTracker(SharedState(path=path))
+    for _ in range(5):
+        inflight.acquire(SERVER)
+
+
+def _new_worker(path, cursor_queue):
+    shared = SharedState(path=path)
+    cursor_queue.put((shared.worker, shared.next_cursor("m")))
+
+
+def _cursor_worker(path, start, cursor_queue):
+    shared = SharedState(path=path)
+    start.wait()  # 모든 워커가 동시에 커서를 증가
+    cursor_queue.put([shared.next_cursor("m") for _ in range(5000)])
+
+
+def test_inflight_counters_are_summed_across_workers_and_reset_for_dead_workers(tmp_path):
+    path = str(tmp_path / "state")
+    inflight = InflightTracker(SharedState(path=path))
+    changed = []
+    inflight.add_listener(changed.append)
+    inflight.acquire(SERVER, stream=True)
+    assert inflight.get_requests(SERVER) == 1
+
+    _run_in_worker(_crashed_worker, path)
+    changed.clear()
+    inflight.sync_shared()  # 다른 워커의 변경을 리스너(인덱스)에 알린다
+    assert changed == [SERVER] and inflight.get_requests(SERVER) == 6
+
+    queue = multiprocessing.get_context("fork").Queue()
+    _run_in_worker(_new_worker, path, queue)
+    worker, cursor = queue.get(timeout=5)
+    assert worker == 1  # 죽은 워커 자리를 이어받고 카운터를 지운다
+    assert inflight.get_requests(SERVER) == 1 and inflight.get_streams(SERVER) == 1
+    assert cursor == 0
+
+
+def test_counters_of_exited_workers_are_cleared_without_a_replacement(tmp_path):
+    path = str(tmp_path / "state")
+    inflight = InflightTracker(SharedState(path=path))
+    inflight.acquire(SERVER)
+    _run_in_worker(_crashed_worker, path)
+    assert inflight.get_requests(SERVER) == 6
+
+    assert inflight.shared.reap_workers() == 1
+    assert inflight.shared.reap_workers() == 0
+    assert inflight.get_requests(SERVER) == 1
+
+
+def test_round_robin_cursor_is_an_atomic_fetch_add_across_processes(tmp_path):
+    path = str(tmp_path / "state")
+    SharedState(path=path)
+    context = multiprocessing.get_context("fork")
+    queue, start = context.Queue(), context.Barrier(4)
+    processes = [context.Process(target=_cursor_worker, args=(path, start, queue)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    cursors = [cursor for _ in processes for cursor in queue.get(timeout=10)]
+    for process in processes:
+        process.join(10)
+    assert sorted(cursors) == list(range(20000))  # 두 워커가 같은 값을 받지 않음
+
+
+def test_default_path_is_specific_to_the_instance():
+    assert default_path("/srv/a/config.json") != default_path("/srv/b/config.json")
+    assert default_path("/srv/a/config.json") == default_path("/srv/a/config.json")
+
+
+def test_round_robin_cursor_is_shared(tmp_path):
+    path = str(tmp_path / "state")
+    first = SelectorCache(SharedState(path=path))
+    second = SelectorCache(SharedState(path=path))
+    snapshot = {"http://a:8000": {}, "http://b:8000": {}, "http://c:8000": {}}
+    picks = [cache.get("m", "round_robin", snapshot).select() for cache in (first, second, first)]
+    assert picks == ["http://a:8000", "http://b:8000", "http://c:8000"]
+
+
+def test_only_the_leader_scrapes_and_followers_read_shared_snapshots(tmp_path):
+    path = str(tmp_path / "state")
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.host)
+        return httpx.Response(200, text="vllm:num_requests_waiting 2\n")
+
+    async def run():
+        leader, follower = (
+            MetricsCollector(
+                {"m": [SERVER]}, jitter=0, transport=httpx.MockTransport(handler), shared=SharedState(path=path)
+            )
+            for _ in range(2)
+        )
+        leader.shared.poll_interval = follower.shared.poll_interval = 0.01
+        leader_task = asyncio.create_task(leader.update_metrics())
+        await asyncio.sleep(0.05)
+        follower_task = asyncio.create_task(follower.update_metrics())
+        await asyncio.sleep(0.05)
+
+        assert leader.shared.try_lead() and not follower.shared.try_lead()
+        assert calls == ["node1"]
+        assert dict(follower.get_metrics("m")[SERVER]) == {"num_requests_waiting": 2.0}
+
+        for task in (leader_task, follower_task):
+            task.cancel()
+        await asyncio.gather(leader_task, follower_task, return_exceptions=True)
+
+    asyncio.run(run())
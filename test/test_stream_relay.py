@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+
+from app.services.stream_relay import StreamRelay
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+
+def test_relay_forwards_raw_sse_bytes_and_coalesces_small_chunks():
+    chunks = [b'data: {"a":1}\n\n', b'data: {"a":2}\n\n', b"data: [DONE]\n\n"]
+
+    async def upstream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        plain = [chunk async for chunk in StreamRelay().relay(upstream())]
+        coalesced = [chunk async for chunk in StreamRelay(flush_interval=0.05).relay(upstream())]
+        return plain, coalesced
+
+    plain, coalesced = asyncio.run(run())
+    assert b"".join(plain) == b"".join(chunks)
+    assert coalesced == [b"".join(chunks)]
+
+
+def test_client_disconnect_cancels_the_upstream_stream():
+    closed = asyncio.Event()
+
+    async def upstream():
+        try:
+            yield b"data: 1\n\n"
+            await asyncio.sleep(60)  # 토큰 생성 중
+            yield b"data: 2\n\n"
+        finally:
+            closed.set()
+
+    async def run():
+        relay = StreamRelay()
+        request = FakeRequest()
+        stream = relay.relay(upstream(), request)
+        assert await stream.__anext__() == b"data: 1\n\n"
+        request.disconnected.set()
+        await asyncio.wait_for(closed.wait(), 1)
+        assert relay.disconnects == 1
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_mid_stream_upstream_error_becomes_an_sse_error_event():
+    errors = []
+
+    async def upstream():
+        yield b"data: 1\n\n"
+        raise httpx.ReadError("connection reset")
+
+    async def run():
+        return [chunk async for chunk in StreamRelay().relay(upstream(), on_error=errors.append)]
+
+    received = asyncio.run(run())
+    assert received[0] == b"data: 1\n\n"
+    assert received[-1].startswith(b'data: {"error"') and received[-1].endswith(b"\n\n")
+    assert isinstance(errors[0], httpx.ReadError)
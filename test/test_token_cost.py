@@ -0,0 +1,94 @@
+import asyncio
+from types import MappingProxyType
+
+import httpx
+
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.scheduler import AdmissionController
+from app.services.token_cost import ProjectedWorkIndex, TokenCostEstimator, TokenLoadTracker, prompt_chars
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+
+SERVERS = ["http://node1:8000", "http://node2:8000"]
+SNAPSHOT = MappingProxyType({server: MappingProxyType({}) for server in SERVERS})
+
+
+def test_estimate_counts_prompt_characters_and_calibrates_from_usage():
+    payload = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 100}
+    assert prompt_chars(payload) == 400
+    assert prompt_chars({"prompt": ["ab", "cde"]}) == 5
+    # 형식이 맞지 않는 content/text 는 오류 없이 건너뛴다
+    malformed = [
+        {"role": "user", "content": [{"type": "text", "text": None}, {"type": "text", "text": "abc"}, 7]},
+        {"role": "user", "content": 5},
+        "hi",
+    ]
+    assert prompt_chars({"messages": malformed}) == 3
+
+    estimator = TokenCostEstimator(calibration_alpha=0.5)
+    cost = estimator.estimate("m", payload)
+    assert (cost.prompt_tokens, cost.decode_tokens, cost.work) == (100.0, 100.0, 200.0)
+
+    # 실제로는 문자 2 개당 토큰 1 개, max_tokens 의 절반만 생성
+    estimator.observe_usage("m", payload, cost, {"prompt_tokens": 200, "completion_tokens": 50})
+    assert estimator.chars_per_token("m") == 3.0 and estimator.completion_ratio("m") == 0.75
+    assert estimator.chars_per_token("other") == 4.0
+
+
+def test_token_weighted_steers_away_from_a_server_with_a_long_prompt():
+    tokens = TokenLoadTracker(TokenCostEstimator())
+    index = ProjectedWorkIndex(tokens)
+    estimator = tokens.estimator
+    long_cost = estimator.estimate("m", {"prompt": "x" * 40000, "max_tokens": 16})
+    tokens.acquire(SERVERS[0], long_cost)
+
+    short = {"prompt": "hi", "max_tokens": 16}
+    picked = []
+    for _ in range(4):
+        server = index.least_outstanding("m", SNAPSHOT)
+        tokens.acquire(server, estimator.estimate("m", short))
+        picked.append(server)
+    # 요청 수로는 node1 이 1 개뿐이지만 예상 작업량이 커서 짧은 요청은 모두 node2 로 간다
+    assert picked == [SERVERS[1]] * 4
+
+    tokens.prefill_done(SERVERS[0], long_cost)
+    assert tokens.prefill[SERVERS[0]] == 0.0 and tokens.get_work(SERVERS[0]) == long_cost.decode_tokens
+    tokens.release(SERVERS[0], long_cost, prefilled=True)
+    assert index.least_outstanding("m", SNAPSHOT) == SERVERS[0]
+
+
+def test_forward_request_calibrates_and_releases_token_load(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"usage": {"prompt_tokens": 50, "completion_tokens": 10}})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text('{"token_cost": {"calibration_alpha": 1.0}}')
+        load_balancer = LoadBalancer(MetricsCollector({"m": SERVERS}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+
+        payload = {"model": "m", "prompt": "x" * 100, "max_tokens": 20}
+        await load_balancer.forward_request(SERVERS[0], "/v1/completions", payload, {})
+        assert load_balancer.token_load.get_work(SERVERS[0]) == 0.0
+        assert load_balancer.token_costs.stats() == {"m": {"chars_per_token": 2.0, "completion_ratio": 0.5}}
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_token_budget_holds_a_large_request_until_work_is_released():
+    async def run():
+        collector = MetricsCollector({"m": ["http://node1:8000"]})
+        admission = AdmissionController(collector, per_server_concurrency=8, per_server_token_budget=1000)
+        first = await admission.acquire("m", cost=600)
+        large = asyncio.create_task(admission.acquire("m", cost=600))
+        await asyncio.sleep(0)
+        assert admission.stats()["m"]["queued"] == 1 and admission.stats()["m"]["active_tokens"] == 600
+
+        admission.release(first)
+        second = await large
+        assert admission.stats()["m"]["active_tokens"] == 600
+        admission.release(second)
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from types import MappingProxyType
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import chat
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.tracing import Trace, Tracer, TracingMiddleware
+from app.services.upstream_client import UpstreamClient
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+
+SERVER = "http://node1:8000"
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+def test_incoming_traceparent_is_continued_and_its_sampling_decision_kept():
+    trace = Trace("POST /v1/completions", PARENT, sample_rate=0.0)
+    assert trace.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert trace.parent_span_id == "b7ad6b7169203331" and trace.sampled
+    assert trace.traceparent("00f067aa0ba902b7") == "00-0af7651916cd43dd8448eb211c80319c-00f067aa0ba902b7-01"
+
+    trace = Trace("POST /v1/completions", "00-" + "0" * 32 + "-zz-01", sample_rate=0.0)
+    assert trace.parent_span_id is None and not trace.sampled  # 형식이 맞지 않으면 새 트레이스
+
+
+def test_slow_and_failed_requests_are_kept_even_when_not_sampled():
+    tracer = Tracer(sample_rate=0.0, slow_threshold=0.05, exporter=None)
+    fast, failed, slow = (tracer.start("req") for _ in range(3))
+    tracer.finish(fast, 200)
+    tracer.finish(failed, 502)
+    slow.started_at -= 0.1
+    tracer.finish(slow, 200)
+
+    assert [trace["status"] for trace in tracer.slowest()] == [200, 502]
+    assert tracer.stats["started"] == 3 and tracer.stats["kept"] == 2
+
+
+def test_spans_cover_the_request_path_and_the_upstream_call_continues_the_trace(tmp_path):
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"choices": []})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"models": {"m": {"servers": [SERVER]}}}))
+        load_balancer = LoadBalancer(MetricsCollector({"m": [SERVER]}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        load_balancer.metrics_collector.metrics = {"m": MappingProxyType({SERVER: MappingProxyType({})})}
+        tracer = Tracer(sample_rate=1.0, exporter=None)
+        init_dependencies(load_balancer, request_tracer=tracer)
+        app = FastAPI()
+        app.add_middleware(TracingMiddleware, tracer=tracer)
+        app.include_router(chat.router, prefix="/v1")
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            response = await client.post(
+                "/v1/chat/completions", json={"model": "m", "messages": []}, headers={"traceparent": PARENT}
+            )
+            assert response.status_code == 200
+        await load_balancer.aclose()
+
+        (trace,) = tracer.slowest()
+        assert trace["trace_id"] == "0af7651916cd43dd8448eb211c80319c"
+        assert trace["status"] == 200 and trace["attributes"]["model"] == "m"
+        assert [span["name"] for span in trace["spans"]] == ["parse", "select", "upstream", "client_write"]
+        # 업스트림은 같은 트레이스의 upstream 스팬을 부모로 받음
+        assert received[0].startswith("00-0af7651916cd43dd8448eb211c80319c-")
+        assert received[0] != PARENT
+
+    asyncio.run(run())
+
+
+def test_kept_traces_are_exported_as_otlp_json():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    async def run():
+        tracer = Tracer(exporter="otlp", sample_rate=1.0, transport=httpx.MockTransport(handler))
+        trace = tracer.start("POST /generate", PARENT)
+        trace.add_span("upstream", trace.started_at, trace.started_at + 0.01, {"server": SERVER}, "00f067aa0ba902b7")
+        tracer.finish(trace, 200)
+        await tracer.export()
+        await tracer.export()  # 대기 중인 트레이스가 없으면 보내지 않음
+
+        (payload,) = requests
+        root, upstream = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert root["parentSpanId"] == "b7ad6b7169203331"
+        assert upstream["parentSpanId"] == root["spanId"] and upstream["spanId"] == "00f067aa0ba902b7"
+        assert tracer.stats["exported"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import httpx
+
+from app.services.upstream_client import UpstreamClient, filter_request_headers
+
+
+async def _sse_body():
+    yield b"data: {\"a\": 1}\n\n"
+    yield b"data: [DONE]\n\n"
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    assert request.headers["accept-encoding"] == "identity"
+    body = json.loads(request.content)
+    if request.url.path == "/fail":
+        return httpx.Response(503, json={"error": "overloaded"})
+    if body.get("stream"):
+        return httpx.Response(200, content=_sse_body())
+    return httpx.Response(200, json={"host": request.url.host, "echo": body})
+
+
+def test_filter_request_headers_drops_hop_by_hop():
+    headers = filter_request_headers(
+        {"Host": "router", "Content-Length": "10", "Authorization": "Bearer x", "Accept-Encoding": "gzip"}
+    )
+    assert headers == {
+        "Authorization": "Bearer x", "content-type": "application/json", "accept-encoding": "identity"
+    }
+
+
+def test_post_json_reuses_client_per_server():
+    async def run():
+        client = UpstreamClient(transport=httpx.MockTransport(_handler))
+        result = await client.post_json("http://node1:8000", "/v1/completions", {"x": 1}, {})
+        assert result == {"host": "node1", "echo": {"x": 1}}
+        assert client.get_client("http://node1:8000") is client.get_client("http://node1:8000")
+        assert client.get_client("http://node1:8000") is not client.get_client("http://node2:8000")
+        await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_open_stream_yields_raw_bytes_and_raises_before_first_chunk():
+    async def run():
+        client = UpstreamClient(transport=httpx.MockTransport(_handler))
+        chunks = await client.open_stream("http://node1:8000", "/v1/completions", {"stream": True}, {})
+        body = b"".join([chunk async for chunk in chunks])
+        assert body == b"data: {\"a\": 1}\n\ndata: [DONE]\n\n"
+
+        try:
+            await client.open_stream("http://node1:8000", "/fail", {"stream": True}, {})
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 503
+        else:
+            raise AssertionError("expected HTTPStatusError")
+        await client.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import sqlite3
+from types import MappingProxyType
+
+import httpx
+from fastapi import FastAPI
+
+from app.routers import admin, completions
+from app.services.load_balancer import LoadBalancer
+from app.services.metrics_collector import MetricsCollector
+from app.services.upstream_client import UpstreamClient
+from app.services.usage import RateLimited, StreamUsage, UsageMeter
+from app.utils.config_loader import ConfigLoader
+from app.utils.dependencies import init_dependencies
+
+SERVER = "http://node1:8000"
+
+
+def _sse(*events):
+    return b"".join(b"data: " + json.dumps(event).encode() + b"\n\n" for event in events) + b"data: [DONE]\n\n"
+
+
+def test_stream_usage_prefers_the_final_usage_chunk_and_falls_back_to_counting_events():
+    body = _sse(
+        {"choices": [{"delta": {"content": "a"}}], "usage": None},
+        {"choices": [{"delta": {"content": "b"}}], "usage": None},
+        {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 2}},
+    )
+    stream = StreamUsage()
+    for start in range(0, len(body), 7):  # 이벤트 경계와 무관하게 잘린 청크
+        stream.feed(body[start : start + 7])
+    assert stream.usage == {"prompt_tokens": 12, "completion_tokens": 2}
+
+    stream = StreamUsage()
+    stream.feed(_sse({"choices": [{"delta": {"content": "a"}}]}, {"choices": [{"delta": {"content": "b"}}]}))
+    assert stream.usage is None and stream.events == 2
+
+
+def test_aggregates_are_flushed_in_batches_to_sqlite_and_jsonl(tmp_path):
+    async def run():
+        for sink in ("sqlite", "jsonl"):
+            path = str(tmp_path / f"usage.{sink}")
+            usage = UsageMeter(sink=sink, path=path)
+            for _ in range(3):
+                usage.record("team-a", "m", SERVER, 10, 5)
+            usage.record("team-b", "m", SERVER, 1, 1, estimated=True)
+            await usage.flush()
+            await usage.flush()  # 새 집계가 없으면 기록하지 않음
+
+            if sink == "sqlite":
+                with sqlite3.connect(path) as db:
+                    rows = db.execute(
+                        "SELECT tenant, requests, prompt_tokens, completion_tokens, estimated_requests FROM usage"
+                    ).fetchall()
+            else:
+                with open(path) as f:
+                    rows = [
+                        (row["tenant"], row["requests"], row["prompt_tokens"], row["completion_tokens"],
+                         row["estimated_requests"])
+                        for row in map(json.loads, f)
+                    ]
+            assert sorted(rows) == [("team-a", 3, 30, 15, 0), ("team-b", 1, 1, 1, 1)]
+
+    asyncio.run(run())
+
+
+def test_tenant_token_rate_limit_uses_the_aggregates(tmp_path):
+    usage = UsageMeter(path=str(tmp_path / "usage.jsonl"), default_tokens_per_window=100, tenant_limits={"vip": 0})
+    usage.check("team-a")
+    usage.record("team-a", "m", SERVER, 80, 30)
+    usage.record("vip", "m", SERVER, 800, 300)
+    try:
+        usage.check("team-a")
+    except RateLimited as e:
+        assert 1 <= e.retry_after <= 60
+    else:
+        raise AssertionError("expected rate limit")
+    usage.check("vip")  # 한도 0 은 제한 없음
+    usage.check("team-b")
+
+
+def test_streams_are_attributed_to_the_tenant_from_the_authorization_header(tmp_path):
+    async def body():
+        yield _sse(*({"choices": [{"delta": {"content": "x"}}]} for _ in range(4)))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body())
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"usage": {"enabled": True, "path": str(tmp_path / "usage.jsonl")}}))
+        load_balancer = LoadBalancer(MetricsCollector({"m": [SERVER]}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+
+        headers = {"authorization": "Bearer key-1"}
+        payload = {"model": "m", "prompt": "x" * 40, "stream": True}
+        stream = await load_balancer.forward_request(SERVER, "/v1/completions", payload, headers, stream=True)
+        async for _ in stream:
+            pass
+        tenant = load_balancer.usage.tenant(headers)
+        assert tenant not in ("anonymous", "Bearer key-1")
+        # 마지막 usage 청크가 없으므로 이벤트 수와 예상 프롬프트 토큰으로 기록
+        assert load_balancer.usage._pending == {(tenant, "m", SERVER): [1, 10, 4, 1]}
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_tenant_headers_from_clients_cannot_reset_limits_or_bill_another_tenant(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"choices": [], "usage": {"prompt_tokens": 80, "completion_tokens": 30}})
+
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({
+            "models": {"m": {"servers": [SERVER]}},
+            "usage": {"enabled": True, "path": str(tmp_path / "usage.jsonl"), "default_tokens_per_window": 100},
+            "tenants": {"api_keys": {"key-a": "team-a", "key-b": "team-b"}},
+        }))
+        load_balancer = LoadBalancer(MetricsCollector({"m": [SERVER]}), ConfigLoader(str(config)))
+        load_balancer.upstream_client = UpstreamClient(transport=httpx.MockTransport(handler))
+        load_balancer.metrics_collector.metrics = {"m": MappingProxyType({SERVER: MappingProxyType({})})}
+        init_dependencies(load_balancer)
+        app = FastAPI()
+        app.include_router(completions.router, prefix="/v1")
+        payload = {"model": "m", "prompt": "x"}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            async def complete(key, tenant):
+                headers = {"Authorization": f"Bearer {key}", "X-Tenant-ID": tenant}
+                return (await client.post("/v1/completions", json=payload, headers=headers)).status_code
+
+            assert await complete("key-a", "team-a") == 200
+            assert await complete("key-a", "someone-else") == 429  # 새 테넌트 헤더로 한도를 피할 수 없음
+            assert await complete("key-c", "team-b") == 200  # 다른 테넌트를 사칭해도 자신의 사용량으로 기록
+        tenants = {tenant for tenant, _, _ in load_balancer.usage._pending}
+        assert tenants == {"team-a", load_balancer.tenants({"authorization": "Bearer key-c"})}
+        assert "team-b" not in load_balancer.usage.stats()
+        await load_balancer.aclose()
+
+    asyncio.run(run())
+
+
+def test_usage_report_requires_the_admin_token(tmp_path):
+    async def run():
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({
+            "usage": {"enabled": True, "path": str(tmp_path / "usage.jsonl")}, "admin": {"token": "secret"},
+        }))
+        load_balancer = LoadBalancer(MetricsCollector({"m": [SERVER]}), ConfigLoader(str(config)))
+        load_balancer.usage.record("team-a", "m", SERVER, 10, 5)
+        init_dependencies(load_balancer)
+        app = FastAPI()
+        app.include_router(admin.router, prefix="/admin")
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://router") as client:
+            assert (await client.get("/admin/usage")).status_code == 401
+            response = await client.get("/admin/usage", headers={"Authorization": "Bearer secret"})
+            assert response.status_code == 200 and "team-a" in response.json()
+        await load_balancer.aclose()
+
+    asyncio.run(run())